@@ -1,7 +1,7 @@
 import gymnasium as gym
 import numpy as np
 from stable_baselines3 import PPO
-from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.training.eval import run_episodes
 import argparse
 import time
 
@@ -9,8 +9,6 @@ def evaluate_model(model_path, env_config, n_episodes=500):
     print(f"Loading model from {model_path}")
     print(f"Environment Config: {env_config}")
     
-    # Create Env
-    env = GridEnv(**env_config)
     model = PPO.load(model_path)
     
     outcomes = {
@@ -28,36 +26,20 @@ def evaluate_model(model_path, env_config, n_episodes=500):
     print(f"Running {n_episodes} episodes...")
     start_time = time.time()
     
-    for i in range(n_episodes):
-        obs, info = env.reset()
-        terminated = False
-        truncated = False
-        steps = 0
-        first_key_step = None
-        current_keys = 0
-        
-        while not (terminated or truncated):
-            action, _ = model.predict(obs, deterministic=True)
-            obs, reward, terminated, truncated, info = env.step(action)
-            steps += 1
-            
-            # Track first key
-            if info["keys_collected"] > current_keys:
-                current_keys = info["keys_collected"]
-                if first_key_step is None:
-                    first_key_step = steps
-        
-        # Episode Done
-        event = info["event"]
+    # Unseeded episodes: each one draws a fresh random map
+    episodes = run_episodes(model, env_config, [None] * n_episodes, deterministic=True)
+    
+    for ep in episodes:
+        event = ep["event"]
         outcomes[event] = outcomes.get(event, 0) + 1
         
-        metrics["keys_collected_counts"].append(info["keys_collected"])
+        metrics["keys_collected_counts"].append(ep["keys_collected"])
         
-        if first_key_step is not None:
-            metrics["first_key_steps"].append(first_key_step)
+        if ep["first_key_step"] is not None:
+            metrics["first_key_steps"].append(ep["first_key_step"])
             
         if event == "success":
-            metrics["success_steps"].append(steps)
+            metrics["success_steps"].append(ep["steps"])
             
     elapsed = time.time() - start_time
     
@@ -0,0 +1,28 @@
+import argparse
+import os
+import numpy as np
+from stable_baselines3 import PPO
+from gridlock_rl.agents.export import NumpyPolicy, export_policy
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a trained policy to a torch-free NumPy .npz")
+    parser.add_argument("--model", type=str, required=True, help="Path to model.zip")
+    parser.add_argument("--out", type=str, default=None, help="Output .npz (default: next to the model)")
+    args = parser.parse_args()
+
+    out = args.out or os.path.splitext(args.model)[0] + ".npz"
+    model = PPO.load(args.model, device="cpu")
+    export_policy(model, out)
+
+    # Check the export against the model on random observations
+    rng = np.random.default_rng(0)
+    obs = {key: rng.integers(0, 2, size=(256,) + space.shape).astype(space.dtype)
+           for key, space in model.observation_space.spaces.items()}
+    expected, _ = model.predict(obs, deterministic=True)
+    actions, _ = NumpyPolicy(out).predict(obs)
+    agreement = float(np.mean(actions == expected))
+    print(f"Exported {args.model} -> {out} ({os.path.getsize(out) / 1024:.0f} KiB), "
+          f"deterministic action agreement {agreement:.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+import yaml
+from gridlock_rl.agents.serving import HEADER, format_stats, run_load, sample_observations
+
+async def _grid_shape(path):
+    reader, writer = await asyncio.open_unix_connection(path)
+    shape = HEADER.unpack(await reader.readexactly(HEADER.size))
+    writer.close()
+    await writer.wait_closed()
+    return shape
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many NPCs querying a policy server (scripts/serve_policy.py)")
+    parser.add_argument("--socket", type=str, default="/tmp/gridlock_policy.sock")
+    parser.add_argument("--config", type=str, default="configs/train/ppo.yaml",
+                        help="Training config whose env section generates the observations")
+    parser.add_argument("--clients", type=int, default=64, help="Concurrent connections (NPCs)")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per client")
+    parser.add_argument("--in-flight", type=int, default=1, help="Outstanding requests per client")
+    parser.add_argument("--n-obs", type=int, default=4096, help="Distinct observations to cycle through")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        env_cfg = yaml.safe_load(f)["env"]
+    _, height, width = asyncio.run(_grid_shape(args.socket))
+    env_cfg.update(max_height=height, max_width=width)
+    observations = sample_observations(env_cfg, args.n_obs)
+
+    stats = asyncio.run(run_load(args.socket, observations, args.clients, args.requests, args.in_flight))
+    print(format_stats(stats, name="client"))
+
+if __name__ == "__main__":
+    main()
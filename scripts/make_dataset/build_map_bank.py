@@ -0,0 +1,54 @@
+import argparse
+import time
+from gridlock_rl.maps.bank import build_bank
+from gridlock_rl.maps.difficulty import build_difficulty_index
+from gridlock_rl.maps.encoding import MapIndex
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a memory-mapped bank of validated maps")
+    parser.add_argument("--out", type=str, required=True, help="Output bank directory")
+    parser.add_argument("--n-maps", type=int, default=1_000_000)
+    parser.add_argument("--width", type=int, default=8)
+    parser.add_argument("--height", type=int, default=8)
+    parser.add_argument("--trap-density", type=float, default=0.1)
+    parser.add_argument("--num-keys", type=int, default=3)
+    parser.add_argument("--min-traps", type=int, default=0)
+    parser.add_argument("--method", type=str, default="rejection", choices=["rejection", "constructive"],
+                        help="Generator method (constructive maps are solvable by construction)")
+    parser.add_argument("--seed", type=int, default=0, help="Chunk j uses generator seed [seed, j]")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--exclude", action="append", default=[],
+                        help="Bank, benchmark bundle or index .npy whose maps (up to symmetry) must not appear; repeatable")
+    parser.add_argument("--packed", action="store_true", help="Store tiles at 3 bits each (grids_packed.npy)")
+    parser.add_argument("--difficulty-buckets", type=int, default=0,
+                        help="Also write a difficulty index with this many buckets (for difficulty_sampling)")
+    parser.add_argument("--dedup", action="store_true", help="Drop maps that repeat an earlier map up to symmetry")
+    args = parser.parse_args()
+
+    config = {
+        "width": args.width,
+        "height": args.height,
+        "trap_density": args.trap_density,
+        "num_keys": args.num_keys,
+        "min_traps": args.min_traps,
+        "method": args.method
+    }
+    print(f"Building {args.n_maps} maps into {args.out} with config {config}...")
+    exclude = None
+    for path in args.exclude:
+        index = MapIndex.load(path)
+        exclude = index if exclude is None else exclude.union(index)
+    if exclude is not None:
+        print(f"Excluding {len(exclude)} maps from {args.exclude}")
+    start_time = time.time()
+    bank = build_bank(args.out, args.n_maps, config, seed=args.seed, workers=args.workers,
+                      exclude=exclude, dedup=args.dedup, packed=args.packed)
+    elapsed = time.time() - start_time
+    print(f"Saved {len(bank)} maps in {elapsed:.1f}s ({len(bank) / elapsed:.0f} maps/s)")
+    if args.difficulty_buckets:
+        index = build_difficulty_index(args.out, n_buckets=args.difficulty_buckets)
+        print(f"Difficulty index: bucket sizes {index.bucket_sizes().tolist()}, "
+              f"{int((index.buckets < 0).sum())} unsolvable maps excluded")
+
+if __name__ == "__main__":
+    main()
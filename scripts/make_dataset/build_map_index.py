@@ -0,0 +1,20 @@
+import argparse
+import time
+from gridlock_rl.maps.encoding import MapIndex
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a canonical-hash index over map banks / benchmark bundles")
+    parser.add_argument("sources", nargs="+", help="Bank or bundle directories (or existing index .npy files)")
+    parser.add_argument("--out", type=str, required=True, help="Output index .npy (or directory for index.npy)")
+    args = parser.parse_args()
+
+    start_time = time.time()
+    index = MapIndex()
+    for path in args.sources:
+        index = index.union(MapIndex.load(path))
+        print(f"{path}: {len(index)} distinct maps so far")
+    index.save(args.out)
+    print(f"Saved index of {len(index)} maps to {args.out} in {time.time() - start_time:.1f}s")
+
+if __name__ == "__main__":
+    main()
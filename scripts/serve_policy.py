@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+import os
+from gridlock_rl.agents.serving import PolicyServer, sb3_predictor
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a trained policy to local clients with micro-batched inference "
+                                                 "(load-test it with scripts/load_generator.py)")
+    parser.add_argument("--model", type=str, required=True,
+                        help="Path to model.zip, or a NumPy export (.npz, scripts/export_policy.py) to serve without torch")
+    parser.add_argument("--socket", type=str, default="/tmp/gridlock_policy.sock", help="Unix socket path")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-delay-ms", type=float, default=2.0,
+                        help="Longest a request waits for its batch to fill")
+    parser.add_argument("--max-in-flight", type=int, default=1024,
+                        help="Unanswered requests per connection before the server stops reading it")
+    parser.add_argument("--report-every", type=float, default=10.0, help="Seconds between stats lines (0: never)")
+    parser.add_argument("--device", type=str, default="auto")
+    args = parser.parse_args()
+
+    if args.model.endswith(".npz"):
+        from gridlock_rl.agents.export import NumpyPolicy
+
+        model = NumpyPolicy(args.model)
+        grid_shape = model.obs_shapes["grid"]
+    else:
+        from stable_baselines3 import PPO
+
+        model = PPO.load(args.model, device=args.device)
+        grid_shape = model.observation_space["grid"].shape
+    server = PolicyServer(sb3_predictor(model), grid_shape,
+                          max_batch=args.max_batch, max_delay_ms=args.max_delay_ms,
+                          max_in_flight=args.max_in_flight)
+    if os.path.exists(args.socket):
+        os.remove(args.socket)
+    try:
+        asyncio.run(server.serve_forever(args.socket, args.report_every))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Final: {server.stats()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import sys
+from gridlock_rl.cli import main
+
+sys.exit(main())
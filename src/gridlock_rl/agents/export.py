@@ -0,0 +1,116 @@
+import numpy as np
+
+# Torch-free policy export. A MultiInputPolicy with the default CombinedExtractor
+# (every observation key flattened, then concatenated in extractor order) followed by
+# the policy MLP and the action net is written to one .npz:
+#   format          EXPORT_FORMAT
+#   obs_keys        observation keys in concatenation order
+#   shape_<key>     per-sample shape of each observation key
+#   activations     activation name of each hidden layer
+#   w<i>, b<i>      hidden layer i (w: (in, out) float32), then the action net as the last layer
+# NumpyPolicy runs the same forward pass with NumPy only, so evaluation and serving
+# workers need neither torch nor stable-baselines3.
+
+EXPORT_FORMAT = "gridlock-mlp-v1"
+
+ACTIVATIONS = {
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "identity": lambda x: x,
+}
+# torch module class name -> ACTIVATIONS key
+_TORCH_ACTIVATIONS = {"Tanh": "tanh", "ReLU": "relu", "Identity": "identity"}
+
+def _linear(layer):
+    return (layer.weight.detach().cpu().numpy().T.astype(np.float32),
+            layer.bias.detach().cpu().numpy().astype(np.float32))
+
+def export_policy(model, path):
+    """
+    Writes the deterministic policy of an SB3 model (PPO/A2C MultiInputPolicy with a discrete
+    action space and the default flattening extractor) to `path` (.npz).
+    Raises ValueError for architectures the NumPy forward pass does not cover.
+    """
+    policy = model.policy
+    extractor = policy.pi_features_extractor
+    extractors = getattr(extractor, "extractors", None)
+    if extractors is None or any(type(m).__name__ != "Flatten" for m in extractors.values()):
+        raise ValueError(f"Only the default flattening CombinedExtractor can be exported, got {extractor}")
+    if type(policy.action_dist).__name__ != "CategoricalDistribution":
+        raise ValueError("Only discrete (categorical) action spaces can be exported")
+    if getattr(policy, "normalize_images", False) and any(
+            sub.dtype == np.uint8 for sub in model.observation_space.spaces.values()):
+        raise ValueError("Image observations (uint8 normalization) are not supported")
+
+    arrays = {"format": np.array(EXPORT_FORMAT), "obs_keys": np.array(list(extractors.keys()))}
+    for key in extractors.keys():
+        arrays[f"shape_{key}"] = np.array(model.observation_space[key].shape, dtype=np.int64)
+
+    activations = []
+    modules = list(policy.mlp_extractor.policy_net)
+    for module in modules:
+        name = type(module).__name__
+        if name == "Linear":
+            i = len(activations)
+            arrays[f"w{i}"], arrays[f"b{i}"] = _linear(module)
+            activations.append("identity")
+        elif name in _TORCH_ACTIVATIONS and activations:
+            activations[-1] = _TORCH_ACTIVATIONS[name]
+        else:
+            raise ValueError(f"Unsupported policy network module: {module}")
+    i = len(activations)
+    arrays[f"w{i}"], arrays[f"b{i}"] = _linear(policy.action_net)
+    arrays["activations"] = np.array(activations)
+    np.savez(path, **arrays)
+
+class NumpyPolicy:
+    """
+    Forward pass of an exported policy. predict() has the SB3 signature, so it can stand
+    in for a model in training/eval.run_episodes or agents/serving.sb3_predictor.
+    """
+    def __init__(self, path):
+        with np.load(path) as data:
+            if str(data["format"]) != EXPORT_FORMAT:
+                raise ValueError(f"{path} is not a {EXPORT_FORMAT} policy export")
+            self.obs_keys = [str(k) for k in data["obs_keys"]]
+            self.obs_shapes = {k: tuple(data[f"shape_{k}"]) for k in self.obs_keys}
+            activations = [str(a) for a in data["activations"]]
+            self.layers = [(data[f"w{i}"], data[f"b{i}"]) for i in range(len(activations) + 1)]
+        self.activations = [ACTIVATIONS[a] for a in activations] + [ACTIVATIONS["identity"]]
+
+    def _features(self, obs):
+        """Concatenated float32 features (N, F) and whether `obs` was a single observation."""
+        first = self.obs_keys[0]
+        single = np.ndim(obs[first]) == len(self.obs_shapes[first])
+        parts = []
+        for key in self.obs_keys:
+            x = np.asarray(obs[key], dtype=np.float32)
+            parts.append(x.reshape(1 if single else len(x), -1))
+        return np.concatenate(parts, axis=1), single
+
+    def _forward(self, x):
+        for (w, b), activation in zip(self.layers, self.activations):
+            x = activation(x @ w + b)
+        return x
+
+    def logits(self, obs):
+        """(N, n_actions) action logits for a batched observation dict."""
+        return self._forward(self._features(obs)[0])
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True, rng=None):
+        """
+        Actions for a single or batched observation dict: argmax of the logits, or sampled
+        from their softmax when not `deterministic`.
+        Returns:
+            (actions, None): an int64 array of shape (N,), or a scalar array for a single observation.
+        """
+        x, single = self._features(obs)
+        x = self._forward(x)
+        if deterministic:
+            actions = x.argmax(axis=1)
+        else:
+            rng = rng if rng is not None else np.random.default_rng()
+            p = np.exp(x - x.max(axis=1, keepdims=True))
+            p /= p.sum(axis=1, keepdims=True)
+            actions = (p.cumsum(axis=1) > rng.random((len(p), 1))).argmax(axis=1)
+        return (actions[0] if single else actions), None
@@ -0,0 +1,297 @@
+import asyncio
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Micro-batching policy inference over a local (Unix domain) socket, for many
+# game entities querying one policy at once.
+# Protocol, little-endian, fixed-size records:
+#   on connect  server -> client  C, H, W (uint32): shape of the "grid" observation
+#   request     client -> server  request id (uint32), C*H*W int8 grid, int8 keys_collected
+#   response    server -> client  request id (uint32), action (uint8)
+# Requests may be pipelined on a connection; responses carry the request id.
+# The server queues requests from all connections and closes a batch when it holds
+# max_batch requests or its oldest request has waited max_delay_ms. Each batch is one
+# forward pass, run on an inference thread while the event loop keeps reading.
+# Latency is measured from the request being read to its response being written.
+# Backpressure: a connection has at most max_in_flight unanswered requests; its
+# handler stops reading until responses go out, and awaits drain() before reading
+# the next request, so a client that stops reading responses stops being read from.
+# Queued requests and unsent responses therefore stay bounded per connection. The
+# batch loop itself never waits on a writer, so one stalled client cannot hold up
+# the others.
+# If predict_fn raises, the batch's connections are closed (their clients see EOF)
+# and the server keeps serving other requests.
+
+HEADER = struct.Struct("<3I")
+REQUEST_ID = struct.Struct("<I")
+RESPONSE = struct.Struct("<IB")
+
+def request_size(obs_shape):
+    return REQUEST_ID.size + int(np.prod(obs_shape)) + 1
+
+def sb3_predictor(model, deterministic=True):
+    """Batch predict function for an SB3 model: obs dict of (N, ...) arrays -> (N,) actions."""
+    def predict(obs):
+        actions, _ = model.predict(obs, deterministic=deterministic)
+        return actions
+    return predict
+
+def batch_histogram(counts):
+    """Batch-size counts (index = size) binned by powers of two: {"1": n, "2-3": n, "4-7": n, ...}."""
+    hist = {}
+    lo = 1
+    while lo < len(counts):
+        hi = min(2 * lo, len(counts)) - 1
+        label = str(lo) if lo == hi else f"{lo}-{hi}"
+        hist[label] = int(counts[lo:hi + 1].sum())
+        lo *= 2
+    return hist
+
+def latency_summary(latencies):
+    """p50 / p99 / max in milliseconds of latencies given in seconds."""
+    if len(latencies) == 0:
+        return {"p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ms = np.asarray(latencies) * 1e3
+    p50, p99 = np.percentile(ms, [50, 99])
+    return {"p50_ms": float(p50), "p99_ms": float(p99), "max_ms": float(ms.max())}
+
+class _Connection:
+    """Writer and unanswered-request count of one client connection."""
+    __slots__ = ("writer", "outstanding", "resume")
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.outstanding = 0
+        self.resume = asyncio.Event()
+
+    def answered(self):
+        self.outstanding -= 1
+        self.resume.set()
+
+class PolicyServer:
+    """
+    Asyncio inference server. `predict_fn` maps a batched observation dict
+    ({"grid": (N, C, H, W) int8, "keys_collected": (N, 1) int8}) to (N,) actions,
+    e.g. sb3_predictor(model). Latencies of the last `history` requests are kept.
+    Each connection may have up to `max_in_flight` unanswered requests.
+    """
+    def __init__(self, predict_fn, obs_shape, max_batch=256, max_delay_ms=2.0, max_in_flight=1024, history=100000):
+        self.predict_fn = predict_fn
+        self.obs_shape = tuple(obs_shape)
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1e3
+        self.max_in_flight = max_in_flight
+        self.request_size = request_size(self.obs_shape)
+        self.latencies = deque(maxlen=history)
+        self.batch_counts = np.zeros(max_batch + 1, dtype=np.int64)
+        self.n_requests = 0
+        self.n_failed = 0
+        self._pending = deque()  # (arrival time, request bytes, _Connection)
+        self._connections = set()
+        self._arrived = None
+        self._full = None
+        self._server = None
+        self._batcher = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+
+    async def start(self, path):
+        """Listens on the Unix socket `path` and starts batching."""
+        self._arrived = asyncio.Event()
+        self._full = asyncio.Event()
+        # Room for every entity to connect at once (asyncio's default backlog is 100)
+        self._server = await asyncio.start_unix_server(self._handle, path=path, backlog=4096)
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def close(self):
+        self._server.close()
+        # Drop open connections so their handlers end, including ones waiting in drain()
+        # on a client that is not reading (the server only stops accepting new ones)
+        for conn in list(self._connections):
+            conn.writer.transport.abort()
+            conn.resume.set()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown(wait=True)
+
+    async def serve_forever(self, path, report_every=10.0):
+        """Runs until cancelled, printing stats every `report_every` seconds (0 disables)."""
+        await self.start(path)
+        print(f"Serving policy on {path} (max_batch={self.max_batch}, max_delay={self.max_delay * 1e3:g}ms)")
+        try:
+            while True:
+                await asyncio.sleep(report_every or 3600)
+                if report_every:
+                    print(format_stats(self.stats()))
+        finally:
+            await self.close()
+
+    def stats(self):
+        n_batches = int(self.batch_counts.sum())
+        return {
+            "requests": self.n_requests,
+            "failed": self.n_failed,
+            "batches": n_batches,
+            "mean_batch": self.n_requests / max(n_batches, 1),
+            "latency": latency_summary(self.latencies),
+            "batch_hist": batch_histogram(self.batch_counts),
+        }
+
+    async def _handle(self, reader, writer):
+        conn = _Connection(writer)
+        self._connections.add(conn)
+        writer.write(HEADER.pack(*self.obs_shape))
+        try:
+            await writer.drain()
+            while True:
+                data = await reader.readexactly(self.request_size)
+                self._pending.append((time.perf_counter(), data, conn))
+                conn.outstanding += 1
+                self._arrived.set()
+                if len(self._pending) >= self.max_batch:
+                    self._full.set()
+                while conn.outstanding >= self.max_in_flight and not writer.is_closing():
+                    conn.resume.clear()
+                    await conn.resume.wait()
+                # Waits while the client is not reading its responses
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(conn)
+            writer.close()
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        n_cells = int(np.prod(self.obs_shape))
+        while True:
+            if not self._pending:
+                self._arrived.clear()
+                await self._arrived.wait()
+            # Wait for a full batch, at most until the oldest request's deadline
+            timeout = self._pending[0][0] + self.max_delay - time.perf_counter()
+            if len(self._pending) < self.max_batch and timeout > 0:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch))]
+
+            raw = np.frombuffer(bytearray(b"".join(data for _, data, _ in batch)), dtype=np.int8)
+            raw = raw.reshape(len(batch), self.request_size)
+            obs = {
+                "grid": raw[:, REQUEST_ID.size:REQUEST_ID.size + n_cells].reshape((len(batch),) + self.obs_shape),
+                "keys_collected": raw[:, -1:],
+            }
+            try:
+                actions = await loop.run_in_executor(self._executor, self.predict_fn, obs)
+            except Exception as e:
+                print(f"[server] predict failed on a batch of {len(batch)}: {e!r}", file=sys.stderr)
+                for _, _, conn in batch:
+                    conn.writer.close()
+                    conn.answered()
+                self.n_failed += len(batch)
+                continue
+
+            now = time.perf_counter()
+            for (arrival, data, conn), action in zip(batch, np.asarray(actions).reshape(-1)):
+                if not conn.writer.is_closing():
+                    conn.writer.write(data[:REQUEST_ID.size] + bytes((int(action),)))
+                conn.answered()
+                self.latencies.append(now - arrival)
+            self.n_requests += len(batch)
+            self.batch_counts[len(batch)] += 1
+
+def format_stats(stats, name="server"):
+    latency = stats["latency"]
+    line = (f"[{name}] requests={stats['requests']} p50={latency['p50_ms']:.2f}ms "
+            f"p99={latency['p99_ms']:.2f}ms max={latency['max_ms']:.2f}ms")
+    if stats.get("failed"):
+        line += f" failed={stats['failed']}"
+    if "batches" in stats:
+        hist = " ".join(f"{k}:{v}" for k, v in stats["batch_hist"].items() if v)
+        line += f" batches={stats['batches']} mean_batch={stats['mean_batch']:.1f} hist[{hist}]"
+    if "throughput" in stats:
+        line += f" throughput={stats['throughput']:.0f} req/s"
+    return line
+
+def sample_observations(env_cfg, n, seed=0, max_steps=20):
+    """
+    `n` observations from GridEnv(**env_cfg): resets followed by up to `max_steps` random moves.
+    Returns:
+        dict of stacked "grid" / "keys_collected" arrays.
+    """
+    from gridlock_rl.envs.grid_env import GridEnv
+
+    env = GridEnv(**env_cfg)
+    rng = np.random.default_rng(seed)
+    grids, keys = [], []
+    obs, _ = env.reset(seed=seed)
+    for i in range(n):
+        for _ in range(rng.integers(max_steps + 1)):
+            obs, _, terminated, truncated, _ = env.step(rng.integers(4))
+            if terminated or truncated:
+                obs, _ = env.reset(seed=seed + i + 1)
+        grids.append(obs["grid"])
+        keys.append(obs["keys_collected"])
+    return {"grid": np.stack(grids), "keys_collected": np.stack(keys)}
+
+async def _client(path, observations, client_index, n_requests, in_flight, latencies, actions):
+    reader, writer = await asyncio.open_unix_connection(path)
+    shape = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if tuple(shape) != observations["grid"].shape[1:]:
+        raise ValueError(f"Server expects grid observations of shape {shape}, "
+                         f"load generator has {observations['grid'].shape[1:]}")
+    n_obs = len(observations["grid"])
+    slots = asyncio.Semaphore(in_flight)
+    sent = {}
+
+    async def receive():
+        for _ in range(n_requests):
+            request_id, action = RESPONSE.unpack(await reader.readexactly(RESPONSE.size))
+            latencies.append(time.perf_counter() - sent.pop(request_id))
+            actions[client_index, request_id] = action
+            slots.release()
+
+    receiver = asyncio.create_task(receive())
+    for i in range(n_requests):
+        await slots.acquire()
+        j = (client_index * n_requests + i) % n_obs
+        sent[i] = time.perf_counter()
+        writer.write(REQUEST_ID.pack(i) + observations["grid"][j].tobytes()
+                     + observations["keys_collected"][j].astype(np.int8).tobytes())
+        await writer.drain()
+    await receiver
+    writer.close()
+    await writer.wait_closed()
+
+async def run_load(path, observations, n_clients=32, n_requests=1000, in_flight=1):
+    """
+    Load generator: `n_clients` concurrent connections each send `n_requests` requests, keeping
+    up to `in_flight` outstanding (1 = one query per NPC tick). Request i of client c uses
+    observation (c * n_requests + i) % len(observations).
+    Returns:
+        dict: client-side latency summary, throughput (req/s), requests, and the
+        (n_clients, n_requests) actions received.
+    """
+    latencies = []
+    actions = np.full((n_clients, n_requests), -1, dtype=np.int64)
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client(path, observations, c, n_requests, in_flight, latencies, actions) for c in range(n_clients)
+    ])
+    elapsed = time.perf_counter() - start
+    return {
+        "requests": n_clients * n_requests,
+        "throughput": n_clients * n_requests / elapsed,
+        "latency": latency_summary(latencies),
+        "actions": actions,
+    }
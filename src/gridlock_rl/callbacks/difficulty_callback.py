@@ -0,0 +1,56 @@
+from collections import deque
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+from gridlock_rl.maps.difficulty import bucket_weights
+
+class AdaptiveDifficultyCallback(BaseCallback):
+    """
+    Closes the loop for difficulty-weighted map sampling (GridEnv(difficulty_sampling=True)):
+    - Tracks the success of the last `window` episodes per difficulty bucket, from
+      info["metrics"]["difficulty_bucket"] / ["is_success"] (MetricLoggingWrapper).
+    - Every `update_freq` env steps, pushes bucket_weights(success) to all envs with
+      env_method("set_difficulty_weights"), so trivial and hopeless buckets are drawn less.
+    - Logs difficulty/bucket_<b>/success_rate and difficulty/bucket_<b>/weight per rollout.
+    """
+    def __init__(self, window=200, update_freq=2048, min_weight=0.05, verbose=0):
+        super().__init__(verbose)
+        self.window = window
+        self.update_freq = update_freq
+        self.min_weight = min_weight
+        self.outcomes = None
+        self.weights = None
+        self.last_update = 0
+
+    def _on_training_start(self) -> None:
+        n_buckets = self.training_env.get_attr("n_difficulty_buckets", indices=[0])[0]
+        if self.outcomes is None or len(self.outcomes) != n_buckets:
+            self.outcomes = [deque(maxlen=self.window) for _ in range(n_buckets)]
+        self.last_update = self.num_timesteps
+
+    def success_rates(self):
+        """Per-bucket success rate over the window (NaN for buckets without episodes)."""
+        return np.array([np.mean(o) if o else np.nan for o in self.outcomes])
+
+    def _on_step(self) -> bool:
+        if not self.outcomes:
+            return True
+        for info in self.locals.get("infos", []):
+            m = info.get("metrics")
+            if m is not None and "difficulty_bucket" in m:
+                self.outcomes[m["difficulty_bucket"]].append(m.get("is_success", 0.0))
+        if self.num_timesteps - self.last_update >= self.update_freq:
+            self.weights = bucket_weights(self.success_rates(), self.min_weight)
+            self.training_env.env_method("set_difficulty_weights", self.weights)
+            self.last_update = self.num_timesteps
+        return True
+
+    def _on_rollout_end(self) -> None:
+        if not self.outcomes:
+            return
+        success = self.success_rates()
+        for b, rate in enumerate(success):
+            if not np.isnan(rate):
+                self.logger.record(f"difficulty/bucket_{b}/success_rate", float(rate))
+            if self.weights is not None:
+                self.logger.record(f"difficulty/bucket_{b}/weight", float(self.weights[b] / self.weights.sum()))
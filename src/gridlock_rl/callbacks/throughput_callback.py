@@ -0,0 +1,107 @@
+import os
+import time
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+try:
+    import psutil
+except ImportError:  # optional: fall back to peak RSS from the resource module
+    psutil = None
+
+class ThroughputCallback(BaseCallback):
+    """
+    Logs training throughput telemetry under perf/*, next to the env/* scalars:
+    - fps_rollout / fps: env steps per second while collecting / over rollout + update.
+    - rollout_time_s, update_time_s, update_frac: wall time per phase. The update
+      (model.train) runs after a rollout, so each rollout logs the previous update.
+    - worker_step_us_*, worker_idle_frac_*: env.step latency and the share of wall time
+      a worker waited on the learner, aggregated over workers as mean / p50 / p90 / max
+      (needs StepTimingWrapper infos).
+    - worker_<i>/step_us, worker_<i>/idle_frac: the same per worker, only with
+      `per_worker` (two scalars per env each rollout; keep it off at hundreds of envs).
+    - rss_mb / rss_children_mb: resident memory of the learner / its workers (psutil),
+      or peak RSS of the learner if psutil is not installed.
+    """
+    def __init__(self, per_worker=False, verbose=0):
+        super().__init__(verbose)
+        self.per_worker = per_worker
+        self.rollout_start = None
+        self.rollout_end = None
+        self.update_time = None
+        self.rollout_start_steps = 0
+        self.step_ns = None
+        self.idle_ns = None
+        self.step_calls = None
+        self.first_step = True
+        self.process = psutil.Process(os.getpid()) if psutil is not None else None
+
+    def _on_rollout_start(self) -> None:
+        now = time.perf_counter()
+        if self.rollout_end is not None:
+            self.update_time = now - self.rollout_end
+        self.rollout_start = now
+        self.rollout_start_steps = self.num_timesteps
+        n_envs = self.training_env.num_envs
+        self.step_ns = np.zeros(n_envs, dtype=np.int64)
+        self.idle_ns = np.zeros(n_envs, dtype=np.int64)
+        self.step_calls = np.zeros(n_envs, dtype=np.int64)
+        self.first_step = True
+
+    def _on_step(self) -> bool:
+        for i, info in enumerate(self.locals.get("infos", [])):
+            if "step_time_ns" in info:
+                self.step_ns[i] += info["step_time_ns"]
+                # The first step's idle time spans the previous update, which is timed separately
+                if not self.first_step:
+                    self.idle_ns[i] += info["idle_time_ns"]
+                self.step_calls[i] += 1
+        self.first_step = False
+        return True
+
+    def _on_rollout_end(self) -> None:
+        now = time.perf_counter()
+        rollout_time = now - self.rollout_start
+        self.rollout_end = now
+        steps = self.num_timesteps - self.rollout_start_steps
+
+        self.logger.record("perf/rollout_time_s", rollout_time)
+        self.logger.record("perf/fps_rollout", steps / max(rollout_time, 1e-9))
+        if self.update_time is not None:
+            total = rollout_time + self.update_time
+            self.logger.record("perf/update_time_s", self.update_time)
+            self.logger.record("perf/update_frac", self.update_time / total)
+            self.logger.record("perf/fps", steps / total)
+
+        # Worker latency and idle share (workers without timing infos are skipped)
+        timed = self.step_calls > 0
+        if timed.any():
+            step_us = self.step_ns[timed] / self.step_calls[timed] / 1e3
+            idle_frac = self.idle_ns[timed] / 1e9 / rollout_time
+            for name, values in (("worker_step_us", step_us), ("worker_idle_frac", idle_frac)):
+                p50, p90 = np.percentile(values, [50, 90])
+                self.logger.record(f"perf/{name}_mean", float(values.mean()))
+                self.logger.record(f"perf/{name}_p50", float(p50))
+                self.logger.record(f"perf/{name}_p90", float(p90))
+                self.logger.record(f"perf/{name}_max", float(values.max()))
+            self.logger.record("perf/worker_idle_frac_min", float(idle_frac.min()))
+            if self.per_worker:
+                for i, us, frac in zip(np.flatnonzero(timed), step_us, idle_frac):
+                    self.logger.record(f"perf/worker_{i}/step_us", float(us))
+                    self.logger.record(f"perf/worker_{i}/idle_frac", float(frac))
+
+        self._record_memory()
+
+    def _record_memory(self):
+        if self.process is not None:
+            self.logger.record("perf/rss_mb", self.process.memory_info().rss / 2**20)
+            children = 0
+            for child in self.process.children(recursive=True):
+                try:
+                    children += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.logger.record("perf/rss_children_mb", children / 2**20)
+        else:
+            import resource
+            # ru_maxrss is KiB on Linux (peak, not current)
+            self.logger.record("perf/rss_mb", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10)
@@ -0,0 +1,112 @@
+import argparse
+import os
+import sys
+
+# `gridlock` command line entry point. Only the standard library is imported at
+# module level: each subcommand imports its own dependencies when it runs, so
+# `gridlock --help` and the map / env tooling (gen-benchmark, verify, oracle, and
+# bench --suite env / maps) never load torch or stable-baselines3. train, eval of
+# a .zip model and the bench vec_env suite (part of the default all-suites run)
+# do. Keep it that way: tests/test_cli.py checks the imported modules and the
+# import time of this module against IMPORT_BUDGET_MS.
+
+IMPORT_BUDGET_MS = 50
+
+def _train(args):
+    from gridlock_rl.training.train_sb3 import train
+
+    train(args.config, args.run_name, args.load_model, demos_path=args.demos, pretrain_epochs=args.pretrain_epochs)
+
+def _eval(args):
+    from gridlock_rl.training.eval import evaluate
+
+    evaluate(args.model, args.config, args.benchmark, n_episodes=args.episodes)
+
+# --ood defaults for gen-benchmark (scripts/make_dataset/generate_ood.py)
+OOD_DEFAULTS = {"n_maps": 50, "out": "data/benchmarks/ood", "seeds_out": "configs/maps/benchmark_ood_seeds.yaml"}
+ID_DEFAULTS = {"n_maps": 100, "out": "data/benchmarks/id", "seeds_out": "configs/maps/benchmark_seeds.yaml"}
+
+def _gen_benchmark(args):
+    from gridlock_rl.maps.benchmark import generate_benchmark, generate_ood
+
+    defaults = OOD_DEFAULTS if args.ood else ID_DEFAULTS
+    for key, value in defaults.items():
+        if getattr(args, key) is None:
+            setattr(args, key, value)
+    generate = generate_ood if args.ood else generate_benchmark
+    generate(args.n_maps, args.out, args.seeds_out, args.workers)
+
+def _verify(args):
+    from gridlock_rl.utils.checks import run_verification
+
+    run_verification(args.episodes)
+
+def _oracle(args):
+    from gridlock_rl.utils.checks import run_oracle
+
+    run_oracle()
+
+def _bench(args):
+    from gridlock_rl.utils.benchmark import main as bench_main
+
+    return bench_main(args.bench_args)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="gridlock", description="Gridlock RL tooling")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    p = commands.add_parser("train", help="Train a PPO agent")
+    p.add_argument("--config", type=str, default="configs/train/ppo.yaml")
+    p.add_argument("--run-name", type=str, default="ppo_baseline")
+    p.add_argument("--load-model", type=str, default=None, help="Path to pretrained model.zip")
+    p.add_argument("--demos", type=str, default=None,
+                   help="Oracle demonstration dataset for behavior-cloning pretraining")
+    p.add_argument("--pretrain-epochs", type=int, default=1)
+    p.set_defaults(handler=_train)
+
+    p = commands.add_parser("eval", help="Evaluate a model (.zip, or a torch-free .npz export)")
+    p.add_argument("--model", type=str, required=True)
+    p.add_argument("--config", type=str, default="configs/train/ppo.yaml")
+    p.add_argument("--benchmark", type=str, default="configs/maps/benchmark_seeds.yaml",
+                   help="Benchmark bundle directory or seed list yaml")
+    p.add_argument("--episodes", type=int, default=100, help="Random-seed episodes when there is no benchmark")
+    p.set_defaults(handler=_eval)
+
+    p = commands.add_parser("gen-benchmark", help="Build the in-distribution (or --ood) benchmark bundle")
+    p.add_argument("--ood", action="store_true", help="Out-of-distribution maps (10x10, 0.15 traps, seeds from 10000)")
+    p.add_argument("--n-maps", type=int, default=None, help="Default: 100 (ID) / 50 (OOD)")
+    p.add_argument("--out", type=str, default=None, help="Default: data/benchmarks/id or data/benchmarks/ood")
+    p.add_argument("--seeds-out", type=str, default=None)
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    p.set_defaults(handler=_gen_benchmark)
+
+    p = commands.add_parser("verify", help="Play random-policy episodes as an env smoke test")
+    p.add_argument("--episodes", type=int, default=100)
+    p.set_defaults(handler=_verify)
+
+    p = commands.add_parser("oracle", help="Play the exact solver's plan on a generated map")
+    p.set_defaults(handler=_oracle)
+
+    # Options after `bench` are passed through to utils/benchmark.py
+    p = commands.add_parser("bench", help="Run throughput benchmarks (see `gridlock bench -h`)", add_help=False)
+    p.set_defaults(handler=_bench)
+    return parser
+
+def main(argv=None):
+    """
+    Runs one subcommand.
+    Returns:
+        int: process exit status.
+    """
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "bench":
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    status = args.handler(args)
+    return status if isinstance(status, int) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
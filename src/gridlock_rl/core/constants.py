@@ -22,3 +22,15 @@ CHANNEL_MAP = {
     "key": 3,
     "goal": 4
 }
+
+# Values reported in info["event"] (index = event code used by batched envs)
+EVENT_NAMES = (
+    "reset",
+    "moved",
+    "no_op",
+    "goal_locked",
+    "trap",
+    "key_collected",
+    "success",
+    "timeout"
+)
@@ -0,0 +1,71 @@
+import hashlib
+import numpy as np
+
+def map_digest(grid):
+    """Stable 64-bit digest of a map layout (shape + tiles), identical across processes."""
+    grid = np.ascontiguousarray(grid, dtype=np.int8)
+    h = hashlib.blake2b(digest_size=8)
+    h.update(np.asarray(grid.shape, dtype=np.int64).tobytes())
+    h.update(grid.tobytes())
+    return int.from_bytes(h.digest(), "little")
+
+class GridState:
+    """
+    Compact snapshot of a GridEnv episode, for lookahead search / MCTS.
+
+    - grid_static: the episode's initial map, shared by reference (never mutated).
+    - key_mask: bitboard of keys still on the map (bit r * W + c).
+    - agent: flat agent cell (r * W + c).
+    - keys_collected, steps, last_potential, last_target: the rest of the env state.
+
+    All fields besides the shared map are scalars, so snapshot()/restore() are O(1).
+    Equality and hash use (map_digest, agent, key_mask, steps): the shaping fields are
+    functions of the agent cell and key mask. Hashes only combine ints, so they are
+    stable across processes and runs.
+    """
+    __slots__ = (
+        "grid_static", "map_hash", "agent", "key_mask",
+        "keys_collected", "steps", "last_potential", "last_target"
+    )
+
+    def __init__(self, grid_static, map_hash, agent, key_mask, keys_collected, steps,
+                 last_potential=0.0, last_target=None):
+        self.grid_static = grid_static
+        self.map_hash = map_hash
+        self.agent = agent
+        self.key_mask = key_mask
+        self.keys_collected = keys_collected
+        self.steps = steps
+        self.last_potential = last_potential
+        self.last_target = last_target
+
+    @property
+    def agent_pos(self):
+        return divmod(self.agent, self.grid_static.shape[1])
+
+    def snapshot(self):
+        """Returns an independent copy (the static map stays shared)."""
+        return GridState(
+            self.grid_static, self.map_hash, self.agent, self.key_mask,
+            self.keys_collected, self.steps, self.last_potential, self.last_target
+        )
+
+    def restore(self, other):
+        """Overwrites this state with `other` in place."""
+        for name in self.__slots__:
+            setattr(self, name, getattr(other, name))
+
+    def key(self):
+        return (self.map_hash, self.agent, self.key_mask, self.steps)
+
+    def __eq__(self, other):
+        if not isinstance(other, GridState):
+            return NotImplemented
+        return self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return (f"GridState(map={self.map_hash:016x}, agent={self.agent_pos}, "
+                f"key_mask={self.key_mask:#x}, keys={self.keys_collected}, steps={self.steps})")
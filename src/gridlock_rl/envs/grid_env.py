@@ -1,10 +1,27 @@
 import gymnasium as gym
 import numpy as np
-from collections import deque
 from gymnasium import spaces
 
 from gridlock_rl.core.constants import TileType, Action, CHANNEL_MAP
+from gridlock_rl.core.state import GridState, map_digest
 from gridlock_rl.maps.generator import MapGenerator
+from gridlock_rl.maps.bank import MapBank
+from gridlock_rl.maps.difficulty import DifficultyIndex
+from gridlock_rl.maps.validation import to_bitboard
+from gridlock_rl.envs.observation import build_obs_grid, read_only_view
+from gridlock_rl.envs.transitions import compile_transitions, CELL_TRAP, CELL_KEY, CELL_GOAL
+from gridlock_rl.envs.rewards import target_distance_fields, active_targets, potential_fields
+from gridlock_rl.utils.profiling import PROFILER, perf_counter_ns
+
+AGENT_CHANNEL = CHANNEL_MAP["agent"]
+KEY_CHANNEL = CHANNEL_MAP["key"]
+
+# Parameters GridEnv.configure can change on a live env (curriculum stages)
+CONFIGURABLE = (
+    "width", "height", "trap_density", "num_keys", "min_traps", "generator_method", "map_bank",
+    "dense_reward", "success_reward", "key_reward", "trap_cost", "step_cost", "timeout_penalty",
+    "max_steps_multiplier",
+)
 
 class GridEnv(gym.Env):
     metadata = {"render_modes": ["human", "ascii"], "render_fps": 4}
@@ -12,7 +29,8 @@ class GridEnv(gym.Env):
     def __init__(self, render_mode=None, width=8, height=8, trap_density=0.1, 
                  max_width=None, max_height=None, dense_reward=False, 
                  success_reward=20.0, key_reward=2.0, trap_cost=20.0, step_cost=0.01, timeout_penalty=10.0,
-                 max_steps_multiplier=4, num_keys=3, min_traps=0):
+                 max_steps_multiplier=4, num_keys=3, min_traps=0, copy_obs=True, map_bank=None,
+                 profile=False, generator_method="rejection", difficulty_sampling=False):
         super().__init__()
         self.width = width
         self.height = height
@@ -32,15 +50,23 @@ class GridEnv(gym.Env):
         
         self.max_steps_multiplier = max_steps_multiplier
         
-        # Helper to parse range
-        self.trap_density_range = None
-        if isinstance(trap_density, (list, tuple)):
-            self.trap_density_range = trap_density
-            self.trap_density = trap_density[1] # Default to max for sizing? Or doesn't matter.
-        else:
-            self.trap_density = trap_density
-            
-        self.map_generator = MapGenerator(width=width, height=height, trap_density=self.trap_density, num_keys=num_keys, min_traps=min_traps)
+        self._set_trap_density(trap_density)
+        self.map_generator = MapGenerator(width=width, height=height, trap_density=self.trap_density, num_keys=num_keys, min_traps=min_traps,
+                                          method=generator_method)
+
+        # Optional pre-generated map bank (directory path). When set, resets sample
+        # maps from it by index instead of running the generator.
+        # Opened lazily so each subprocess worker maps the file itself.
+        self.map_bank_path = map_bank
+        self._map_bank = None
+
+        # Difficulty-weighted bank sampling (maps/difficulty.py): each reset draws a
+        # difficulty bucket by weight, then a map from it. Weights are pushed by the
+        # learner with set_difficulty_weights (uniform until then).
+        self.difficulty_sampling = difficulty_sampling
+        self._difficulty_index = None
+        self.difficulty_weights = None
+        self.map_bucket = None
 
         # Action Space: 4 discrete actions (Up, Right, Down, Left)
         self.action_space = spaces.Discrete(len(Action))
@@ -67,11 +93,79 @@ class GridEnv(gym.Env):
         self.agent_pos = None    # (row, col)
         self.keys_collected = 0
         self.steps = 0
-        self.steps = 0
         self.last_potential = 0.0
         self.max_steps = self.max_steps_multiplier * (width * height)
 
+        # Persistent observation buffers: rebuilt on reset, patched in O(1) per step.
+        # copy_obs=False returns read-only views of them instead of copies; the views
+        # change as the env steps, so callers must copy anything they keep.
+        self.copy_obs = copy_obs
+        self._obs_grid = np.zeros((n_channels, self.max_height, self.max_width), dtype=np.int8)
+        self._obs_keys = np.zeros((1,), dtype=np.int8)
+        self._obs_grid_view = read_only_view(self._obs_grid)
+        self._obs_keys_view = read_only_view(self._obs_keys)
+
+        # Phase profiling (process-global, see utils/profiling.py)
+        if profile:
+            PROFILER.enable()
+
+    def _set_trap_density(self, trap_density):
+        # A [low, high] range draws a new density for every generated map
+        self.trap_density_range = None
+        if isinstance(trap_density, (list, tuple)):
+            self.trap_density_range = trap_density
+            self.trap_density = trap_density[1] # Default to max for sizing? Or doesn't matter.
+        else:
+            self.trap_density = trap_density
+
+    def configure(self, **params):
+        """
+        Changes env parameters in place (see CONFIGURABLE), e.g. between curriculum stages,
+        without rebuilding the env or its worker process. The map size may change up to
+        max_width x max_height, so the observation space stays the same.
+        Map settings apply from the next reset; the episode in progress keeps its map, so
+        callers should reset after changing width, height or dense_reward.
+        Returns:
+            dict: the applied parameters.
+        """
+        unknown = set(params) - set(CONFIGURABLE)
+        if unknown:
+            raise ValueError(f"Cannot configure {sorted(unknown)}; configurable parameters: {CONFIGURABLE}")
+        width = params.get("width", self.width)
+        height = params.get("height", self.height)
+        if width > self.max_width or height > self.max_height:
+            raise ValueError(f"Map size {height}x{width} exceeds the observation size {self.max_height}x{self.max_width}")
+        num_keys = params.get("num_keys", self.map_generator.num_keys)
+        if num_keys > self.observation_space["keys_collected"].high[0]:
+            raise ValueError(f"num_keys={num_keys} exceeds the keys_collected observation bound")
+
+        self.width, self.height = width, height
+        if "trap_density" in params:
+            self._set_trap_density(params["trap_density"])
+        if "dense_reward" in params:
+            self.use_dense_reward = params["dense_reward"]
+        for name in ("success_reward", "key_reward", "trap_cost", "step_cost", "timeout_penalty", "max_steps_multiplier"):
+            if name in params:
+                setattr(self, name, params[name])
+        self.max_steps = self.max_steps_multiplier * (width * height)
+
+        gen = self.map_generator
+        self.map_generator = MapGenerator(
+            width=width, height=height, trap_density=self.trap_density, max_retries=gen.max_retries,
+            num_keys=num_keys, min_traps=params.get("min_traps", gen.min_traps),
+            method=params.get("generator_method", gen.method)
+        )
+        if "map_bank" in params:
+            self.map_bank_path = params["map_bank"]
+            self._map_bank = None
+            self._difficulty_index = None
+        elif self._map_bank is not None and (self._map_bank.height, self._map_bank.width) != (height, width):
+            raise ValueError(f"Map bank {self.map_bank_path} does not hold {height}x{width} maps; pass map_bank")
+        return params
+
     def reset(self, seed=None, options=None):
+        prof = PROFILER.enabled
+        if prof: t0 = perf_counter_ns()
         super().reset(seed=seed) # Seeds self.np_random
         
         # 1. Map Generation / Loading
@@ -80,18 +174,8 @@ class GridEnv(gym.Env):
             self.grid_static = np.array(options["grid"], dtype=np.int8)
             # Validation? Maybe later. Assume valid for now.
         else:
-            # Generate new map using env's RNG seed logic if needed
-            # MapGenerator uses global np.random or specific seed.
-            # We can pass a seed derived from self.np_random
-            gen_seed = int(self.np_random.integers(0, 2**32))
-            
-            # Curriculum: Trap Density Randomization
-            if self.trap_density_range:
-                low, high = self.trap_density_range
-                new_density = self.np_random.uniform(low, high)
-                self.map_generator.trap_density = new_density
-                
-            self.grid_static, _ = self.map_generator.generate(seed=gen_seed)
+            self.grid_static = self._sample_grid(self.np_random)
+        if prof: t0 = PROFILER.lap("reset.map", t0)
 
         # 2. State Initialization
         self.grid_dynamic = self.grid_static.copy()
@@ -99,26 +183,102 @@ class GridEnv(gym.Env):
         # Count total keys in the generated map
         self.total_keys = np.count_nonzero(self.grid_static == TileType.KEY)
         
+        # Keys still on the map as a bitboard (bit r * W + c), see GridState
+        self._key_mask = to_bitboard(self.grid_static == TileType.KEY)
+        self._initial_key_mask = self._key_mask
+        self._map_hash = None # computed on first get_state()
+        
         # Locate agent
         start_indices = np.argwhere(self.grid_static == TileType.START)
         if len(start_indices) == 0:
             raise ValueError("Map missing START tile")
         self.agent_pos = tuple(start_indices[0])
+        self._agent_cell = int(self.agent_pos[0]) * self.width + int(self.agent_pos[1])
+        self._compile_transitions()
         
         self.keys_collected = 0
         self.steps = 0
         if self.use_dense_reward:
+             self._init_potential_fields()
              self.last_potential, self.last_target = self._compute_potential()
         else:
              self.last_potential = 0.0
              self.last_target = None
+        if prof: t0 = PROFILER.lap("reset.state", t0)
         
         self.last_shaping_reward = 0.0
         self.last_extrinsic_reward = 0.0
         
-        return self._get_obs(), self._get_info(event="reset")
+        # Build observation buffers (wall/trap/goal channels stay static until next reset)
+        build_obs_grid(self.grid_dynamic, self._obs_grid)
+        self._obs_grid[CHANNEL_MAP["agent"]][self.agent_pos] = 1
+        self._obs_keys[0] = 0
+        
+        obs, info = self._get_obs(), self._get_info(event="reset")
+        if self.map_bucket is not None:
+            info["difficulty_bucket"] = self.map_bucket
+        if prof: PROFILER.lap("reset.obs", t0)
+        return obs, info
+
+    @property
+    def map_bank(self):
+        if self._map_bank is None and self.map_bank_path is not None:
+            bank = MapBank(self.map_bank_path)
+            if (bank.height, bank.width) != (self.height, self.width):
+                raise ValueError(
+                    f"Map bank {self.map_bank_path} holds {bank.height}x{bank.width} maps, "
+                    f"env is {self.height}x{self.width}"
+                )
+            self._map_bank = bank
+        return self._map_bank
+
+    @property
+    def difficulty_index(self):
+        if self._difficulty_index is None and self.difficulty_sampling:
+            if self.map_bank is None:
+                raise ValueError("difficulty_sampling needs a map_bank with a difficulty index")
+            self._difficulty_index = DifficultyIndex.load(self.map_bank_path)
+            if len(self._difficulty_index) != len(self.map_bank):
+                raise ValueError(f"Difficulty index of {self.map_bank_path} does not match the bank size")
+        return self._difficulty_index
+
+    @property
+    def n_difficulty_buckets(self):
+        return self.difficulty_index.n_buckets if self.difficulty_index is not None else 0
+
+    def set_difficulty_weights(self, weights):
+        """Bucket sampling weights for the following resets (None = uniform)."""
+        self.difficulty_weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+
+    def _sample_grid(self, rng):
+        """
+        Draws a new map using `rng` (a np.random.Generator).
+        Shared with GridVecEnv so batched envs consume the RNG exactly like GridEnv.
+        """
+        self.map_bucket = None
+        if self.difficulty_index is not None:
+            idx, self.map_bucket = self.difficulty_index.sample(rng, self.difficulty_weights)
+            return self.map_bank[idx]
+        if self.map_bank is not None:
+            return self.map_bank[int(rng.integers(len(self.map_bank)))]
+            
+        # Generate new map using env's RNG seed logic if needed
+        # MapGenerator uses global np.random or specific seed.
+        # We can pass a seed derived from the env RNG
+        gen_seed = int(rng.integers(0, 2**32))
+        
+        # Curriculum: Trap Density Randomization
+        if self.trap_density_range:
+            low, high = self.trap_density_range
+            new_density = rng.uniform(low, high)
+            self.map_generator.trap_density = new_density
+            
+        grid, _ = self.map_generator.generate(seed=gen_seed)
+        return grid
 
     def step(self, action):
+        prof = PROFILER.enabled
+        if prof: t0 = perf_counter_ns()
         self.steps += 1
         reward = -self.step_cost # Step penalty
         extrinsic_reward = -self.step_cost
@@ -127,59 +287,53 @@ class GridEnv(gym.Env):
         truncated = False
         event = "moved"
 
-        # 1. Calculate new position
-        r, c = self.agent_pos
-        dr, dc = 0, 0
-        if action == Action.UP: dr = -1
-        elif action == Action.DOWN: dr = 1
-        elif action == Action.LEFT: dc = -1
-        elif action == Action.RIGHT: dc = 1
-        
-        nr, nc = r + dr, c + dc
-        
-        # 2. Validation (Bounds, Walls, Locked Goal)
-        next_tile = TileType.EMPTY # Default if out of bounds (treated as wall below)
-        valid_move = True
-        
-        if not (0 <= nr < self.height and 0 <= nc < self.width):
-            valid_move = False # Out of bounds
+        # 1. Look up the move in the transition table compiled at reset
+        cell = self._agent_cell
+        next_cell = self._next_cell[cell][action]
+        code = self._cell_code[next_cell]
+
+        # 2. Validation (Bounds and Walls are in the table; Locked Goal)
+        if next_cell == cell:
             event = "no_op"
+        elif code == CELL_GOAL and self.keys_collected < self.total_keys:
+            event = "goal_locked"
         else:
-            next_tile = self.grid_dynamic[nr, nc]
-            if next_tile == TileType.WALL:
-                valid_move = False
-                event = "no_op"
-            elif next_tile == TileType.GOAL:
-                if self.keys_collected < self.total_keys:
-                    valid_move = False
-                    event = "goal_locked"
-        
-        if valid_move:
+            r, c = self.agent_pos
+            nr, nc = divmod(next_cell, self.width)
+            self._obs_grid[AGENT_CHANNEL, r, c] = 0
+            self._obs_grid[AGENT_CHANNEL, nr, nc] = 1
+            self._agent_cell = next_cell
             self.agent_pos = (nr, nc)
-            
+
             # 3. Interactions
-            if next_tile == TileType.TRAP:
+            if code == CELL_TRAP:
                 reward = -self.trap_cost
                 extrinsic_reward += -self.trap_cost
                 terminated = True
                 event = "trap"
-            
-            elif next_tile == TileType.KEY:
+
+            elif code == CELL_KEY and self._key_mask >> next_cell & 1:
                 reward = self.key_reward
                 extrinsic_reward += self.key_reward
                 self.keys_collected += 1
                 # Remove key from dynamic grid
                 self.grid_dynamic[nr, nc] = TileType.EMPTY
+                self._key_mask &= ~(1 << next_cell)
+                self._obs_grid[KEY_CHANNEL, nr, nc] = 0
+                self._obs_keys[0] = self.keys_collected
+                if self.use_dense_reward:
+                    self._update_potential_field()
                 event = "key_collected"
-            
-            elif next_tile == TileType.GOAL:
+
+            elif code == CELL_GOAL:
                 # Can only enter if unlocked (checked above)
                 reward = self.success_reward
                 extrinsic_reward += self.success_reward
                 terminated = True
                 event = "success"
 
-        # 3.5 Dense Reward Shaping
+        if prof: t0 = PROFILER.lap("step.dynamics", t0)
+
         # 3.5 Dense Reward Shaping
         if self.use_dense_reward and not terminated:
             current_potential, current_target = self._compute_potential()
@@ -216,33 +370,28 @@ class GridEnv(gym.Env):
         # Store for Info
         self.last_shaping_reward = shaping_reward
         self.last_extrinsic_reward = extrinsic_reward
+        if prof: t0 = PROFILER.lap("step.shaping", t0)
             
-        return self._get_obs(), reward, terminated, truncated, self._get_info(event)
+        obs, info = self._get_obs(), self._get_info(event)
+        if prof:
+            PROFILER.lap("step.obs", t0)
+            PROFILER.count("step.event." + event)
+        return obs, reward, terminated, truncated, info
+
+    def profile_stats(self):
+        """Phase timers and counters of this env's process; combine workers with utils.profiling.merge_stats."""
+        return PROFILER.stats()
 
     def _get_obs(self):
-        # Create multi-channel grid with PADDED size
-        obs_grid = np.zeros((len(CHANNEL_MAP), self.max_height, self.max_width), dtype=np.int8)
-        
-        # Fill channels based on dynamic grid
-        # 0: Agent
-        ar, ac = self.agent_pos
-        obs_grid[CHANNEL_MAP["agent"], ar, ac] = 1
-        
-        # 1: Wall
-        obs_grid[CHANNEL_MAP["wall"], :self.height, :self.width] = (self.grid_dynamic == TileType.WALL).astype(np.int8)
-        
-        # 2: Trap
-        obs_grid[CHANNEL_MAP["trap"], :self.height, :self.width] = (self.grid_dynamic == TileType.TRAP).astype(np.int8)
-        
-        # 3: Key
-        obs_grid[CHANNEL_MAP["key"], :self.height, :self.width] = (self.grid_dynamic == TileType.KEY).astype(np.int8)
-        
-        # 4: Goal
-        obs_grid[CHANNEL_MAP["goal"], :self.height, :self.width] = (self.grid_dynamic == TileType.GOAL).astype(np.int8)
-        
+        # Multi-channel grid with PADDED size, maintained incrementally by reset()/step()
+        if not self.copy_obs:
+            return {
+                "grid": self._obs_grid_view,
+                "keys_collected": self._obs_keys_view
+            }
         return {
-            "grid": obs_grid,
-            "keys_collected": np.array([self.keys_collected], dtype=np.int8)
+            "grid": self._obs_grid.copy(),
+            "keys_collected": self._obs_keys.copy()
         }
 
     def _get_info(self, event):
@@ -255,74 +404,96 @@ class GridEnv(gym.Env):
             "extrinsic_reward": getattr(self, "last_extrinsic_reward", 0.0)
         }
 
+    def _init_potential_fields(self):
+        """Per-target BFS distance fields for the new map (once per reset)."""
+        fields, cells, is_goal = target_distance_fields(self.grid_static[None])
+        self._target_fields = fields
+        self._target_cells = cells
+        self._target_is_goal = is_goal
+        self._potential_cache = {} # key_mask -> (potential field, target field)
+        self._update_potential_field()
+
+    def _update_potential_field(self):
+        """Rebuilds the potential / nearest-target lookup tables (on reset and key pickup)."""
+        cached = self._potential_cache.get(self._key_mask)
+        if cached is None:
+            active = active_targets(
+                self.grid_dynamic[None], self._target_cells, self._target_is_goal,
+                [self.keys_collected], [self.total_keys]
+            )
+            potential, target = potential_fields(self._target_fields, self._target_cells, active)
+            cached = (potential[0], target[0])
+            self._potential_cache[self._key_mask] = cached
+        self._potential_field, self._target_field = cached
+
     def _compute_potential(self):
-        # Potential-based shaping: Phi(s) = -Distance(agent, nearest_target)
+        # Potential-based shaping: Phi(s) = -BFS distance(agent, nearest target)
         # Targets: Keys (if remaining) or Goal (if all keys collected)
-        
-        target_indices = []
-        if self.keys_collected < self.total_keys:
-            target_indices = np.argwhere(self.grid_dynamic == TileType.KEY)
-        else:
-            target_indices = np.argwhere(self.grid_dynamic == TileType.GOAL)
-            
-        if len(target_indices) == 0:
-            return 0.0, None
-            
-        agent_r, agent_c = self.agent_pos
-        
-        # Manhattan distance to all targets
-        dists = np.abs(target_indices[:, 0] - agent_r) + np.abs(target_indices[:, 1] - agent_c)
-        min_idx = np.argmin(dists)
-        min_dist = dists[min_idx]
-        nearest_target = tuple(target_indices[min_idx])
-        
-        # Normalized potential (max_dist approx W+H)
-        # We want it to be -dist.
-        return -float(min_dist), nearest_target
-        
-        # Simple BFS to find shortest path to ANY target
-        # Treating Walls as blocking, Traps as blocking (safe path)
-        queue = deque([(self.agent_pos, 0)])
-        visited = {self.agent_pos}
-        
-        min_dist = float('inf')
-        
-        while queue:
-            curr, dist = queue.popleft()
-            
-            if curr in targets:
-                min_dist = dist
-                break
-                
-            r, c = curr
-            for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < self.height and 0 <= nc < self.width:
-                    if (nr, nc) not in visited:
-                        tile = self.grid_dynamic[nr, nc]
-                        # Passable: Empty, Start, Goal (if unlocked?), Key
-                        # Impassable: Wall. Trap? Let's say Trap is impassable for "Safe Distance"
-                        if tile != TileType.WALL and tile != TileType.TRAP:
-                             # Also consider Goal impassable if locked?
-                             # Actually logic: if searching for keys, Goal is obstacle? 
-                             # Simplification: Treat Goal as empty unless it is target.
-                             # But wait, step() logic blocks locked goal.
-                             if tile == TileType.GOAL and self.keys_collected < self.total_keys:
-                                 pass # treat as wall
-                             else:
-                                visited.add((nr, nc))
-                                queue.append(((nr, nc), dist + 1))
-                                
-        if min_dist == float('inf'):
-            # No path found (isolated?), return worst case
-            # Max possible dist is W*H
-            min_dist = self.width * self.height
-            
-        # Normalize potential to be roughly in range [0, 1] or similar scale
-        # Phi(s) should be higher when closer.
-        # Let's say Phi = 1.0 - (dist / max_dist)
-        norm_dist = min_dist / (self.width * self.height)
-        return -norm_dist # Negative distance is potential (closer = less negative = higher reward)
+        # Walls and traps block paths; the goal blocks paths while it is locked.
+        # Unreachable targets give the worst case -(W*H) and no target.
+        potential = float(self._potential_field[self.agent_pos])
+        target = int(self._target_field[self.agent_pos])
+        if target < 0:
+            return potential, None
+        return potential, divmod(target, self.width)
+
+    def _compile_transitions(self):
+        """
+        Per-map tables for step() (see envs/transitions.py), kept as nested lists:
+        indexing them with Python ints is cheaper than NumPy scalar indexing.
+        """
+        next_cell, cell_code, _ = compile_transitions(self.grid_static)
+        self._next_cell = next_cell.tolist()
+        self._cell_code = cell_code.tolist()
+
+    def get_state(self):
+        """O(1) snapshot of the current episode state (see core/state.GridState)."""
+        if self._map_hash is None:
+            self._map_hash = map_digest(self.grid_static)
+        return GridState(
+            self.grid_static, self._map_hash, self._agent_cell, self._key_mask,
+            self.keys_collected, self.steps, self.last_potential, self.last_target
+        )
+
+    def set_state(self, state):
+        """
+        Restores a state from get_state(), possibly from another episode / map of the same size.
+        Costs O(H*W) to rebuild the dynamic grid and observation buffers.
+        """
+        map_changed = state.grid_static is not self.grid_static
+        if map_changed:
+            if state.grid_static.shape != (self.height, self.width):
+                raise ValueError(f"State map shape {state.grid_static.shape} does not match env {(self.height, self.width)}")
+            self.grid_static = state.grid_static
+            self.total_keys = np.count_nonzero(self.grid_static == TileType.KEY)
+            self._initial_key_mask = to_bitboard(self.grid_static == TileType.KEY)
+            self._map_hash = state.map_hash
+            self._compile_transitions()
+
+        # Dynamic grid: static map minus collected keys
+        self.grid_dynamic = self.grid_static.copy()
+        collected = self._initial_key_mask & ~state.key_mask
+        while collected:
+            low = collected & -collected
+            self.grid_dynamic.flat[low.bit_length() - 1] = TileType.EMPTY
+            collected ^= low
+
+        self.agent_pos = state.agent_pos
+        self._agent_cell = state.agent
+        self._key_mask = state.key_mask
+        self.keys_collected = state.keys_collected
+        self.steps = state.steps
+        self.last_potential = state.last_potential
+        self.last_target = state.last_target
+        if self.use_dense_reward:
+            if map_changed:
+                self._init_potential_fields()
+            else:
+                self._update_potential_field()
+
+        build_obs_grid(self.grid_dynamic, self._obs_grid)
+        self._obs_grid[CHANNEL_MAP["agent"]][self.agent_pos] = 1
+        self._obs_keys[0] = self.keys_collected
 
     def render(self):
         if self.render_mode is None:
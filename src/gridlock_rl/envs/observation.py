@@ -0,0 +1,24 @@
+from gridlock_rl.core.constants import TileType, CHANNEL_MAP
+
+def build_obs_grid(grid, out):
+    """
+    Writes the tile channels (wall, trap, key, goal) of `grid` into the observation
+    buffer `out` and clears everything else, including the agent channel and padding.
+
+    grid: (..., H, W) tile ids.
+    out:  (..., C, max_h, max_w) int8 buffer, written in place.
+    Leading dims are broadcast, so the same helper fills single envs and batches.
+    """
+    h, w = grid.shape[-2:]
+    out[...] = 0
+    out[..., CHANNEL_MAP["wall"], :h, :w] = grid == TileType.WALL
+    out[..., CHANNEL_MAP["trap"], :h, :w] = grid == TileType.TRAP
+    out[..., CHANNEL_MAP["key"], :h, :w] = grid == TileType.KEY
+    out[..., CHANNEL_MAP["goal"], :h, :w] = grid == TileType.GOAL
+    return out
+
+def read_only_view(arr):
+    """Returns a non-writeable view sharing memory with `arr`."""
+    view = arr.view()
+    view.flags.writeable = False
+    return view
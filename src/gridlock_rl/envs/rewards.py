@@ -0,0 +1,79 @@
+import numpy as np
+from gridlock_rl.core.constants import TileType
+from gridlock_rl.maps.validation import distance_fields
+
+# Potential-based shaping: Phi(s) = -BFS distance(agent, nearest active target).
+# Targets are the remaining keys, or the goal once all keys are held.
+# Per-target distance fields depend only on the static map, so they are computed
+# once per reset; the combined field is rebuilt once per key pickup and the
+# per-step potential is an array lookup. All helpers are batched over maps.
+
+def target_distance_fields(grids):
+    """
+    BFS distance fields from every shaping target of each grid.
+    grids: (N, H, W). Targets of a grid are its keys (row-major order), then its goal.
+    Key fields treat walls, traps and the (locked) goal as blocked; the goal field
+    treats walls and traps as blocked.
+    Returns:
+        fields (N, T, H, W) int32: moves to the target, H * W where unreachable.
+        cells (N, T) int64: flat target cell, -1 for unused slots.
+        is_goal (N, T) bool.
+    """
+    n, h, w = grids.shape
+    flat = grids.reshape(n, -1)
+
+    # Rank cells: keys (0), goal (1), others (2); a stable sort keeps row-major order
+    rank = np.where(flat == TileType.KEY, 0, np.where(flat == TileType.GOAL, 1, 2))
+    n_targets = int((rank < 2).sum(axis=1).max(initial=0))
+    order = np.argsort(rank, axis=1, kind="stable")[:, :n_targets]
+    order_rank = np.take_along_axis(rank, order, axis=1)
+    valid = order_rank < 2
+    cells = np.where(valid, order, -1)
+    is_goal = order_rank == 1
+
+    sources = np.zeros((n, n_targets, h * w), dtype=bool)
+    m_idx, t_idx = np.nonzero(valid)
+    sources[m_idx, t_idx, cells[valid]] = True
+
+    blocked = (grids == TileType.WALL) | (grids == TileType.TRAP)
+    key_passable = ~blocked & (grids != TileType.GOAL)
+    passable = np.where(is_goal[:, :, None, None], ~blocked[:, None], key_passable[:, None])
+
+    fields = distance_fields(sources.reshape(-1, h, w), passable.reshape(-1, h, w))
+    fields = fields.reshape(n, n_targets, h, w)
+    fields[fields < 0] = h * w
+    return fields, cells, is_goal
+
+def active_targets(grids, cells, is_goal, keys_collected, total_keys):
+    """
+    (N, T) mask of the targets the potential currently tracks: keys still on the
+    grid while keys are missing, otherwise the goal.
+    """
+    n = len(grids)
+    present = np.take_along_axis(grids.reshape(n, -1), np.maximum(cells, 0), axis=1) == TileType.KEY
+    want_goal = np.asarray(keys_collected) >= np.asarray(total_keys)
+    return np.where(want_goal[:, None], is_goal, ~is_goal & present & (cells >= 0))
+
+def potential_fields(fields, cells, active):
+    """
+    Combines per-target fields over the active targets.
+    Returns:
+        potential (N, H, W) float64: -distance to the nearest active target,
+            -(H * W) if none is reachable, 0 where the grid has no active target.
+        target (N, H, W) int64: flat cell of that target (first in slot order on ties),
+            -1 if none is reachable.
+    """
+    n, _, h, w = fields.shape
+    unreachable = h * w
+    masked = np.where(active[:, :, None, None], fields, unreachable)
+    if masked.shape[1] == 0:
+        masked = np.full((n, 1, h, w), unreachable, dtype=np.int32)
+        cells = np.full((n, 1), -1, dtype=np.int64)
+    nearest = masked.argmin(axis=1)
+    dist = np.take_along_axis(masked, nearest[:, None], axis=1)[:, 0]
+
+    target = np.take_along_axis(cells[:, :, None], nearest.reshape(n, 1, -1), axis=1).reshape(n, h, w)
+    target = np.where(dist < unreachable, target, -1)
+    has_target = active.any(axis=1)[:, None, None]
+    potential = np.where(has_target, -dist.astype(np.float64), 0.0)
+    return potential, target
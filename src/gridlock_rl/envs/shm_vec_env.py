@@ -0,0 +1,350 @@
+import pickle
+import numbers
+import multiprocessing as mp
+import numpy as np
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv, CloudpickleWrapper
+
+from gridlock_rl.core.constants import EVENT_NAMES
+
+# Subprocess vector env with shared-memory transport.
+# Observations, rewards, done flags, terminal observations and the scalar info
+# fields live in preallocated shared arrays (one row per worker). A step sends the
+# single command byte STEP to each worker and gets the byte OK back, so pipe traffic
+# does not grow with the observation size (max_width / max_height padding).
+# Anything the info schema below cannot hold is pickled back as a rare fallback.
+
+STEP = b"s"
+OK = b"k"
+CALL = b"c"
+RESET = b"r"
+CLOSE = b"x"
+
+# Scalar info fields carried in shared memory: (key, type). Missing fields are NaN.
+INFO_FIELDS = (
+    ("keys_collected", int), ("steps", int), ("total_keys", int),
+    ("shaping_reward", float), ("extrinsic_reward", float),
+    ("step_time_ns", int), ("idle_time_ns", int),
+)
+# info["metrics"] fields from MetricLoggingWrapper
+METRIC_FIELDS = (
+    ("keys_collected", int), ("shaping_reward_sum", float), ("extrinsic_reward_sum", float),
+    ("episode_steps", int), ("first_key_step", int), ("time_after_last_key_to_goal", int),
+    ("is_success", float), ("difficulty_bucket", int),
+)
+_EVENT_CODES = {name: code for code, name in enumerate(EVENT_NAMES)}
+# Row layout: [event code, INFO_FIELDS..., has metrics, METRIC_FIELDS...]
+_METRICS_COL = 1 + len(INFO_FIELDS)
+INFO_WIDTH = _METRICS_COL + 1 + len(METRIC_FIELDS)
+_INFO_COLS = {key: col for col, (key, _) in enumerate(INFO_FIELDS, start=1)}
+_METRIC_COLS = {key: col for col, (key, _) in enumerate(METRIC_FIELDS, start=_METRICS_COL + 1)}
+
+def _is_scalar(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, complex)
+
+def encode_info(info, row):
+    """
+    Writes the schema fields of `info` into `row` (float64, INFO_WIDTH).
+    Returns a dict of the entries the schema cannot hold (None if there are none).
+    """
+    row[:] = np.nan
+    extras = {}
+    for key, value in info.items():
+        if key == "event" and value in _EVENT_CODES:
+            row[0] = _EVENT_CODES[value]
+        elif key == "metrics" and isinstance(value, dict):
+            metric_extras = {}
+            for m_key, m_value in value.items():
+                col = _METRIC_COLS.get(m_key)
+                if col is not None and _is_scalar(m_value):
+                    row[col] = m_value
+                else:
+                    metric_extras[m_key] = m_value
+            row[_METRICS_COL] = 1.0
+            if metric_extras:
+                extras["metrics"] = metric_extras
+        elif key in _INFO_COLS and _is_scalar(value):
+            row[_INFO_COLS[key]] = value
+        else:
+            extras[key] = value
+    return extras or None
+
+def decode_info(row, extras=None):
+    """Rebuilds the info dict written by encode_info (plus pickled `extras`)."""
+    info = {}
+    if not np.isnan(row[0]):
+        info["event"] = EVENT_NAMES[int(row[0])]
+    for col, (key, kind) in enumerate(INFO_FIELDS, start=1):
+        if not np.isnan(row[col]):
+            info[key] = kind(row[col])
+    if row[_METRICS_COL] == 1.0:
+        metrics = {}
+        for col, (key, kind) in enumerate(METRIC_FIELDS, start=_METRICS_COL + 1):
+            if not np.isnan(row[col]):
+                metrics[key] = kind(row[col])
+        info["metrics"] = metrics
+    if extras:
+        metric_extras = extras.pop("metrics", None)
+        info.update(extras)
+        if metric_extras:
+            info["metrics"].update(metric_extras)
+    return info
+
+class SharedBuffers:
+    """
+    Named numpy arrays backed by multiprocessing RawArrays.
+    Picklable while starting a process, so workers map the same memory.
+    """
+    def __init__(self, ctx, specs):
+        # specs: {name: (shape, dtype)}
+        self.specs = {name: (tuple(shape), np.dtype(dtype).str) for name, (shape, dtype) in specs.items()}
+        self.raw = {
+            name: ctx.RawArray("b", max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize))
+            for name, (shape, dtype) in self.specs.items()
+        }
+        self._arrays = None
+
+    def __getstate__(self):
+        return {"specs": self.specs, "raw": self.raw}
+
+    def __setstate__(self, state):
+        self.specs, self.raw = state["specs"], state["raw"]
+        self._arrays = None
+
+    def __getitem__(self, name):
+        if self._arrays is None:
+            self._arrays = {
+                n: np.frombuffer(self.raw[n], dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+                for n, (shape, dtype) in self.specs.items()
+            }
+        return self._arrays[name]
+
+def _write_obs(buffers, prefix, index, obs):
+    if isinstance(obs, dict):
+        for key, value in obs.items():
+            buffers[prefix + key][index] = value
+    else:
+        buffers[prefix][index] = obs
+
+def _run_call(env, name, data):
+    """
+    Runs a control-path request in the worker.
+    Returns the pickled (ok, result); a failing call sends back its exception
+    instead of taking the worker down.
+    """
+    from stable_baselines3.common.env_util import is_wrapped
+
+    try:
+        if name == "env_method":
+            result = env.get_wrapper_attr(data[0])(*data[1], **data[2])
+        elif name == "get_attr":
+            result = env.get_wrapper_attr(data)
+        elif name == "has_attr":
+            try:
+                env.get_wrapper_attr(data)
+                result = True
+            except AttributeError:
+                result = False
+        elif name == "set_attr":
+            result = setattr(env, data[0], data[1])
+        elif name == "is_wrapped":
+            result = is_wrapped(env, data)
+        elif name == "render":
+            result = env.render()
+        else:
+            raise NotImplementedError(f"`{name}` is not implemented in the worker")
+        return pickle.dumps((True, result))
+    except Exception as e:
+        try:
+            return pickle.dumps((False, e))
+        except Exception:
+            return pickle.dumps((False, RuntimeError(repr(e))))
+
+def _worker(remote, parent_remote, env_fn_wrapper, buffers, index):
+    parent_remote.close()
+    env = env_fn_wrapper.var()
+    actions = buffers["actions"]
+    rewards, dones, timeouts = buffers["rewards"], buffers["dones"], buffers["timeouts"]
+    info_rows, reset_info_rows = buffers["infos"], buffers["reset_infos"]
+    while True:
+        try:
+            msg = remote.recv_bytes()
+            cmd = msg[:1]
+            if cmd == STEP:
+                obs, reward, terminated, truncated, info = env.step(actions[index])
+                done = terminated or truncated
+                rewards[index] = reward
+                dones[index] = done
+                timeouts[index] = truncated and not terminated
+                reset_extras = None
+                if done:
+                    _write_obs(buffers, "terminal_obs/", index, obs)
+                    obs, reset_info = env.reset()
+                    reset_extras = encode_info(reset_info, reset_info_rows[index])
+                _write_obs(buffers, "obs/", index, obs)
+                extras = encode_info(info, info_rows[index])
+                if extras is None and reset_extras is None:
+                    remote.send_bytes(OK)
+                else:
+                    remote.send_bytes(pickle.dumps((extras, reset_extras)))
+            elif cmd == RESET:
+                seed, options = pickle.loads(msg[1:])
+                maybe_options = {"options": options} if options else {}
+                obs, reset_info = env.reset(seed=seed, **maybe_options)
+                _write_obs(buffers, "obs/", index, obs)
+                remote.send_bytes(pickle.dumps(encode_info(reset_info, reset_info_rows[index])))
+            elif cmd == CALL:
+                remote.send_bytes(_run_call(env, *pickle.loads(msg[1:])))
+            elif cmd == CLOSE:
+                env.close()
+                remote.close()
+                break
+        except (EOFError, KeyboardInterrupt):
+            break
+
+class ShmVecEnv(VecEnv):
+    """
+    Drop-in replacement for SubprocVecEnv(env_fns) that moves observations, rewards,
+    dones and scalar infos through shared memory. Only one command byte per worker
+    crosses the pipe on each step, independent of the observation size.
+
+    Returned observations are copies, so they stay valid after the next step.
+    Info dicts match SubprocVecEnv's (event, GridEnv counters, MetricLoggingWrapper
+    metrics, TimeLimit.truncated, terminal_observation); entries outside the shared
+    schema are pickled back over the pipe for that step only.
+    """
+    def __init__(self, env_fns, start_method=None):
+        self.waiting = False
+        self.closed = False
+        n_envs = len(env_fns)
+
+        if start_method is None:
+            # Same default as SubprocVecEnv: forkserver where available
+            forkserver_available = "forkserver" in mp.get_all_start_methods()
+            start_method = "forkserver" if forkserver_available else "spawn"
+        ctx = mp.get_context(start_method)
+
+        # Spaces come from a throwaway instance, like SubprocVecEnv's get_spaces round trip
+        probe = env_fns[0]()
+        observation_space, action_space = probe.observation_space, probe.action_space
+        probe.close()
+
+        specs = {
+            "actions": ((n_envs,) + action_space.shape, action_space.dtype or np.int64),
+            "rewards": ((n_envs,), np.float32),
+            "dones": ((n_envs,), np.bool_),
+            "timeouts": ((n_envs,), np.bool_),
+            "infos": ((n_envs, INFO_WIDTH), np.float64),
+            "reset_infos": ((n_envs, INFO_WIDTH), np.float64),
+        }
+        self.obs_keys = list(observation_space.spaces) if hasattr(observation_space, "spaces") else None
+        for prefix in ("obs/", "terminal_obs/"):
+            if self.obs_keys is None:
+                specs[prefix] = ((n_envs,) + observation_space.shape, observation_space.dtype)
+            else:
+                for key in self.obs_keys:
+                    space = observation_space.spaces[key]
+                    specs[prefix + key] = ((n_envs,) + space.shape, space.dtype)
+        self.buffers = SharedBuffers(ctx, specs)
+
+        self.remotes, self.work_remotes = zip(*[ctx.Pipe() for _ in range(n_envs)])
+        self.processes = []
+        for index, (work_remote, remote, env_fn) in enumerate(zip(self.work_remotes, self.remotes, env_fns)):
+            args = (work_remote, remote, CloudpickleWrapper(env_fn), self.buffers, index)
+            # daemon=True: if the main process crashes, we should not cause things to hang
+            process = ctx.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        # After the workers start: VecEnv.__init__ queries their render_mode
+        super().__init__(n_envs, observation_space, action_space)
+
+    def step_async(self, actions):
+        self.buffers["actions"][:] = np.asarray(actions).reshape(self.buffers["actions"].shape)
+        for remote in self.remotes:
+            remote.send_bytes(STEP)
+        self.waiting = True
+
+    def step_wait(self):
+        replies = [remote.recv_bytes() for remote in self.remotes]
+        self.waiting = False
+
+        dones = self.buffers["dones"].copy()
+        rewards = self.buffers["rewards"].copy()
+        timeouts = self.buffers["timeouts"]
+        info_rows, reset_info_rows = self.buffers["infos"], self.buffers["reset_infos"]
+        infos = []
+        for i, reply in enumerate(replies):
+            extras, reset_extras = (None, None) if reply == OK else pickle.loads(reply)
+            info = decode_info(info_rows[i], extras)
+            info["TimeLimit.truncated"] = bool(timeouts[i])
+            if dones[i]:
+                info["terminal_observation"] = self._obs_row("terminal_obs/", i)
+                self.reset_infos[i] = decode_info(reset_info_rows[i], reset_extras)
+            infos.append(info)
+        return self._obs(), rewards, dones, infos
+
+    def reset(self):
+        for i, remote in enumerate(self.remotes):
+            remote.send_bytes(RESET + pickle.dumps((self._seeds[i], self._options[i])))
+        for i, remote in enumerate(self.remotes):
+            extras = pickle.loads(remote.recv_bytes())
+            self.reset_infos[i] = decode_info(self.buffers["reset_infos"][i], extras)
+        # Seeds and options are only used once
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs()
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            for remote in self.remotes:
+                remote.recv_bytes()
+        for remote in self.remotes:
+            remote.send_bytes(CLOSE)
+        for process in self.processes:
+            process.join()
+        self.closed = True
+
+    def get_images(self):
+        return self._call("render", None, None)
+
+    def has_attr(self, attr_name):
+        return all(self._call("has_attr", attr_name, None))
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call("get_attr", attr_name, indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call("set_attr", (attr_name, value), indices)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._call("env_method", (method_name, method_args, method_kwargs), indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._call("is_wrapped", wrapper_class, indices)
+
+    def _call(self, name, data, indices):
+        """
+        Pickled request to the workers in `indices` (control path, not per step).
+        Re-raises the first exception a worker reported, after every reply is read.
+        """
+        remotes = [self.remotes[i] for i in self._get_indices(indices)]
+        for remote in remotes:
+            remote.send_bytes(CALL + pickle.dumps((name, data)))
+        replies = [pickle.loads(remote.recv_bytes()) for remote in remotes]
+        for ok, result in replies:
+            if not ok:
+                raise result
+        return [result for _, result in replies]
+
+    def _obs(self):
+        if self.obs_keys is None:
+            return self.buffers["obs/"].copy()
+        return {key: self.buffers["obs/" + key].copy() for key in self.obs_keys}
+
+    def _obs_row(self, prefix, i):
+        if self.obs_keys is None:
+            return self.buffers[prefix][i].copy()
+        return {key: self.buffers[prefix + key][i].copy() for key in self.obs_keys}
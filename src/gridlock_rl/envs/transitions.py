@@ -0,0 +1,72 @@
+import numpy as np
+from gridlock_rl.core.constants import TileType, Action
+
+# Compiled transition tables. A map is static apart from key removal, so all
+# movement rules except the locked goal and collected keys can be resolved once
+# per map (at reset):
+#   next_cell[cell, action]  flat cell (r * W + c) the move lands on; the cell itself
+#                            when the move leaves the grid or hits a wall
+#   cell_code[cell]          what entering the cell does (CELL_* below)
+#   key_slot[cell]           index of the key on the cell among the map's keys in
+#                            row-major order, -1 elsewhere (for key-subset states)
+# The dynamic part is a key mask: GridEnv uses a bitboard over cells (see
+# core/state.py); searches over (cell, collected-key subset) use key_slot.
+# Everything is batched over leading map dimensions: (N, H, W) grids give
+# (N, H*W, 4) / (N, H*W) tables.
+
+CELL_EMPTY, CELL_TRAP, CELL_KEY, CELL_GOAL = range(4)
+
+# (dr, dc) per Action
+ACTION_DELTAS = np.zeros((len(Action), 2), dtype=np.int64)
+ACTION_DELTAS[Action.UP] = (-1, 0)
+ACTION_DELTAS[Action.RIGHT] = (0, 1)
+ACTION_DELTAS[Action.DOWN] = (1, 0)
+ACTION_DELTAS[Action.LEFT] = (0, -1)
+
+# Tile -> CELL_* code (walls and the start are plain cells; walls are never entered)
+TILE_CODES = np.full(len(TileType), CELL_EMPTY, dtype=np.int8)
+TILE_CODES[TileType.TRAP] = CELL_TRAP
+TILE_CODES[TileType.KEY] = CELL_KEY
+TILE_CODES[TileType.GOAL] = CELL_GOAL
+
+# Plain ints: comparing arrays against IntEnum members is several times slower
+_WALL = int(TileType.WALL)
+_KEY = int(TileType.KEY)
+
+_MOVES = {}
+
+def move_table(height, width):
+    """
+    (H*W, 4) int64 neighbour table of an empty height x width grid (self at the border).
+    Cached per shape and shared by every map; do not modify.
+    """
+    key = (height, width)
+    if key not in _MOVES:
+        n_cells = height * width
+        rows, cols = np.divmod(np.arange(n_cells), width)
+        nr = rows[:, None] + ACTION_DELTAS[:, 0]
+        nc = cols[:, None] + ACTION_DELTAS[:, 1]
+        inside = (nr >= 0) & (nr < height) & (nc >= 0) & (nc < width)
+        _MOVES[key] = np.where(inside, nr * width + nc, np.arange(n_cells)[:, None])
+    return _MOVES[key]
+
+def compile_transitions(grids):
+    """
+    Compiles (..., H, W) grids into transition tables.
+    Returns:
+        next_cell (..., H*W, 4) int64, cell_code (..., H*W) int8, key_slot (..., H*W) int64.
+    """
+    grids = np.asarray(grids)
+    *batch, height, width = grids.shape
+    flat = grids.reshape(*batch, height * width)
+
+    # Moves into a wall stay put
+    target = move_table(height, width)
+    stay = np.arange(height * width)[:, None]
+    next_cell = np.where((flat == _WALL)[..., target], stay, target)
+
+    cell_code = TILE_CODES[flat]
+
+    is_key = flat == _KEY
+    key_slot = np.where(is_key, np.cumsum(is_key, axis=-1) - 1, -1)
+    return next_cell, cell_code, key_slot
@@ -0,0 +1,156 @@
+import numpy as np
+
+from gridlock_rl.core.constants import TileType
+from gridlock_rl.envs.transitions import compile_transitions, CELL_TRAP, CELL_KEY, CELL_GOAL
+
+# Exact optimal values of GridEnv episodes by tabular value iteration.
+# A state is (agent cell, subset of the map's keys collected): H*W * 2^K states,
+# indexed cell * 2^K + mask, with bit i of the mask set once key slot i (row-major,
+# see transitions.key_slot) is collected. The MDP uses the GridEnv.step rules and
+# reproduces the reward step() returns. That is not the additive extrinsic_reward
+# info field: on a key, trap or goal step the event reward replaces the step cost.
+#   plain step       -step_cost
+#   wall / border    stay, -step_cost
+#   locked goal      stay, -step_cost (until every key of the map is collected)
+#   key (new)        +key_reward (instead of -step_cost), key added to the mask
+#   trap             -trap_cost (instead of -step_cost), episode ends
+#   goal (unlocked)  +success_reward (instead of -step_cost), episode ends
+# The step limit (timeout) is not part of the state, so values are for the
+# untruncated discounted task; dense shaping is potential-based and leaves the
+# optimal policy unchanged, so it is left out as well.
+# Backups are batched over maps with the same shape. V starts at the value of
+# never terminating, -step_cost / (1 - gamma), a lower bound when the agent can
+# always step back and forth, from which value iteration reaches the exact
+# values of terminating states in about as many sweeps as the longest optimal
+# path.
+
+REWARD_PARAMS = ("success_reward", "key_reward", "trap_cost", "step_cost")
+
+def reward_params(env):
+    """The reward coefficients of a GridEnv (wrappers allowed) as value_iteration kwargs."""
+    env = env.unwrapped
+    return {name: getattr(env, name) for name in REWARD_PARAMS}
+
+def build_mdp(grids, success_reward=20.0, key_reward=2.0, trap_cost=20.0, step_cost=0.01):
+    """
+    Transition and reward tensors for (N, H, W) maps.
+    Returns:
+        next_state (N, S, 4) int64, reward (N, S, 4) float64, done (N, S, 4) bool, where
+        S = H*W * 2^K and K is the largest key count in the batch.
+    """
+    grids = np.asarray(grids)
+    next_cell, cell_code, key_slot = compile_transitions(grids)
+    n, n_cells = cell_code.shape
+    n_keys = int(key_slot.max(initial=-1)) + 1
+    n_masks = 1 << n_keys
+    rows = np.arange(n)[:, None, None, None]
+    masks = np.arange(n_masks)[None, None, :, None]
+    full = ((1 << (key_slot.max(axis=1) + 1)) - 1)[:, None, None, None]
+
+    # (N, cells, masks, actions)
+    cells = np.arange(n_cells)[None, :, None, None]
+    target = next_cell[:, :, None, :]
+    code = cell_code[rows, target]
+    # Blocked moves (wall, border, locked goal) stay put and trigger nothing
+    locked = (code == CELL_GOAL) & (masks != full)
+    target = np.where(locked, cells, target)
+    code = np.where(target == cells, -1, code)
+
+    slot = key_slot[rows, target]
+    bit = np.left_shift(1, np.maximum(slot, 0))
+    new_key = (code == CELL_KEY) & ((masks & bit) == 0)
+    next_mask = np.where(new_key, masks | bit, masks)
+
+    reward = np.full(code.shape, -step_cost, dtype=np.float64)
+    reward[new_key] = key_reward
+    reward[code == CELL_TRAP] = -trap_cost
+    reward[code == CELL_GOAL] = success_reward
+    done = (code == CELL_TRAP) | (code == CELL_GOAL)
+
+    next_state = target * n_masks + next_mask
+    shape = (n, n_cells * n_masks, 4)
+    return next_state.reshape(shape), reward.reshape(shape), done.reshape(shape)
+
+def value_iteration(grids, gamma=0.99, tol=1e-6, max_iters=None, **rewards):
+    """
+    Optimal Q-values of (N, H, W) maps; `rewards` are build_mdp's reward coefficients.
+    Iterates until the largest value change is below `tol` (or `max_iters` sweeps).
+    Returns:
+        q (N, H*W, 2^K, 4) float64: q[n, cell, mask, action].
+        n_iters (int): sweeps run.
+    """
+    if not 0 <= gamma < 1:
+        raise ValueError(f"gamma must be in [0, 1), got {gamma}")
+    grids = np.asarray(grids)
+    n, height, width = grids.shape
+    next_state, reward, done = build_mdp(grids, **rewards)
+    n_states = next_state.shape[1]
+    if max_iters is None:
+        max_iters = 10 * n_states
+
+    step_cost = rewards.get("step_cost", 0.01)
+    value = np.full((n, n_states), -step_cost / (1.0 - gamma))
+    discount = np.where(done, 0.0, gamma)
+    # Indices into value.ravel(), so each sweep is a single flat gather
+    flat_next = (next_state + (np.arange(n) * n_states)[:, None, None]).astype(np.intp)
+    for n_iters in range(1, max_iters + 1):
+        q = reward + discount * value.ravel().take(flat_next)
+        new_value = q.max(axis=2)
+        delta = np.abs(new_value - value).max(initial=0.0)
+        value = new_value
+        if delta < tol:
+            break
+    return q.reshape(n, height * width, -1, 4), n_iters
+
+class MapValues:
+    """
+    Optimal Q-values of one map, looked up by GridEnv state (core/state.GridState or a GridEnv).
+    """
+    def __init__(self, grid, q, gamma):
+        self.grid = np.asarray(grid)
+        self.q = q
+        self.gamma = gamma
+        _, _, key_slot = compile_transitions(self.grid)
+        self.key_cells = np.flatnonzero(key_slot >= 0)
+
+    @classmethod
+    def solve(cls, grid, gamma=0.99, tol=1e-6, **rewards):
+        q, _ = value_iteration(np.asarray(grid)[None], gamma, tol, **rewards)
+        return cls(grid, q[0], gamma)
+
+    def state_index(self, state):
+        """(cell, mask) of a GridState or GridEnv; collected keys are those missing from its key bitboard."""
+        if hasattr(state, "get_state"):
+            state = state.unwrapped.get_state()
+        mask = 0
+        for slot, cell in enumerate(self.key_cells):
+            if not state.key_mask >> int(cell) & 1:
+                mask |= 1 << slot
+        return state.agent, mask
+
+    def q_values(self, state):
+        """(4,) optimal Q-values, indexed by Action."""
+        cell, mask = self.state_index(state)
+        return self.q[cell, mask]
+
+    def value(self, state):
+        return float(self.q_values(state).max())
+
+    def action(self, state):
+        """Optimal action (lowest Action on ties)."""
+        return int(self.q_values(state).argmax())
+
+def start_values(grids, gamma=0.99, chunk_size=256, tol=1e-6, **rewards):
+    """
+    Optimal value of the start state (no keys collected) of every map, in chunks;
+    works on memory-mapped banks.
+    Returns:
+        (N,) float64.
+    """
+    out = np.empty(len(grids))
+    for start in range(0, len(grids), chunk_size):
+        chunk = np.asarray(grids[start:start + chunk_size])
+        q, _ = value_iteration(chunk, gamma, tol, **rewards)
+        starts = (chunk.reshape(len(chunk), -1) == TileType.START).argmax(axis=1)
+        out[start:start + len(chunk)] = q[np.arange(len(chunk)), starts, 0].max(axis=1)
+    return out
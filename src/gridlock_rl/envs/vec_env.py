@@ -0,0 +1,384 @@
+import numpy as np
+from gymnasium.utils import seeding
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from gridlock_rl.core.constants import TileType, Action, CHANNEL_MAP, EVENT_NAMES
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.envs.observation import build_obs_grid
+from gridlock_rl.envs.rewards import target_distance_fields, active_targets, potential_fields
+from gridlock_rl.envs.wrappers import MetricLoggingWrapper
+
+# Event codes (index into EVENT_NAMES)
+EV_RESET, EV_MOVED, EV_NO_OP, EV_GOAL_LOCKED, EV_TRAP, EV_KEY, EV_SUCCESS, EV_TIMEOUT = range(len(EVENT_NAMES))
+
+# Row / column deltas indexed by Action
+_DR = np.zeros(len(Action), dtype=np.int64)
+_DC = np.zeros(len(Action), dtype=np.int64)
+_DR[Action.UP], _DR[Action.DOWN] = -1, 1
+_DC[Action.LEFT], _DC[Action.RIGHT] = -1, 1
+
+class GridVecEnv(VecEnv):
+    """
+    Batched GridEnv: N grids held in one (N, H, W) int8 array and advanced in a single
+    vectorized step, inside the current process.
+
+    Behaves like DummyVecEnv([GridEnv(**env_kwargs) + MetricLoggingWrapper] * N):
+    same rewards (incl. dense target tracking), info["event"] values, info["metrics"]
+    on episode end, auto-reset with info["terminal_observation"], and the same per-env
+    RNG streams (env i seeded with seed + i).
+
+    All envs share one configuration, so every grid must be width x height.
+    """
+    def __init__(self, n_envs, **env_kwargs):
+        # Template env: holds the configuration, spaces and map generator
+        self.env_template = GridEnv(**env_kwargs)
+        super().__init__(n_envs, self.env_template.observation_space, self.env_template.action_space)
+
+        self._arange = np.arange(n_envs)
+        self._rngs = [None] * n_envs
+        self._actions = None
+        self._allocate()
+
+    def _allocate(self):
+        """(Re)allocates the per-env state and observation buffers for the template's map size."""
+        t = self.env_template
+        n = self.num_envs
+        self.height, self.width = t.height, t.width
+
+        # World state
+        self.grids = np.zeros((n, t.height, t.width), dtype=np.int8)
+        self.agent_r = np.zeros(n, dtype=np.int64)
+        self.agent_c = np.zeros(n, dtype=np.int64)
+        self.keys_collected = np.zeros(n, dtype=np.int64)
+        self.total_keys = np.zeros(n, dtype=np.int64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.last_potential = np.zeros(n, dtype=np.float64)
+        self.last_target = np.full(n, -1, dtype=np.int64)
+
+        # Episode metrics (mirrors MetricLoggingWrapper)
+        self.ep_shaping = np.zeros(n, dtype=np.float64)
+        self.ep_extrinsic = np.zeros(n, dtype=np.float64)
+        self.first_key_step = np.zeros(n, dtype=np.int64) # 0 = no key yet
+        self.map_bucket = np.full(n, -1, dtype=np.int64) # difficulty bucket, -1 = not sampled by bucket
+        self.last_key_step = np.zeros(n, dtype=np.int64)
+
+        # Persistent observation buffers, patched in place every step
+        n_channels = len(CHANNEL_MAP)
+        self.obs_grid = np.zeros((n, n_channels, t.max_height, t.max_width), dtype=np.int8)
+        self.obs_keys = np.zeros((n, 1), dtype=np.int8)
+
+        # Dense shaping tables (see envs/rewards.py)
+        n_targets = t.map_generator.num_keys + 1
+        self.target_fields = np.full((n, n_targets, t.height, t.width), t.height * t.width, dtype=np.int32)
+        self.target_cells = np.full((n, n_targets), -1, dtype=np.int64)
+        self.target_is_goal = np.zeros((n, n_targets), dtype=bool)
+        self.potential_field = np.zeros((n, t.height, t.width), dtype=np.float64)
+        self.target_field = np.full((n, t.height, t.width), -1, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # VecEnv API
+    # ------------------------------------------------------------------
+    def reset(self):
+        self._reset_envs(self._arange, seeds=self._seeds, options=self._options)
+        # Seeds and options are only used once
+        self._reset_seeds()
+        self._reset_options()
+        return self._get_obs()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        t = self.env_template
+        a = self._actions
+        idx = self._arange
+        self.steps += 1
+
+        # 1. Calculate new positions
+        r, c = self.agent_r, self.agent_c
+        nr = r + _DR[a]
+        nc = c + _DC[a]
+
+        # 2. Validation (Bounds, Walls, Locked Goal)
+        in_bounds = (nr >= 0) & (nr < self.height) & (nc >= 0) & (nc < self.width)
+        nr = np.where(in_bounds, nr, r)
+        nc = np.where(in_bounds, nc, c)
+        tile = self.grids[idx, nr, nc]
+        blocked = ~in_bounds | (tile == TileType.WALL)
+        locked = ~blocked & (tile == TileType.GOAL) & (self.keys_collected < self.total_keys)
+        valid = ~(blocked | locked)
+
+        # 3. Interactions
+        trap = valid & (tile == TileType.TRAP)
+        key = valid & (tile == TileType.KEY)
+        success = valid & (tile == TileType.GOAL)
+        terminated = trap | success
+
+        event = np.full(self.num_envs, EV_MOVED, dtype=np.int64)
+        event[blocked] = EV_NO_OP
+        event[locked] = EV_GOAL_LOCKED
+        event[trap] = EV_TRAP
+        event[key] = EV_KEY
+        event[success] = EV_SUCCESS
+
+        reward = np.full(self.num_envs, -t.step_cost, dtype=np.float64)
+        extrinsic = reward.copy()
+        reward[trap] = -t.trap_cost
+        extrinsic[trap] += -t.trap_cost
+        reward[key] = t.key_reward
+        extrinsic[key] += t.key_reward
+        reward[success] = t.success_reward
+        extrinsic[success] += t.success_reward
+
+        # Move agents (obs agent channel patched in place)
+        agent_ch = CHANNEL_MAP["agent"]
+        self.obs_grid[idx, agent_ch, r, c] = 0
+        self.agent_r = np.where(valid, nr, r)
+        self.agent_c = np.where(valid, nc, c)
+        self.obs_grid[idx, agent_ch, self.agent_r, self.agent_c] = 1
+
+        # Remove collected keys
+        if key.any():
+            k_idx = idx[key]
+            self.grids[k_idx, nr[key], nc[key]] = TileType.EMPTY
+            self.obs_grid[k_idx, CHANNEL_MAP["key"], nr[key], nc[key]] = 0
+            self.keys_collected[key] += 1
+            self.obs_keys[key, 0] = self.keys_collected[key]
+            if t.use_dense_reward:
+                self._update_potential_fields(k_idx)
+
+        # 3.5 Dense Reward Shaping (same target tracking as GridEnv.step)
+        shaping = np.zeros(self.num_envs, dtype=np.float64)
+        if t.use_dense_reward:
+            active = idx[~terminated]
+            if len(active):
+                potential, target = self._compute_potential(active)
+                rebase = key[active] | (target != self.last_target[active])
+                last = np.where(rebase, potential, self.last_potential[active])
+                shaping[active] = potential - last
+                reward[active] += shaping[active]
+                self.last_potential[active] = potential
+                self.last_target[active] = target
+
+        # 4. Truncation
+        truncated = self.steps >= t.max_steps
+        timeout = truncated & ~terminated
+        reward[timeout] -= t.timeout_penalty
+        extrinsic[timeout] -= t.timeout_penalty
+        event[timeout] = EV_TIMEOUT
+
+        # Episode metrics
+        self.ep_shaping += shaping
+        self.ep_extrinsic += extrinsic
+        first_key = key & (self.first_key_step == 0)
+        self.first_key_step[first_key] = self.steps[first_key]
+        self.last_key_step[key] = self.steps[key]
+
+        dones = terminated | truncated
+        infos = self._make_infos(event, shaping, extrinsic, timeout)
+        obs = self._get_obs()
+
+        # 5. Auto-reset finished envs
+        if dones.any():
+            done_idx = idx[dones]
+            for i in done_idx:
+                info = infos[i]
+                info["metrics"] = self._episode_metrics(i, event[i])
+                info["terminal_observation"] = {
+                    "grid": obs["grid"][i].copy(),
+                    "keys_collected": obs["keys_collected"][i].copy()
+                }
+            self._reset_envs(done_idx)
+            obs["grid"][done_idx] = self.obs_grid[done_idx]
+            obs["keys_collected"][done_idx] = self.obs_keys[done_idx]
+
+        return obs, reward.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        """Configuration attributes are shared by all envs and read from the template GridEnv."""
+        return [getattr(self.env_template, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        """Sets a configuration attribute on the template GridEnv (applies to all envs)."""
+        setattr(self.env_template, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        if method_name == "configure":
+            return [self.configure(*method_args, **method_kwargs)] * len(self._get_indices(indices))
+        method = getattr(self.env_template, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def configure(self, **params):
+        """
+        GridEnv.configure for all envs at once (they share the template). Buffers are
+        reallocated for the new map size, so the envs must be reset before stepping again.
+        """
+        params = self.env_template.configure(**params)
+        self._allocate()
+        return params
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        # Episode metrics are produced natively, as MetricLoggingWrapper would
+        return [wrapper_class is MetricLoggingWrapper for _ in self._get_indices(indices)]
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _reset_envs(self, env_indices, seeds=None, options=None):
+        """Loads new maps for `env_indices` and re-initializes their state and obs buffers."""
+        t = self.env_template
+        for j, i in enumerate(env_indices):
+            seed = seeds[i] if seeds is not None else None
+            if seed is not None or self._rngs[i] is None:
+                self._rngs[i], _ = seeding.np_random(seed)
+            opts = options[i] if options is not None else None
+            self.map_bucket[i] = -1
+            if opts and "grid" in opts:
+                grid = np.array(opts["grid"], dtype=np.int8)
+            else:
+                grid = t._sample_grid(self._rngs[i])
+                if t.map_bucket is not None:
+                    self.map_bucket[i] = t.map_bucket
+            if grid.shape != (self.height, self.width):
+                raise ValueError(f"Grid shape {grid.shape} does not match env size {(self.height, self.width)}")
+            self.grids[i] = grid
+
+        grids = self.grids[env_indices]
+        start = (grids == TileType.START).reshape(len(env_indices), -1)
+        if not start.any(axis=1).all():
+            raise ValueError("Map missing START tile")
+        start_flat = start.argmax(axis=1)
+        self.agent_r[env_indices] = start_flat // self.width
+        self.agent_c[env_indices] = start_flat % self.width
+        self.total_keys[env_indices] = np.count_nonzero((grids == TileType.KEY).reshape(len(env_indices), -1), axis=1)
+        self.keys_collected[env_indices] = 0
+        self.steps[env_indices] = 0
+
+        if t.use_dense_reward:
+            self._init_potential_fields(env_indices)
+            self.last_potential[env_indices], self.last_target[env_indices] = self._compute_potential(env_indices)
+        else:
+            self.last_potential[env_indices] = 0.0
+            self.last_target[env_indices] = -1
+
+        self.ep_shaping[env_indices] = 0.0
+        self.ep_extrinsic[env_indices] = 0.0
+        self.first_key_step[env_indices] = 0
+        self.last_key_step[env_indices] = 0
+
+        # Rebuild observation buffers
+        obs = build_obs_grid(grids, self.obs_grid[env_indices])
+        obs[np.arange(len(env_indices)), CHANNEL_MAP["agent"], self.agent_r[env_indices], self.agent_c[env_indices]] = 1
+        self.obs_grid[env_indices] = obs
+        self.obs_keys[env_indices] = 0
+
+        for i in env_indices:
+            self.reset_infos[i] = self._info(i, EV_RESET, 0.0, 0.0)
+            if self.map_bucket[i] >= 0:
+                self.reset_infos[i]["difficulty_bucket"] = int(self.map_bucket[i])
+
+    def _init_potential_fields(self, env_indices):
+        """Per-target BFS distance fields for freshly reset envs (see envs/rewards.py)."""
+        fields, cells, is_goal = target_distance_fields(self.grids[env_indices])
+        n_targets = fields.shape[1]
+        if n_targets > self.target_fields.shape[1]:
+            # Grow target slots (e.g. a custom grid with more keys than configured)
+            pad = n_targets - self.target_fields.shape[1]
+            unreachable = self.height * self.width
+            self.target_fields = np.concatenate([
+                self.target_fields,
+                np.full((self.num_envs, pad, self.height, self.width), unreachable, dtype=np.int32)
+            ], axis=1)
+            self.target_cells = np.concatenate([self.target_cells, np.full((self.num_envs, pad), -1)], axis=1)
+            self.target_is_goal = np.concatenate([self.target_is_goal, np.zeros((self.num_envs, pad), dtype=bool)], axis=1)
+
+        self.target_fields[env_indices] = self.height * self.width
+        self.target_cells[env_indices] = -1
+        self.target_is_goal[env_indices] = False
+        self.target_fields[env_indices, :n_targets] = fields
+        self.target_cells[env_indices, :n_targets] = cells
+        self.target_is_goal[env_indices, :n_targets] = is_goal
+        self._update_potential_fields(env_indices)
+
+    def _update_potential_fields(self, env_indices):
+        """Rebuilds potential / nearest-target lookup tables (on reset and key pickup)."""
+        cells = self.target_cells[env_indices]
+        active = active_targets(
+            self.grids[env_indices], cells, self.target_is_goal[env_indices],
+            self.keys_collected[env_indices], self.total_keys[env_indices]
+        )
+        potential, target = potential_fields(self.target_fields[env_indices], cells, active)
+        self.potential_field[env_indices] = potential
+        self.target_field[env_indices] = target
+
+    def _compute_potential(self, env_indices):
+        """
+        Batched GridEnv._compute_potential: array lookup of -BFS distance to the nearest
+        active target. Returns (potential, target) where target is the flat cell index of
+        that target, or -1 if there is none.
+        """
+        r = self.agent_r[env_indices]
+        c = self.agent_c[env_indices]
+        return self.potential_field[env_indices, r, c], self.target_field[env_indices, r, c]
+
+    def _get_obs(self):
+        return {
+            "grid": self.obs_grid.copy(),
+            "keys_collected": self.obs_keys.copy()
+        }
+
+    def _info(self, i, event, shaping, extrinsic):
+        return {
+            "event": EVENT_NAMES[event],
+            "keys_collected": int(self.keys_collected[i]),
+            "steps": int(self.steps[i]),
+            "total_keys": int(self.total_keys[i]),
+            "shaping_reward": float(shaping),
+            "extrinsic_reward": float(extrinsic)
+        }
+
+    def _make_infos(self, event, shaping, extrinsic, timeout):
+        names = [EVENT_NAMES[e] for e in event.tolist()]
+        timeout = timeout.tolist()
+        keys = self.keys_collected.tolist()
+        steps = self.steps.tolist()
+        totals = self.total_keys.tolist()
+        shaping = shaping.tolist()
+        extrinsic = extrinsic.tolist()
+        return [
+            {
+                "event": names[i],
+                "keys_collected": keys[i],
+                "steps": steps[i],
+                "total_keys": totals[i],
+                "shaping_reward": shaping[i],
+                "extrinsic_reward": extrinsic[i],
+                "TimeLimit.truncated": timeout[i]
+            }
+            for i in range(self.num_envs)
+        ]
+
+    def _episode_metrics(self, i, event):
+        """Same dict MetricLoggingWrapper puts in info["metrics"] at episode end."""
+        metrics = {
+            "keys_collected": int(self.keys_collected[i]),
+            "shaping_reward_sum": float(self.ep_shaping[i]),
+            "extrinsic_reward_sum": float(self.ep_extrinsic[i]),
+            "episode_steps": int(self.steps[i]),
+        }
+        if self.first_key_step[i] > 0:
+            metrics["first_key_step"] = int(self.first_key_step[i])
+        if event == EV_SUCCESS:
+            time_to_goal = 0
+            if self.last_key_step[i] > 0:
+                time_to_goal = int(self.steps[i] - self.last_key_step[i])
+            metrics["time_after_last_key_to_goal"] = time_to_goal
+            metrics["is_success"] = 1.0
+        else:
+            metrics["is_success"] = 0.0
+        if self.map_bucket[i] >= 0:
+            metrics["difficulty_bucket"] = int(self.map_bucket[i])
+        return metrics
@@ -1,3 +1,4 @@
+import time
 import gymnasium as gym
 import numpy as np
 
@@ -10,9 +11,11 @@ class MetricLoggingWrapper(gym.Wrapper):
     - time_after_last_key_to_goal: steps from last key to goal (if success).
     - shaping_reward_sum: Cumulative shaping reward.
     - extrinsic_reward_sum: Cumulative extrinsic reward.
+    - difficulty_bucket: Bucket of the episode's map (difficulty sampling only).
     """
     def __init__(self, env):
         super().__init__(env)
+        self.difficulty_bucket = None
         self.reset_metrics()
         
     def reset_metrics(self):
@@ -25,7 +28,9 @@ class MetricLoggingWrapper(gym.Wrapper):
         
     def reset(self, **kwargs):
         self.reset_metrics()
-        return self.env.reset(**kwargs)
+        obs, info = self.env.reset(**kwargs)
+        self.difficulty_bucket = info.get("difficulty_bucket")
+        return obs, info
         
     def step(self, action):
         obs, reward, terminated, truncated, info = self.env.step(action)
@@ -68,6 +73,9 @@ class MetricLoggingWrapper(gym.Wrapper):
                 metrics["is_success"] = 1.0
             else:
                 metrics["is_success"] = 0.0
+
+            if self.difficulty_bucket is not None:
+                metrics["difficulty_bucket"] = self.difficulty_bucket
                 
             # Add to info
             info["metrics"] = metrics
@@ -79,3 +87,30 @@ class MetricLoggingWrapper(gym.Wrapper):
             # We will rely on a Callback to extract info['metrics'].
             
         return obs, reward, terminated, truncated, info
+
+class StepTimingWrapper(gym.Wrapper):
+    """
+    Wrapper to measure per-worker step latency for throughput telemetry.
+    Adds to every step's info:
+    - step_time_ns: time spent inside env.step.
+    - idle_time_ns: time since the previous step returned, i.e. waiting on the
+      learner (policy inference, other workers). 0 on the first step after reset.
+    Costs two clock reads per step.
+    """
+    def __init__(self, env):
+        super().__init__(env)
+        self.last_step_end = None
+
+    def reset(self, **kwargs):
+        result = self.env.reset(**kwargs)
+        self.last_step_end = time.perf_counter_ns()
+        return result
+
+    def step(self, action):
+        start = time.perf_counter_ns()
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        end = time.perf_counter_ns()
+        info["step_time_ns"] = end - start
+        info["idle_time_ns"] = start - self.last_step_end if self.last_step_end is not None else 0
+        self.last_step_end = end
+        return obs, reward, terminated, truncated, info
@@ -0,0 +1,227 @@
+import os
+import hashlib
+import numpy as np
+import yaml
+from multiprocessing import Pool
+
+from gridlock_rl.maps.encoding import (PACKED_ENCODING, MapIndex, PackedGrids, canonical_hash, first_occurrence,
+                                       pack_grids, packed_size)
+from gridlock_rl.maps.generator import MapGenerator
+
+GRIDS_FILE = "grids.npy"
+PACKED_FILE = "grids_packed.npy"
+SEEDS_FILE = "seeds.npy"
+META_FILE = "meta.yaml"
+FORMAT_VERSION = 1
+
+class MapBank:
+    """
+    Read-only bank of pre-validated maps stored as a directory:
+        grids.npy  - (N, H, W) int8 tile array, opened as a memory map
+        meta.yaml  - generator config, build info and content hash
+        seeds.npy  - (N,) int64 env seed of each map (optional, benchmark bundles)
+    Packed banks (meta encoding: packed3) hold grids_packed.npy, (N, packed_size) uint8
+    at 3 bits per tile, instead of grids.npy; `grids` is then a PackedGrids view that
+    decodes on access, and the content hash is that of the decoded maps.
+
+    Indexing returns a private copy of one map, so a reset costs one slice read.
+    Every process that opens the same bank shares its pages through the OS page cache.
+    """
+    def __init__(self, path, mmap=True):
+        self.path = path
+        with open(os.path.join(path, META_FILE), "r") as f:
+            self.meta = yaml.safe_load(f)
+        mmap_mode = "r" if mmap else None
+        if self.meta.get("encoding") == PACKED_ENCODING:
+            height, width = self.meta["shape"]
+            self.grids = PackedGrids(np.load(os.path.join(path, PACKED_FILE), mmap_mode=mmap_mode), height, width)
+        else:
+            self.grids = np.load(os.path.join(path, GRIDS_FILE), mmap_mode=mmap_mode)
+        if self.grids.ndim != 3 or self.grids.dtype != np.int8:
+            raise ValueError(f"Invalid map bank grids in {path}: {self.grids.dtype} {self.grids.shape}")
+        seeds_path = os.path.join(path, SEEDS_FILE)
+        self.seeds = np.load(seeds_path) if os.path.exists(seeds_path) else None
+
+    @property
+    def config(self):
+        return self.meta["config"]
+
+    @property
+    def packed(self):
+        return isinstance(self.grids, PackedGrids)
+
+    @property
+    def height(self):
+        return self.grids.shape[1]
+
+    @property
+    def width(self):
+        return self.grids.shape[2]
+
+    def __len__(self):
+        return self.grids.shape[0]
+
+    def __getitem__(self, idx):
+        return np.array(self.grids[idx])
+
+    def verify(self):
+        """True if the stored maps (and seeds) still match the content hash in meta.yaml."""
+        return self.meta.get("content_hash") == content_hash(self.grids, self.seeds)
+
+def content_hash(grids, seeds=None, chunk_size=65536):
+    """
+    sha256 hex digest of a bank's contents: grid shape and tiles, then seeds if present.
+    Reads `grids` in chunks so memory-mapped banks are never loaded whole.
+    """
+    h = hashlib.sha256()
+    h.update(np.asarray(grids.shape, dtype=np.int64).tobytes())
+    for start in range(0, len(grids), chunk_size):
+        h.update(np.ascontiguousarray(grids[start:start + chunk_size], dtype=np.int8).tobytes())
+    if seeds is not None:
+        h.update(np.ascontiguousarray(seeds, dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+def save_bank(path, grids, config, seeds=None, packed=False, **meta):
+    """
+    Writes `grids` ((N, H, W) int8) as a map bank at `path`.
+    `config` is the MapGenerator config; `seeds` optionally records the env seed of each map.
+    With `packed`, tiles are stored at 3 bits each (see maps/encoding.py).
+    Extra keyword args are stored in meta.yaml.
+    """
+    grids = np.asarray(grids, dtype=np.int8)
+    os.makedirs(path, exist_ok=True)
+    if packed:
+        np.save(os.path.join(path, PACKED_FILE), pack_grids(grids))
+        meta.update(_packed_meta(grids.shape[1], grids.shape[2]))
+    else:
+        np.save(os.path.join(path, GRIDS_FILE), grids)
+    if seeds is not None:
+        seeds = np.asarray(seeds, dtype=np.int64)
+        if seeds.shape != (len(grids),):
+            raise ValueError(f"Expected {len(grids)} seeds, got shape {seeds.shape}")
+        np.save(os.path.join(path, SEEDS_FILE), seeds)
+    meta["content_hash"] = content_hash(grids, seeds)
+    _write_meta(path, len(grids), config, meta)
+
+def _packed_meta(height, width):
+    return {"encoding": PACKED_ENCODING, "shape": [int(height), int(width)]}
+
+def _open_output(path, n_maps, height, width, packed):
+    """
+    Preallocated .npy memmap for a bank of `n_maps` maps.
+    Returns:
+        out (np.memmap), grids (int8 grid view of out), encode (grids -> rows of out).
+    """
+    os.makedirs(path, exist_ok=True)
+    if packed:
+        out = np.lib.format.open_memmap(
+            os.path.join(path, PACKED_FILE), mode="w+", dtype=np.uint8, shape=(n_maps, packed_size(height, width))
+        )
+        return out, PackedGrids(out, height, width), pack_grids
+    out = np.lib.format.open_memmap(
+        os.path.join(path, GRIDS_FILE), mode="w+", dtype=np.int8, shape=(n_maps, height, width)
+    )
+    return out, out, lambda grids: grids
+
+def _write_meta(path, count, config, extra):
+    meta = {"format_version": FORMAT_VERSION, "count": int(count), "config": dict(config)}
+    meta.update(extra)
+    with open(os.path.join(path, META_FILE), "w") as f:
+        yaml.dump(meta, f)
+
+def _generate_chunk(args):
+    config, seed, chunk_index, n = args
+    grids, _ = MapGenerator(**config).generate_batch(n, seed=[seed, chunk_index])
+    return grids
+
+def build_bank(path, n_maps, config, seed=0, chunk_size=4096, workers=1, exclude=None, dedup=False, packed=False):
+    """
+    Generates `n_maps` validated maps into a bank at `path`.
+    Chunk j is MapGenerator(**config).generate_batch(chunk_size, seed=[seed, j]), so a bank
+    is reproducible for a given (seed, chunk_size) and independent of `workers`. Grids are
+    streamed into a preallocated .npy memmap, keeping memory bounded for multi-million map banks.
+    Filtering (see maps/encoding.py) drops maps whose canonical hash is in `exclude` (a MapIndex,
+    e.g. of the benchmark bundles) and, with `dedup`, repeats of an earlier map up to symmetry;
+    further chunks are generated until `n_maps` maps are kept.
+    With `packed`, the bank is stored at 3 bits per tile (grids_packed.npy).
+    """
+    if exclude is not None or dedup:
+        return _build_filtered_bank(path, n_maps, config, seed, chunk_size, workers, exclude, dedup, packed)
+    config = dict(config)
+    height, width = config.get("height", 8), config.get("width", 8)
+    out, out_grids, encode = _open_output(path, n_maps, height, width, packed)
+
+    chunks = [
+        (config, seed, j, min(chunk_size, n_maps - start))
+        for j, start in enumerate(range(0, n_maps, chunk_size))
+    ]
+    if workers > 1:
+        with Pool(workers) as pool:
+            results = pool.imap(_generate_chunk, chunks)
+            _fill(out, results, chunk_size, encode)
+    else:
+        _fill(out, map(_generate_chunk, chunks), chunk_size, encode)
+
+    out.flush()
+    digest = content_hash(out_grids)
+    del out, out_grids
+    meta = {"seed": int(seed), "chunk_size": int(chunk_size), "content_hash": digest}
+    if packed:
+        meta.update(_packed_meta(height, width))
+    _write_meta(path, n_maps, config, meta)
+    return MapBank(path)
+
+def _build_filtered_bank(path, n_maps, config, seed, chunk_size, workers, exclude, dedup, packed):
+    config = dict(config)
+    height, width = config.get("height", 8), config.get("width", 8)
+    out, out_grids, encode = _open_output(path, n_maps, height, width, packed)
+    seen = MapIndex()
+    count = excluded = duplicates = 0
+    next_chunk = 0
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        while count < n_maps:
+            # One round of chunks per worker; chunks are consumed in index order
+            chunks = [(config, seed, next_chunk + k, chunk_size) for k in range(max(1, workers))]
+            next_chunk += len(chunks)
+            results = pool.map(_generate_chunk, chunks) if pool else map(_generate_chunk, chunks)
+            round_start = count
+            for grids in results:
+                hashes = canonical_hash(grids)
+                keep = np.ones(len(grids), dtype=bool)
+                if exclude is not None:
+                    keep &= ~exclude.contains(hashes)
+                    excluded += int((~keep).sum())
+                if dedup:
+                    fresh = keep & first_occurrence(hashes) & ~seen.contains(hashes)
+                    duplicates += int((keep & ~fresh).sum())
+                    keep = fresh
+                grids, hashes = grids[keep][:n_maps - count], hashes[keep][:n_maps - count]
+                if dedup:
+                    seen.add(hashes)
+                out[count:count + len(grids)] = encode(grids)
+                count += len(grids)
+            if count == round_start:
+                raise RuntimeError(f"No new maps in chunks up to {next_chunk}: only {count} distinct maps "
+                                   f"found for config {config}")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    out.flush()
+    digest = content_hash(out_grids)
+    del out, out_grids
+    meta = {
+        "seed": int(seed), "chunk_size": int(chunk_size), "content_hash": digest,
+        "filter": {"dedup": bool(dedup), "exclude_size": len(exclude) if exclude is not None else 0,
+                   "excluded": excluded, "duplicates": duplicates, "chunks": next_chunk}
+    }
+    if packed:
+        meta.update(_packed_meta(height, width))
+    _write_meta(path, n_maps, config, meta)
+    return MapBank(path)
+
+def _fill(out, results, chunk_size, encode):
+    for i, grids in enumerate(results):
+        out[i * chunk_size:i * chunk_size + len(grids)] = encode(grids)
@@ -0,0 +1,103 @@
+import os
+import time
+import numpy as np
+import yaml
+from multiprocessing import Pool
+from gymnasium.utils import seeding
+
+from gridlock_rl.maps.bank import MapBank, save_bank
+
+# Benchmark bundles are map banks that also store the env seed of every map
+# (see MapBank). Map i is exactly the grid GridEnv(**config).reset(seed=seeds[i])
+# produced when the bundle was built, so evaluation replays the stored grids and
+# never depends on the current generator code.
+
+def _generate_shard(args):
+    """Grids for the candidate seeds [first_seed, first_seed + n); seeds whose generation fails are skipped."""
+    from gridlock_rl.envs.grid_env import GridEnv
+
+    config, first_seed, n = args
+    env = GridEnv(**config)
+    seeds, grids = [], []
+    for seed in range(first_seed, first_seed + n):
+        rng, _ = seeding.np_random(seed)
+        try:
+            # Same draw as GridEnv.reset(seed=seed)
+            grids.append(env._sample_grid(rng))
+        except RuntimeError:
+            continue
+        seeds.append(seed)
+    return seeds, grids
+
+def build_benchmark(path, n_maps, config, start_seed=0, workers=1, shard_size=256, packed=False):
+    """
+    Generates a benchmark bundle of `n_maps` maps at `path` and returns it as a MapBank.
+    Candidate seeds start_seed, start_seed + 1, ... are split into shards of `shard_size`
+    consecutive seeds; shards are generated in parallel and merged in seed order, keeping
+    the first `n_maps` seeds that produce a map. The result does not depend on `workers`.
+    `config` holds GridEnv generator settings (width, height, trap_density, num_keys, min_traps).
+    `packed` stores the maps at 3 bits per tile (see MapBank).
+    """
+    config = dict(config)
+    seeds, grids = [], []
+    next_seed = start_seed
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        while len(seeds) < n_maps:
+            # One round of shards per worker, sized to what is still missing
+            n_shards = max(1, min(workers, -(-(n_maps - len(seeds)) // shard_size)))
+            shards = [(config, next_seed + k * shard_size, shard_size) for k in range(n_shards)]
+            next_seed += n_shards * shard_size
+            results = pool.map(_generate_shard, shards) if pool else map(_generate_shard, shards)
+            for shard_seeds, shard_grids in results:
+                seeds.extend(shard_seeds)
+                grids.extend(shard_grids)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    seeds, grids = seeds[:n_maps], grids[:n_maps]
+    grids = np.stack(grids) if grids else np.zeros((0, config.get("height", 8), config.get("width", 8)), dtype=np.int8)
+    save_bank(path, grids, config, seeds=seeds, packed=packed, start_seed=int(start_seed), shard_size=int(shard_size))
+    return MapBank(path)
+
+def generate_benchmark(n_maps=100, output_path="data/benchmarks/id", seeds_path="configs/maps/benchmark_seeds.yaml",
+                       workers=1):
+    """Builds the in-distribution benchmark (8x8, 0.1 traps) and its legacy seed list."""
+    print(f"Generating {n_maps} benchmark maps into {output_path}...")
+
+    # Bundle stores the grids themselves (plus seeds and a content hash), so evaluation
+    # replays these exact maps even if the generator changes later.
+    config = {"width": 8, "height": 8, "trap_density": 0.1}
+    start_time = time.time()
+    bundle = build_benchmark(output_path, n_maps, config, start_seed=0, workers=workers)
+    print(f"Saved {len(bundle)} maps in {time.time() - start_time:.1f}s (hash {bundle.meta['content_hash'][:12]})")
+
+    # Legacy seed list for tools that still regenerate maps from seeds
+    if seeds_path:
+        os.makedirs(os.path.dirname(seeds_path), exist_ok=True)
+        with open(seeds_path, "w") as f:
+            yaml.dump({"seeds": bundle.seeds.tolist()}, f)
+        print(f"Saved {len(bundle)} seeds to {seeds_path}")
+    return bundle
+
+def generate_ood(n_maps=50, output_path="data/benchmarks/ood", seeds_path="configs/maps/benchmark_ood_seeds.yaml",
+                 workers=1):
+    """Builds the out-of-distribution benchmark (10x10, 0.15 traps) and its legacy seed list."""
+    print(f"Generating {n_maps} OOD benchmark maps (10x10, 0.15 Traps) into {output_path}...")
+
+    # OOD Settings: Harder than anything seen in training
+    config = {"width": 10, "height": 10, "trap_density": 0.15}
+
+    start_time = time.time()
+    bundle = build_benchmark(output_path, n_maps, config, start_seed=10000, workers=workers) # Start far from ID seeds
+    print(f"Saved {len(bundle)} maps in {time.time() - start_time:.1f}s (hash {bundle.meta['content_hash'][:12]})")
+
+    # Legacy seed list for tools that still regenerate maps from seeds
+    if seeds_path:
+        os.makedirs(os.path.dirname(seeds_path), exist_ok=True)
+        with open(seeds_path, "w") as f:
+            yaml.dump({"seeds": bundle.seeds.tolist(), "config": config}, f)
+        print(f"Saved {len(bundle)} OOD seeds to {seeds_path}")
+    return bundle
@@ -0,0 +1,225 @@
+import os
+import numpy as np
+
+from gridlock_rl.core.constants import TileType
+from gridlock_rl.maps.solver import UNREACHABLE, _legs, _held_karp
+from gridlock_rl.maps.validation import distance_fields
+
+# Per-map difficulty features and a bucketed difficulty index for map banks.
+# Features come from the exact solver (maps/solver.py), batched over maps:
+#   optimal_length  optimal episode length (-1 if unsolvable)
+#   route_cells     cells on some shortest path of a leg, following the optimal key order
+#   trap_adjacent   route cells next to a trap (one slip ends the episode)
+#   choke_points    leg steps every shortest path must take through the same cell
+#   key_spread      mean pairwise Manhattan distance between keys
+#   detour          optimal_length minus the Manhattan length of the same key order
+# The difficulty score averages the percentile ranks of SCORE_FEATURES within the map
+# set; maps are cut into equal-size buckets by score. Unsolvable maps get bucket -1
+# and are never sampled.
+
+FEATURES = ("optimal_length", "route_cells", "trap_adjacent", "choke_points", "key_spread", "detour")
+SCORE_FEATURES = ("optimal_length", "trap_adjacent", "choke_points", "detour")
+DIFFICULTY_FILE = "difficulty.npz"
+
+def _optimal_order(dp, last, fields, keys):
+    """(N, K) key slots in optimal collection order, from the Held-Karp table."""
+    n, n_keys = keys.shape
+    rows = np.arange(n)
+    flat = fields.reshape(n, n_keys + 1, -1)
+    # between[:, i, j]: key i -> key j
+    between = flat[rows[:, None, None], np.arange(n_keys)[None, None, :], keys[:, :, None]]
+    bits = 1 << np.arange(n_keys)
+    order = np.empty((n, n_keys), dtype=np.int64)
+    mask = np.full(n, (1 << n_keys) - 1)
+    j = last
+    for step in range(n_keys - 1, -1, -1):
+        order[:, step] = j
+        prev = mask ^ bits[j]
+        cost = dp[rows, prev, :] + between[rows, :, j]
+        cost[(prev[:, None] & bits) == 0] = UNREACHABLE * 2
+        mask, j = prev, cost.argmin(axis=1)
+    return order
+
+def _features_chunk(grids):
+    n, h, w = grids.shape
+    fields, starts, keys, goals = _legs(grids)
+    lengths, dp, last = _held_karp(fields, starts, keys, goals)
+    solved = lengths >= 0
+    n_keys = keys.shape[1]
+    flat_fields = fields.reshape(n, n_keys + 1, -1)
+    rows = np.arange(n)
+
+    # Leg endpoints in route order: start -> keys (optimal order) -> goal
+    order = _optimal_order(dp, last, fields, keys) if n_keys else np.zeros((n, 0), dtype=np.int64)
+    blocked = (grids == TileType.WALL) | (grids == TileType.TRAP) | (grids == TileType.GOAL)
+    start_mask = np.zeros((n, h * w), dtype=bool)
+    start_mask[rows, starts] = True
+    start_field = distance_fields(start_mask.reshape(n, h, w), ~blocked).reshape(n, -1).astype(np.int64)
+    start_field[start_field < 0] = UNREACHABLE
+    src_fields = [start_field] + [flat_fields[rows, order[:, k]] for k in range(n_keys)]
+    dst_fields = [flat_fields[rows, order[:, k]] for k in range(n_keys)] + [flat_fields[:, n_keys]]
+    cells = [starts] + [keys[rows, order[:, k]] for k in range(n_keys)] + [goals]
+
+    route = np.zeros((n, h * w), dtype=bool)
+    choke_points = np.zeros(n, dtype=np.int64)
+    manhattan = np.zeros(n, dtype=np.int64)
+    for leg, (src, dst) in enumerate(zip(src_fields, dst_fields)):
+        a, b = cells[leg], cells[leg + 1]
+        length = dst[rows, a]
+        on_path = (src + dst == length[:, None]) & solved[:, None]
+        route |= on_path
+        # A layer (distance from the leg start) with a single on-path cell is forced
+        layer = np.where(on_path, src, h * w + 1) + rows[:, None] * (h * w + 2)
+        counts = np.bincount(layer.ravel(), minlength=n * (h * w + 2)).reshape(n, h * w + 2)
+        inner = (np.arange(h * w + 2)[None, :] > 0) & (np.arange(h * w + 2)[None, :] < length[:, None])
+        choke_points += ((counts == 1) & inner).sum(axis=1)
+        ar, ac = np.divmod(a, w)
+        br, bc = np.divmod(b, w)
+        manhattan += np.abs(ar - br) + np.abs(ac - bc)
+
+    traps = grids == TileType.TRAP
+    near_trap = np.zeros_like(traps)
+    near_trap[:, 1:, :] |= traps[:, :-1, :]
+    near_trap[:, :-1, :] |= traps[:, 1:, :]
+    near_trap[:, :, 1:] |= traps[:, :, :-1]
+    near_trap[:, :, :-1] |= traps[:, :, 1:]
+
+    # Keys padded with the start cell (maps with fewer keys) are not counted
+    is_key = grids.reshape(n, -1)[rows[:, None], keys] == TileType.KEY
+    kr, kc = np.divmod(keys, w)
+    pair_dist = np.abs(kr[:, :, None] - kr[:, None, :]) + np.abs(kc[:, :, None] - kc[:, None, :])
+    pairs = is_key[:, :, None] & is_key[:, None, :] & ~np.eye(n_keys, dtype=bool)
+    n_pairs = pairs.sum(axis=(1, 2))
+    key_spread = np.where(n_pairs > 0, (pair_dist * pairs).sum(axis=(1, 2)) / np.maximum(n_pairs, 1), 0.0)
+
+    return {
+        "optimal_length": lengths,
+        "route_cells": np.where(solved, route.sum(axis=1), -1),
+        "trap_adjacent": np.where(solved, (route & near_trap.reshape(n, -1)).sum(axis=1), -1),
+        "choke_points": np.where(solved, choke_points, -1),
+        "key_spread": key_spread,
+        "detour": np.where(solved, lengths - manhattan, -1),
+    }
+
+def compute_features(grids, chunk_size=4096):
+    """
+    Difficulty features (see FEATURES) for (N, H, W) maps, computed in chunks.
+    Returns:
+        dict: feature name -> (N,) array; -1 for solver-based features of unsolvable maps.
+    """
+    out = {}
+    for start in range(0, len(grids), chunk_size):
+        chunk = _features_chunk(np.asarray(grids[start:start + chunk_size]))
+        for name, values in chunk.items():
+            out.setdefault(name, []).append(values)
+    if not out:
+        return {name: np.zeros(0) for name in FEATURES}
+    return {name: np.concatenate(values) for name, values in out.items()}
+
+def difficulty_score(features):
+    """Mean percentile rank (0 = easiest, 1 = hardest) of SCORE_FEATURES over solvable maps; -1 if unsolvable."""
+    solved = features["optimal_length"] >= 0
+    score = np.full(len(solved), -1.0)
+    n = int(solved.sum())
+    if n == 0:
+        return score
+    ranks = []
+    for name in SCORE_FEATURES:
+        values = features[name][solved]
+        # Average rank of ties, scaled to [0, 1]
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order]
+        first = np.searchsorted(sorted_values, values, side="left")
+        last = np.searchsorted(sorted_values, values, side="right") - 1
+        ranks.append((first + last) / 2 / max(n - 1, 1))
+    score[solved] = np.mean(ranks, axis=0)
+    return score
+
+def assign_buckets(score, n_buckets):
+    """
+    Equal-size buckets by score quantile.
+    Returns:
+        buckets (N,) int64: 0 (easiest) .. n_buckets - 1, -1 for unsolvable maps.
+        edges (n_buckets - 1,) float64: score thresholds between buckets.
+    """
+    solved = score >= 0
+    if not solved.any():
+        return np.full(len(score), -1, dtype=np.int64), np.zeros(n_buckets - 1)
+    edges = np.quantile(score[solved], np.arange(1, n_buckets) / n_buckets)
+    buckets = np.searchsorted(edges, score, side="right").astype(np.int64)
+    buckets[~solved] = -1
+    return buckets, edges
+
+class DifficultyIndex:
+    """
+    Difficulty features, scores and buckets of every map in a bank, stored as
+    <bank>/difficulty.npz. members[b] lists the bank indices in bucket b.
+    """
+    def __init__(self, features, score, buckets, edges):
+        self.features = features
+        self.score = score
+        self.buckets = buckets
+        self.edges = edges
+        self.n_buckets = len(edges) + 1
+        order = np.argsort(buckets, kind="stable")
+        bounds = np.searchsorted(buckets[order], np.arange(-1, self.n_buckets + 1))
+        self.members = [order[bounds[b + 1]:bounds[b + 2]] for b in range(self.n_buckets)]
+
+    @classmethod
+    def build(cls, grids, n_buckets=5, chunk_size=4096):
+        features = compute_features(grids, chunk_size)
+        score = difficulty_score(features)
+        buckets, edges = assign_buckets(score, n_buckets)
+        return cls(features, score, buckets, edges)
+
+    @classmethod
+    def load(cls, bank_path):
+        with np.load(os.path.join(bank_path, DIFFICULTY_FILE)) as data:
+            features = {name: data[name] for name in FEATURES}
+            return cls(features, data["score"], data["buckets"], data["edges"])
+
+    def save(self, bank_path):
+        np.savez(os.path.join(bank_path, DIFFICULTY_FILE), score=self.score, buckets=self.buckets,
+                 edges=self.edges, **self.features)
+
+    def __len__(self):
+        return len(self.buckets)
+
+    def bucket_sizes(self):
+        return np.array([len(m) for m in self.members])
+
+    def sample(self, rng, weights=None):
+        """
+        Draws a bank index: a bucket with probability proportional to `weights` (uniform over
+        non-empty buckets by default), then a uniform map within it.
+        Returns:
+            (index, bucket)
+        """
+        sizes = self.bucket_sizes()
+        p = np.ones(self.n_buckets) if weights is None else np.asarray(weights, dtype=np.float64)
+        p = np.where(sizes > 0, p, 0.0)
+        if p.sum() <= 0:
+            raise ValueError("No bucket with maps and positive weight to sample from")
+        bucket = int(rng.choice(self.n_buckets, p=p / p.sum()))
+        members = self.members[bucket]
+        return int(members[rng.integers(len(members))]), bucket
+
+def build_difficulty_index(bank_path, n_buckets=5, chunk_size=4096):
+    """Computes and saves the DifficultyIndex of the bank at `bank_path`."""
+    from gridlock_rl.maps.bank import MapBank
+
+    index = DifficultyIndex.build(MapBank(bank_path).grids, n_buckets, chunk_size)
+    index.save(bank_path)
+    return index
+
+def bucket_weights(success, min_weight=0.05):
+    """
+    Sampling weights from per-bucket success rates: s * (1 - s), highest for buckets the
+    agent solves about half the time and lowest for trivial (s ~ 1) or hopeless (s ~ 0)
+    ones. `min_weight` is a floor as a fraction of the peak weight (0.25, at s = 0.5): it
+    keeps every bucket in rotation so its success rate stays current.
+    Buckets without data (NaN) use s = 0.5.
+    """
+    s = np.nan_to_num(np.asarray(success, dtype=np.float64), nan=0.5)
+    peak = 0.25
+    return np.maximum(s * (1.0 - s), min_weight * peak)
@@ -0,0 +1,228 @@
+import os
+import numpy as np
+
+from gridlock_rl.core.constants import TileType
+
+# Canonical map hashing. A map's hash is the Zobrist hash (XOR of one random
+# 64-bit word per non-empty (cell, tile)) minimised over the grid symmetries that
+# keep its shape: the 8 rotations/reflections of a square grid, or the identity,
+# both flips and the 180° rotation of a rectangular one. Symmetric copies of a map
+# are the same task with relabelled actions, so they share one hash.
+# Tables are derived from a fixed seed and the grid shape, so hashes are stable
+# across processes and runs. Distinct maps collide with probability ~n²/2^65
+# (about 3e-8 for a million maps).
+
+# Packed tile codec. Tiles take 3 bits each (6 tile types < 8), stored as three
+# bit planes: a packed map is [plane 0 | plane 1 | plane 2], where plane b holds
+# bit b of every tile, 8 cells per byte (np.packbits, little bit order, last byte
+# zero-padded). An 8x8 map packs into 24 bytes instead of 64, so 10M maps take
+# 240 MB. Decoding maps planes 0+1 through a 65536-entry table (16 bits -> 8
+# tiles as one uint64) and ORs in plane 2, two gathers per 8 tiles.
+# Packed banks store a (N, packed_size) uint8 array that is memory mapped and
+# decoded on access (see PackedGrids and maps/bank.py).
+
+TILE_BITS = 3
+PACKED_ENCODING = "packed3"
+
+ZOBRIST_SEED = 0x5EED_6A7E
+N_TILES = len(TileType)
+INDEX_FILE = "index.npy"
+
+_TABLES = {}
+
+def zobrist_table(height, width):
+    """(height * width, N_TILES) uint64 table; the EMPTY column is zero so empty cells do not contribute."""
+    key = (height, width)
+    if key not in _TABLES:
+        rng = np.random.default_rng([ZOBRIST_SEED, height, width])
+        table = rng.integers(0, 2**64, size=(height * width, N_TILES), dtype=np.uint64)
+        table[:, TileType.EMPTY] = 0
+        _TABLES[key] = table
+    return _TABLES[key]
+
+def symmetries(grids):
+    """
+    Views of `grids` ((N, H, W)) under every symmetry that preserves the (H, W) shape.
+    Returns:
+        list of 8 (square) or 4 (rectangular) arrays, identity first.
+    """
+    flips = [grids, grids[:, :, ::-1], grids[:, ::-1, :], grids[:, ::-1, ::-1]]
+    if grids.shape[1] != grids.shape[2]:
+        return flips
+    # Transposing the 4 flips gives the rotations by 90°/270° and the two diagonal reflections
+    return flips + [g.transpose(0, 2, 1) for g in flips]
+
+def zobrist_hash(grids):
+    """Plain (orientation-dependent) Zobrist hashes of `grids` ((N, H, W) int8). Returns (N,) uint64."""
+    grids = np.asarray(grids)
+    n, height, width = grids.shape
+    table = zobrist_table(height, width)
+    cells = np.arange(height * width)
+    return np.bitwise_xor.reduce(table[cells, grids.reshape(n, -1)], axis=1)
+
+def canonical_hash(grids, chunk_size=65536):
+    """
+    Symmetry-invariant hashes of `grids` ((N, H, W)); works on memory-mapped banks chunk by chunk.
+    Returns:
+        np.ndarray: (N,) uint64, equal for maps that are rotations/reflections of each other.
+    """
+    out = np.empty(len(grids), dtype=np.uint64)
+    for start in range(0, len(grids), chunk_size):
+        chunk = np.asarray(grids[start:start + chunk_size], dtype=np.int8)
+        out[start:start + len(chunk)] = np.min([zobrist_hash(view) for view in symmetries(chunk)], axis=0)
+    return out
+
+def map_hash(grid):
+    """Canonical hash of a single (H, W) grid as a Python int."""
+    return int(canonical_hash(np.asarray(grid)[None])[0])
+
+def packed_size(height, width):
+    """Bytes per packed map."""
+    return 3 * -(-(height * width) // 8)
+
+def _bit_tables():
+    global _PLANE_LUT, _PAIR_LUT
+    if _PLANE_LUT is None:
+        bits = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1, bitorder="little")
+        # byte -> 8 bytes of 0/1, read as one little-endian uint64
+        _PLANE_LUT = np.ascontiguousarray(bits).view("<u8")[:, 0].astype(np.uint64)
+        pairs = np.arange(65536)
+        _PAIR_LUT = _PLANE_LUT[pairs & 255] | (_PLANE_LUT[pairs >> 8] << np.uint64(1))
+    return _PLANE_LUT, _PAIR_LUT
+
+_PLANE_LUT = None
+_PAIR_LUT = None
+
+def pack_grids(grids):
+    """
+    Packs `grids` ((N, H, W) tiles in 0..7) at 3 bits per tile.
+    Returns:
+        np.ndarray: (N, packed_size(H, W)) uint8.
+    """
+    grids = np.asarray(grids)
+    n = len(grids)
+    flat = grids.reshape(n, -1)
+    if flat.size and (flat.min() < 0 or flat.max() >= 1 << TILE_BITS):
+        raise ValueError(f"Tiles must be in [0, {1 << TILE_BITS}) to pack")
+    flat = flat.astype(np.uint8)
+    return np.concatenate([np.packbits((flat >> b) & 1, axis=1, bitorder="little") for b in range(TILE_BITS)],
+                          axis=1)
+
+def unpack_grids(packed, height, width, chunk_size=16384):
+    """Inverse of pack_grids: (N, packed_size) uint8 -> (N, height, width) int8. Decodes in cache-sized chunks."""
+    packed = np.asarray(packed, dtype=np.uint8)
+    n = len(packed)
+    n_bytes = packed_size(height, width) // 3
+    if packed.shape != (n, 3 * n_bytes):
+        raise ValueError(f"Expected packed maps of {3 * n_bytes} bytes, got shape {packed.shape}")
+    plane_lut, pair_lut = _bit_tables()
+    out = np.empty((n, n_bytes * 8), dtype=np.int8)
+    for start in range(0, n, chunk_size):
+        chunk = packed[start:start + chunk_size]
+        pair = chunk[:, :n_bytes].astype(np.uint16)
+        pair |= chunk[:, n_bytes:2 * n_bytes].astype(np.uint16) << 8
+        words = pair_lut[pair]
+        words |= plane_lut[chunk[:, 2 * n_bytes:]] << np.uint64(2)
+        out[start:start + len(chunk)] = words.view(np.int8).reshape(len(chunk), -1)
+    return out[:, :height * width].reshape(n, height, width)
+
+class PackedGrids:
+    """
+    Read-only (N, H, W) int8 view of packed maps. Indexing with an int, slice or
+    index array decodes only the selected maps, so a memory-mapped packed bank can
+    be used wherever an int8 grid array is read (len, shape, slicing).
+    """
+    ndim = 3
+    dtype = np.dtype(np.int8)
+
+    def __init__(self, packed, height, width):
+        self.packed = packed
+        self.height = height
+        self.width = width
+        if packed.ndim != 2 or packed.shape[1] != packed_size(height, width):
+            raise ValueError(f"Packed maps of shape {packed.shape} do not match {height}x{width} grids")
+
+    @property
+    def shape(self):
+        return (len(self.packed), self.height, self.width)
+
+    def __len__(self):
+        return len(self.packed)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (int, np.integer)):
+            return unpack_grids(self.packed[idx][None], self.height, self.width)[0]
+        return unpack_grids(self.packed[idx], self.height, self.width)
+
+    def __array__(self, dtype=None, copy=None):
+        grids = self[:]
+        return grids if dtype is None else grids.astype(dtype)
+
+def first_occurrence(hashes):
+    """Boolean mask keeping the first map of every distinct hash (input order preserved)."""
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    _, first = np.unique(hashes, return_index=True)
+    mask = np.zeros(len(hashes), dtype=bool)
+    mask[first] = True
+    return mask
+
+class MapIndex:
+    """
+    Set of canonical map hashes stored as a sorted, unique uint64 array.
+    Membership tests are a vectorized binary search (np.searchsorted), so checking
+    a batch of n maps against an index of m costs O(n log m). On disk an index is
+    a plain .npy file that loads as a memory map.
+    """
+    def __init__(self, hashes=(), assume_sorted=False):
+        # Sorted input is kept as is, so a loaded index stays memory-mapped
+        self.hashes = hashes if assume_sorted else np.unique(np.asarray(hashes, dtype=np.uint64))
+
+    @classmethod
+    def from_grids(cls, grids):
+        return cls(canonical_hash(grids))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads an index .npy file, a directory holding index.npy, or a map bank /
+        benchmark bundle directory (hashed from its grids).
+        """
+        if os.path.isdir(path):
+            index_path = os.path.join(path, INDEX_FILE)
+            if not os.path.exists(index_path):
+                from gridlock_rl.maps.bank import MapBank  # bank imports this module
+                return cls.from_grids(MapBank(path).grids)
+            path = index_path
+        hashes = np.load(path, mmap_mode="r" if mmap else None)
+        if hashes.ndim != 1 or hashes.dtype != np.uint64:
+            raise ValueError(f"Invalid map index in {path}: {hashes.dtype} {hashes.shape}")
+        return cls(hashes, assume_sorted=True)
+
+    def save(self, path):
+        """Writes the index to `path` (a .npy file, or a directory that receives index.npy)."""
+        if os.path.isdir(path):
+            path = os.path.join(path, INDEX_FILE)
+        np.save(path, np.asarray(self.hashes))
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def contains(self, hashes):
+        """Boolean mask: which of `hashes` are in the index."""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(self.hashes) == 0:
+            return np.zeros(hashes.shape, dtype=bool)
+        pos = np.searchsorted(self.hashes, hashes)
+        return self.hashes[np.minimum(pos, len(self.hashes) - 1)] == hashes
+
+    def contains_grids(self, grids):
+        return self.contains(canonical_hash(grids))
+
+    def add(self, hashes):
+        """Inserts `hashes` in place, keeping the array sorted and unique (O(n + m))."""
+        new = np.unique(np.asarray(hashes, dtype=np.uint64))
+        new = new[~self.contains(new)]
+        self.hashes = np.insert(np.asarray(self.hashes), np.searchsorted(self.hashes, new), new)
+
+    def union(self, other):
+        return MapIndex(np.concatenate([np.asarray(self.hashes), np.asarray(other.hashes)]))
@@ -1,16 +1,30 @@
+import heapq
 import numpy as np
 import random
 from gridlock_rl.core.constants import TileType
-from gridlock_rl.maps.validation import validate_map
+from gridlock_rl.maps.validation import validate_map_bitboard, validate_maps_batch
+from gridlock_rl.utils.profiling import PROFILER, perf_counter_ns
+
+METHODS = ("rejection", "constructive")
 
 class MapGenerator:
-    def __init__(self, width=8, height=8, trap_density=0.1, max_retries=100, num_keys=3, min_traps=0):
+    """
+    method: "rejection" places everything at random and retries until the map validates;
+            "constructive" builds a safe corridor first, so every attempt succeeds
+            (see generate_constructive).
+    """
+    def __init__(self, width=8, height=8, trap_density=0.1, max_retries=100, num_keys=3, min_traps=0,
+                 method="rejection"):
+        if method not in METHODS:
+            raise ValueError(f"Unknown generator method: {method} (expected one of {METHODS})")
         self.width = width
         self.height = height
         self.trap_density = trap_density
         self.max_retries = max_retries
         self.num_keys = num_keys
         self.min_traps = min_traps
+        self.method = method
+        self._neighbors = None
 
     def generate(self, seed=None):
         """
@@ -19,11 +33,16 @@ class MapGenerator:
             grid (np.ndarray): The generated grid.
             info (dict): Metadata including seed and retry count.
         """
+        if self.method == "constructive":
+            return self.generate_constructive(seed)
+
         if seed is not None:
             np.random.seed(seed)
             random.seed(seed)
             
+        prof = PROFILER.enabled
         for attempt in range(self.max_retries):
+            if prof: t0 = perf_counter_ns()
             grid = np.full((self.height, self.width), TileType.EMPTY, dtype=np.int8)
             
             # Helper to get empty positions
@@ -64,12 +83,198 @@ class MapGenerator:
                 grid[trap_pos] = TileType.TRAP
                 
             # 4. Validate
-            is_valid, msg = validate_map(grid)
+            if prof: t0 = PROFILER.lap("generate.place", t0)
+            is_valid, msg = validate_map_bitboard(grid)
+            if prof:
+                PROFILER.lap("generate.validate", t0)
+                PROFILER.count("generate.attempts")
+                if not is_valid:
+                    # Drop per-map details such as "(2/3)" so reasons aggregate
+                    PROFILER.count("generate.reject." + msg.split(" (")[0])
             if is_valid:
                 return grid, {"seed": seed, "attempts": attempt + 1}
                 
+        if prof: PROFILER.count("generate.failures")
         raise RuntimeError(f"Failed to generate solvable map after {self.max_retries} attempts")
 
+    def generate_constructive(self, seed=None):
+        """
+        Generates a map that is solvable by construction, in one attempt for any trap density.
+        Distribution (all draws from np.random.default_rng(seed)):
+        1. Start, Goal and Keys take distinct uniformly random cells.
+        2. A random spanning tree of the grid without the Goal cell is grown from Start
+           (randomized Prim's algorithm with uniform random edge priorities).
+        3. The corridor is the union of the tree paths from Start to every Key and to one
+           uniformly chosen neighbour of the Goal. It never touches the Goal, so keys are
+           reachable while the goal is locked, and the goal is one step from the corridor.
+        4. Traps take uniformly random cells outside the corridor. Their count is
+           max(min_traps, int(free_cells * trap_density)), capped at the cells available.
+        Returns:
+            grid (np.ndarray): The generated grid.
+            info (dict): seed, attempts, n_traps and corridor_size.
+        """
+        rng = np.random.default_rng(seed)
+        prof = PROFILER.enabled
+        n_cells = self.height * self.width
+        if n_cells < 2 + self.num_keys:
+            raise ValueError("Grid too small")
+
+        for attempt in range(self.max_retries):
+            if prof: t0 = perf_counter_ns()
+            cells = rng.permutation(n_cells)
+            start, goal = int(cells[0]), int(cells[1])
+            keys = [int(k) for k in cells[2:2 + self.num_keys]]
+
+            parent = self._random_spanning_tree(start, goal, rng)
+            goal_sides = [nb for nb in self._cell_neighbors()[goal] if nb in parent]
+            # Only 1-wide grids can cut keys or the goal off from the start
+            if not goal_sides or any(k not in parent for k in keys):
+                if prof: PROFILER.count("generate.reject.Disconnected placement")
+                continue
+
+            corridor = {start}
+            for target in keys + [goal_sides[int(rng.integers(len(goal_sides)))]]:
+                while target not in corridor:
+                    corridor.add(target)
+                    target = parent[target]
+
+            grid = np.full(n_cells, TileType.EMPTY, dtype=np.int8)
+            grid[start] = TileType.START
+            grid[goal] = TileType.GOAL
+            grid[keys] = TileType.KEY
+            free = n_cells - 2 - self.num_keys
+            n_traps = max(self.min_traps, int(free * self.trap_density))
+            allowed = grid == TileType.EMPTY
+            allowed[list(corridor)] = False
+            options = np.flatnonzero(allowed)
+            n_traps = min(n_traps, len(options))
+            grid[rng.choice(options, size=n_traps, replace=False)] = TileType.TRAP
+            if prof:
+                PROFILER.lap("generate.construct", t0)
+                PROFILER.count("generate.attempts")
+            return grid.reshape(self.height, self.width), {
+                "seed": seed, "attempts": attempt + 1, "n_traps": n_traps, "corridor_size": len(corridor)
+            }
+
+        if prof: PROFILER.count("generate.failures")
+        raise RuntimeError(f"Failed to generate solvable map after {self.max_retries} attempts")
+
+    def _cell_neighbors(self):
+        """Flat 4-neighbour lists, built once per generator."""
+        if self._neighbors is None:
+            h, w = self.height, self.width
+            self._neighbors = [
+                [nr * w + nc for nr, nc in ((r - 1, c), (r, c + 1), (r + 1, c), (r, c - 1))
+                 if 0 <= nr < h and 0 <= nc < w]
+                for r in range(h) for c in range(w)
+            ]
+        return self._neighbors
+
+    def _random_spanning_tree(self, root, excluded, rng):
+        """
+        Randomized Prim's algorithm over all cells except `excluded`: the frontier edge with
+        the smallest uniform random priority joins the tree next.
+        Returns {cell: parent} for the cells reached from `root` (root maps to itself).
+        """
+        neighbors = self._cell_neighbors()
+        priority = rng.random((len(neighbors), 4))
+        parent = {root: root}
+        heap = [(priority[root, i], nb, root) for i, nb in enumerate(neighbors[root]) if nb != excluded]
+        heapq.heapify(heap)
+        while heap:
+            _, cell, par = heapq.heappop(heap)
+            if cell in parent:
+                continue
+            parent[cell] = par
+            for i, nb in enumerate(neighbors[cell]):
+                if nb != excluded and nb not in parent:
+                    heapq.heappush(heap, (priority[cell, i], nb, cell))
+        return parent
+
+    def generate_batch(self, n, seed=None, max_candidates_per_round=65536):
+        """
+        Generates n valid maps at once with vectorized placement.
+        Each candidate orders its cells by argsort of random keys: the first cell is Start,
+        the next Goal, then num_keys Keys, then the Traps. Candidates are validated in batch
+        and only solvable ones are kept; new rounds are drawn until n maps are valid.
+        The same seed always yields the same maps (independent of generate()).
+        With method="constructive", map i is generate_constructive(s_i) for per-map seeds
+        s_i drawn from `seed`; keys are then listed in row-major order.
+        Returns:
+            grids (np.ndarray): (n, H, W) int8 valid maps.
+            info (dict): seed, attempts (candidates drawn), and per-map metadata arrays
+                start (n, 2), goal (n, 2), keys (n, num_keys, 2), n_traps (n,).
+        """
+        rng = np.random.default_rng(seed)
+        if self.method == "constructive":
+            return self._generate_batch_constructive(n, seed, rng)
+        n_cells = self.height * self.width
+        if n_cells < 2 + self.num_keys:
+            raise ValueError("Grid too small")
+        n_free = n_cells - 2 - self.num_keys
+        n_traps = min(max(self.min_traps, int(n_free * self.trap_density)), n_free)
+        n_items = 2 + self.num_keys + n_traps
+
+        tiles = np.empty(n_items, dtype=np.int8)
+        tiles[0] = TileType.START
+        tiles[1] = TileType.GOAL
+        tiles[2:2 + self.num_keys] = TileType.KEY
+        tiles[2 + self.num_keys:] = TileType.TRAP
+
+        grids = np.empty((n, self.height, self.width), dtype=np.int8)
+        orders = np.empty((n, 2 + self.num_keys), dtype=np.int64)
+        count = 0
+        attempts = 0
+        while count < n:
+            if attempts >= self.max_retries * n:
+                raise RuntimeError(f"Failed to generate {n} solvable maps within {attempts} candidates")
+
+            # Oversample by the observed acceptance rate
+            need = n - count
+            accept = count / attempts if attempts else 1.0
+            m = min(int(need / max(accept, 0.01) * 1.1) + 1, max_candidates_per_round)
+            attempts += m
+
+            order = np.argsort(rng.random((m, n_cells)), axis=1)[:, :n_items]
+            flat = np.full((m, n_cells), TileType.EMPTY, dtype=np.int8)
+            flat[np.arange(m)[:, None], order] = tiles
+            candidates = flat.reshape(m, self.height, self.width)
+
+            valid = np.flatnonzero(validate_maps_batch(candidates))[:need]
+            grids[count:count + len(valid)] = candidates[valid]
+            orders[count:count + len(valid)] = order[valid, :2 + self.num_keys]
+            count += len(valid)
+
+        positions = np.stack(np.divmod(orders, self.width), axis=-1)
+        return grids, {
+            "seed": seed,
+            "attempts": attempts,
+            "start": positions[:, 0],
+            "goal": positions[:, 1],
+            "keys": positions[:, 2:],
+            "n_traps": np.full(n, n_traps, dtype=np.int64)
+        }
+
+    def _generate_batch_constructive(self, n, seed, rng):
+        grids = np.empty((n, self.height, self.width), dtype=np.int8)
+        attempts = 0
+        for i, map_seed in enumerate(rng.integers(0, 2**63, size=n)):
+            grids[i], info = self.generate_constructive(int(map_seed))
+            attempts += info["attempts"]
+
+        flat = grids.reshape(n, -1)
+        def positions(tile, count):
+            cells = np.argsort(flat != tile, axis=1, kind="stable")[:, :count]
+            return np.stack(np.divmod(cells, self.width), axis=-1)
+        return grids, {
+            "seed": seed,
+            "attempts": attempts,
+            "start": positions(TileType.START, 1)[:, 0],
+            "goal": positions(TileType.GOAL, 1)[:, 0],
+            "keys": positions(TileType.KEY, self.num_keys),
+            "n_traps": (flat == TileType.TRAP).sum(axis=1)
+        }
+
 if __name__ == "__main__":
     # Quick standalone test
     gen = MapGenerator(width=8, height=8, trap_density=0.2)
@@ -0,0 +1,171 @@
+import numpy as np
+from gridlock_rl.core.constants import TileType, Action
+from gridlock_rl.maps.validation import distance_fields
+
+# Exact solver for the key-collection task.
+# 1. One BFS field per key (goal blocked while locked) and one for the goal give the
+#    pairwise distances between start, keys and goal.
+# 2. Held-Karp DP over key subsets finds the optimal collection order:
+#    dp[mask, j] = shortest walk from the start through the keys in `mask`, ending at key j.
+# Walking over a key collects it early, which never hurts, so the best order over
+# shortest legs is the optimal episode length. All steps are batched over maps.
+
+MAX_KEYS = 16
+# Upper bound on the Held-Karp table of one solve_batch chunk: (N, 2^K, K) int64 is
+# 8 MB per map at K = 16, so chunks shrink as the key count grows.
+DP_MAX_BYTES = 256 * 2**20
+UNREACHABLE = np.iinfo(np.int64).max // 4
+
+# Moves in tie-break order for action reconstruction
+MOVES = [
+    (Action.UP, (-1, 0)),
+    (Action.RIGHT, (0, 1)),
+    (Action.DOWN, (1, 0)),
+    (Action.LEFT, (0, -1)),
+]
+
+def _legs(grids):
+    """
+    Distance fields and cells for each grid's legs.
+    Returns:
+        fields (N, K + 1, H, W) int64: fields[:, j] is the distance to key j (j < K) or to the
+            goal (j == K); UNREACHABLE where there is no path.
+        starts (N,) int64: flat start cell.
+        keys (N, K) int64: flat key cells in row-major order. Grids with fewer keys are padded
+            with their start cell, which the DP visits first at no cost.
+        goals (N,) int64: flat goal cell.
+    """
+    n, h, w = grids.shape
+    flat = grids.reshape(n, -1)
+    is_key = flat == TileType.KEY
+    n_keys = int(is_key.sum(axis=1).max(initial=0))
+    if n_keys > MAX_KEYS:
+        raise ValueError(f"Solver supports at most {MAX_KEYS} keys, got {n_keys}")
+    if not ((flat == TileType.START).any(axis=1) & (flat == TileType.GOAL).any(axis=1)).all():
+        raise ValueError("Every grid needs a start and a goal")
+
+    starts = (flat == TileType.START).argmax(axis=1)
+    goals = (flat == TileType.GOAL).argmax(axis=1)
+    # Stable sort puts key cells first, in row-major order
+    order = np.argsort(~is_key, axis=1, kind="stable")[:, :n_keys]
+    valid = np.take_along_axis(is_key, order, axis=1)
+    keys = np.where(valid, order, starts[:, None])
+
+    sources = np.zeros((n, n_keys + 1, h * w), dtype=bool)
+    rows = np.arange(n)[:, None]
+    sources[rows, np.arange(n_keys), keys] = True
+    sources[np.arange(n), n_keys, goals] = True
+
+    blocked = (grids == TileType.WALL) | (grids == TileType.TRAP)
+    passable = np.repeat((~blocked & (grids != TileType.GOAL))[:, None], n_keys + 1, axis=1)
+    passable[:, n_keys] = ~blocked
+
+    fields = distance_fields(sources.reshape(-1, h, w), passable.reshape(-1, h, w))
+    fields = fields.reshape(n, n_keys + 1, h * w).astype(np.int64)
+    fields[fields < 0] = UNREACHABLE
+    return fields.reshape(n, n_keys + 1, h, w), starts, keys, goals
+
+def _held_karp(fields, starts, keys, goals):
+    """
+    Batched Held-Karp over the legs from _legs.
+    Returns:
+        lengths (N,) int64: optimal episode length, -1 if unsolvable.
+        dp (N, 2^K, K) int64: table for order reconstruction.
+        last (N,) int64: key collected last on the optimal route (-1 if there are no keys).
+    """
+    n, n_slots = fields.shape[:2]
+    n_keys = n_slots - 1
+    flat = fields.reshape(n, n_slots, -1)
+    rows = np.arange(n)[:, None]
+    from_start = flat[rows, np.arange(n_keys), starts[:, None]]              # (N, K)
+    # between[:, i, j]: key i -> key j
+    between = flat[rows[:, :, None], np.arange(n_keys)[None, None, :], keys[:, :, None]]
+    to_goal = flat[rows, n_keys, keys]                                        # (N, K)
+
+    if n_keys == 0:
+        lengths = flat[np.arange(n), 0, starts]
+        return np.where(lengths < UNREACHABLE, lengths, -1), None, np.full(n, -1)
+
+    bits = 1 << np.arange(n_keys)
+    dp = np.full((n, 1 << n_keys, n_keys), UNREACHABLE, dtype=np.int64)
+    dp[:, bits, np.arange(n_keys)] = from_start
+    for mask in range(1, 1 << n_keys):
+        js = np.flatnonzero(mask & bits)
+        if len(js) < 2:
+            continue
+        prev = dp[:, mask ^ bits[js], :]                                      # (N, J, K)
+        cand = prev + between[:, :, js].transpose(0, 2, 1)
+        dp[:, mask, js] = np.minimum(cand.min(axis=2), UNREACHABLE)
+
+    total = np.minimum(dp[:, -1, :] + to_goal, UNREACHABLE)
+    last = total.argmin(axis=1)
+    lengths = total[np.arange(n), last]
+    return np.where(lengths < UNREACHABLE, lengths, -1), dp, last
+
+def dp_bytes_per_map(n_keys):
+    """Bytes of one map's Held-Karp table with `n_keys` keys."""
+    return (1 << n_keys) * max(n_keys, 1) * np.dtype(np.int64).itemsize
+
+def solve_batch(grids, chunk_size=4096, max_bytes=DP_MAX_BYTES):
+    """
+    Optimal episode lengths for a batch of maps.
+    grids: (N, H, W). Returns (N,) int64 lengths, -1 where a map is unsolvable.
+    Maps are processed in chunks of at most `chunk_size`, further limited so the DP
+    table of a chunk stays under `max_bytes` (at least one map per chunk).
+    """
+    grids = np.asarray(grids)
+    lengths = np.empty(len(grids), dtype=np.int64)
+    start = 0
+    while start < len(grids):
+        chunk = np.asarray(grids[start:start + chunk_size])
+        n_keys = int((chunk.reshape(len(chunk), -1) == TileType.KEY).sum(axis=1).max(initial=0))
+        chunk = chunk[:max(1, max_bytes // dp_bytes_per_map(n_keys))]
+        lengths[start:start + len(chunk)] = _held_karp(*_legs(chunk))[0]
+        start += len(chunk)
+    return lengths
+
+def solve(grid):
+    """
+    Optimal plan for a single map.
+    Returns:
+        length (int): optimal number of steps, -1 if unsolvable.
+        actions (list[Action] | None): an optimal action sequence, None if unsolvable.
+    """
+    grid = np.asarray(grid)
+    fields, starts, keys, goals = _legs(grid[None])
+    lengths, dp, last = _held_karp(fields, starts, keys, goals)
+    length = int(lengths[0])
+    if length < 0:
+        return -1, None
+
+    # 1. Recover the key order by walking the DP table backwards
+    order = []
+    if dp is not None:
+        n_keys = keys.shape[1]
+        mask, j = (1 << n_keys) - 1, int(last[0])
+        while True:
+            order.append(j)
+            prev = mask ^ (1 << j)
+            if prev == 0:
+                break
+            cost = dp[0, mask, j]
+            for i in range(n_keys):
+                if prev & (1 << i) and dp[0, prev, i] + fields[0, j].flat[keys[0, i]] == cost:
+                    mask, j = prev, i
+                    break
+        order.reverse()
+
+    # 2. Descend each leg's distance field
+    h, w = grid.shape
+    actions = []
+    pos = divmod(int(starts[0]), w)
+    for slot in order + [fields.shape[1] - 1]:
+        field = fields[0, slot]
+        while field[pos] > 0:
+            for action, (dr, dc) in MOVES:
+                nr, nc = pos[0] + dr, pos[1] + dc
+                if 0 <= nr < h and 0 <= nc < w and field[nr, nc] == field[pos] - 1:
+                    actions.append(action)
+                    pos = (nr, nc)
+                    break
+    return length, actions
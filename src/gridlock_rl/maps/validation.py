@@ -1,5 +1,6 @@
 import numpy as np
 from collections import deque
+from functools import lru_cache
 from gridlock_rl.core.constants import TileType, Action
 
 def get_neighbors(pos, grid_shape):
@@ -95,3 +96,189 @@ def validate_map(grid):
         return False, "Goal not reachable from Start"
         
     return True, "Solvable"
+
+# ----------------------------------------------------------------------
+# Bitboards: cell (r, c) is bit r * width + c.
+# Python ints are arbitrary precision, so boards larger than 64 cells
+# are simply multi-word ints; batches of <= 64-cell boards use np.uint64.
+# ----------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _shift_masks(height, width):
+    """Masks clearing the cells a horizontal shift would wrap into (column 0 / last column)."""
+    col0 = 0
+    for r in range(height):
+        col0 |= 1 << (r * width)
+    full = (1 << (height * width)) - 1
+    return full & ~col0, full & ~(col0 << (width - 1))
+
+def to_bitboard(mask):
+    """Packs a boolean (H, W) mask into an int bitboard."""
+    return int.from_bytes(np.packbits(mask, axis=None, bitorder="little").tobytes(), "little")
+
+def flood_fill_bitboard(seed, passable, height, width):
+    """Bitboard of cells reachable from `seed` through 4-connected `passable` cells."""
+    not_col0, not_col_last = _shift_masks(height, width)
+    reach = seed & passable
+    while True:
+        grow = (reach | ((reach << 1) & not_col0) | ((reach >> 1) & not_col_last)
+                | (reach << width) | (reach >> width)) & passable
+        if grow == reach:
+            return reach
+        reach = grow
+
+def validate_map_bitboard(grid):
+    """
+    Bitboard implementation of validate_map: same verdicts and messages,
+    with both reachability checks done as one shift-and-mask flood fill.
+    """
+    height, width = grid.shape
+    flat = grid.ravel()
+    start_bit = 1 << int(np.flatnonzero(flat == TileType.START)[0])
+    goal_bit = 1 << int(np.flatnonzero(flat == TileType.GOAL)[0])
+    keys = to_bitboard(grid == TileType.KEY)
+
+    if keys == 0:
+        return False, "No keys found"
+
+    passable = to_bitboard((grid != TileType.WALL) & (grid != TileType.TRAP))
+    reach = flood_fill_bitboard(start_bit, passable, height, width)
+
+    reached_keys = reach & keys
+    if reached_keys != keys:
+        n_keys = bin(keys).count("1")
+        return False, f"Not all keys reachable from Start ({bin(reached_keys).count('1')}/{n_keys})"
+
+    if not reach & goal_bit:
+        return False, "Goal not reachable from Start"
+
+    return True, "Solvable"
+
+def _to_bitboards_u64(masks):
+    """Packs (N, H, W) bool masks with H * W <= 64 into (N,) uint64 bitboards."""
+    n = len(masks)
+    packed = np.zeros((n, 8), dtype=np.uint8)
+    bits = np.packbits(masks.reshape(n, -1), axis=1, bitorder="little")
+    packed[:, :bits.shape[1]] = bits
+    return packed.view("<u8").ravel()
+
+def flood_fill_bitboard_batch(seed, passable, height, width):
+    """flood_fill_bitboard over (N,) uint64 boards (H * W <= 64)."""
+    not_col0, not_col_last = (np.uint64(m) for m in _shift_masks(height, width))
+    one, w = np.uint64(1), np.uint64(width)
+    reach = seed & passable
+    while True:
+        grow = (reach | ((reach << one) & not_col0) | ((reach >> one) & not_col_last)
+                | (reach << w) | (reach >> w)) & passable
+        if np.array_equal(grow, reach):
+            return reach
+        reach = grow
+
+def flood_fill_batch(sources, passable):
+    """
+    Vectorized reachability for a batch of grids.
+    sources, passable: (N, H, W) bool. Returns the (N, H, W) bool mask of cells reachable
+    from any source through 4-connected passable cells (sources themselves included).
+    """
+    reach = sources & passable
+    while True:
+        grow = reach.copy()
+        grow[:, 1:, :] |= reach[:, :-1, :]
+        grow[:, :-1, :] |= reach[:, 1:, :]
+        grow[:, :, 1:] |= reach[:, :, :-1]
+        grow[:, :, :-1] |= reach[:, :, 1:]
+        grow &= passable
+        if np.array_equal(grow, reach):
+            return reach
+        reach = grow
+
+def validate_maps_batch(grids):
+    """
+    Batched validate_map verdicts for grids of shape (N, H, W).
+    A map is valid when it has at least one key and every key and the goal are
+    reachable from Start over non-Wall, non-Trap tiles (same rules as validate_map).
+    Returns:
+        (N,) bool array.
+    """
+    grids = np.asarray(grids)
+    n, height, width = grids.shape
+    passable = (grids != TileType.WALL) & (grids != TileType.TRAP)
+    keys = grids == TileType.KEY
+    goal = grids == TileType.GOAL
+    has_keys = keys.reshape(n, -1).any(axis=1)
+    has_goal = goal.reshape(n, -1).any(axis=1)
+
+    if height * width <= 64:
+        # One uint64 bitboard per map
+        targets = _to_bitboards_u64(keys | goal)
+        reach = flood_fill_bitboard_batch(
+            _to_bitboards_u64(grids == TileType.START), _to_bitboards_u64(passable), height, width
+        )
+        unreached = (targets & ~reach) != 0
+    else:
+        reach = flood_fill_batch(grids == TileType.START, passable)
+        unreached = ((keys | goal) & ~reach).reshape(n, -1).any(axis=1)
+    return has_keys & has_goal & ~unreached
+
+# Below this many boards, per-board int bitboards beat whole-array numpy passes
+BITBOARD_MAX_BOARDS = 16
+
+def distance_layers_bitboard(source, passable, height, width):
+    """
+    Bitboard BFS. Returns the list of visited bitboards after 0, 1, 2, ... moves
+    (the last one is the full reachable set).
+    """
+    not_col0, not_col_last = _shift_masks(height, width)
+    visited = frontier = source
+    layers = [visited]
+    while True:
+        frontier = (((frontier << 1) & not_col0) | ((frontier >> 1) & not_col_last)
+                    | (frontier << width) | (frontier >> width)) & passable & ~visited
+        if not frontier:
+            return layers
+        visited |= frontier
+        layers.append(visited)
+
+def _layers_to_distances(layers, n_cells):
+    """A cell first visited in layer k is set in the last (D - k) layers."""
+    n_bytes = (n_cells + 7) // 8
+    buf = b"".join(v.to_bytes(n_bytes, "little") for v in layers)
+    bits = np.unpackbits(np.frombuffer(buf, dtype=np.uint8).reshape(len(layers), n_bytes),
+                         axis=1, count=n_cells, bitorder="little")
+    dist = len(layers) - bits.sum(axis=0, dtype=np.int32)
+    dist[bits[-1] == 0] = -1
+    return dist
+
+def distance_fields(sources, passable):
+    """
+    Batched multi-source BFS.
+    sources, passable: (N, H, W) bool. Returns (N, H, W) int32 shortest move counts from the
+    nearest source of the same map through 4-connected passable cells, -1 where unreachable.
+    Sources are at distance 0 even if they are not passable themselves.
+    """
+    n, height, width = sources.shape
+    if n <= BITBOARD_MAX_BOARDS:
+        dist = np.empty((n, height * width), dtype=np.int32)
+        for i in range(n):
+            source = to_bitboard(sources[i])
+            layers = distance_layers_bitboard(source, to_bitboard(passable[i]) | source, height, width)
+            dist[i] = _layers_to_distances(layers, height * width)
+        return dist.reshape(n, height, width)
+
+    dist = np.full(sources.shape, -1, dtype=np.int32)
+    dist[sources] = 0
+    visited = sources.copy()
+    frontier = sources
+    d = 0
+    while frontier.any():
+        d += 1
+        grow = np.zeros_like(frontier)
+        grow[:, 1:, :] |= frontier[:, :-1, :]
+        grow[:, :-1, :] |= frontier[:, 1:, :]
+        grow[:, :, 1:] |= frontier[:, :, :-1]
+        grow[:, :, :-1] |= frontier[:, :, 1:]
+        grow &= passable & ~visited
+        dist[grow] = d
+        visited |= grow
+        frontier = grow
+    return dist
@@ -0,0 +1,216 @@
+import os
+import argparse
+from collections import deque
+import yaml
+import numpy as np
+from stable_baselines3 import PPO
+from stable_baselines3.common.callbacks import BaseCallback, CheckpointCallback, EvalCallback
+from stable_baselines3.common.vec_env import DummyVecEnv, VecMonitor
+
+try:
+    from stable_baselines3.common.utils import FloatSchedule
+except ImportError:  # stable-baselines3 < 2.6
+    from stable_baselines3.common.utils import get_schedule_fn as FloatSchedule
+
+from gridlock_rl.envs.vec_env import GridVecEnv
+from gridlock_rl.training.train_sb3 import make_env, make_vec_env
+from gridlock_rl.callbacks.metrics_callback import MetricsCallback
+from gridlock_rl.callbacks.throughput_callback import ThroughputCallback
+from gridlock_rl.callbacks.difficulty_callback import AdaptiveDifficultyCallback
+
+# Single-process curriculum: one model and one set of env workers for all stages.
+# Between stages the live envs are reconfigured through GridEnv.configure (sent to
+# subprocess workers with env_method) and PPO hyperparameters are set on the model
+# in place, so no stage pays for worker startup or PPO.load.
+#
+# Config layout (see configs/train/curriculum.yaml):
+#   env:        base GridEnv settings; max_width/max_height fix the observation size
+#   training:   base PPO settings, plus n_envs / vec_env / policy for the whole run
+#   evaluation: eval_freq, n_eval_episodes
+#   stages:     list of {name, timesteps, env: {...}, training: {...}, advance: {...}}
+#               env and training entries override the base values from that stage on;
+#               advance: {success_rate, window, min_timesteps} ends the stage early.
+
+# PPO attributes that can change between stages without rebuilding the model
+STAGE_HYPERPARAMS = (
+    "learning_rate", "n_steps", "batch_size", "n_epochs", "gamma", "gae_lambda",
+    "clip_range", "ent_coef", "vf_coef", "max_grad_norm",
+)
+
+def configure_envs(venv, **params):
+    """Applies GridEnv.configure to every env of `venv` (any backend, through VecEnv wrappers)."""
+    base = venv.unwrapped
+    if isinstance(base, GridVecEnv):
+        return base.configure(**params)
+    return venv.env_method("configure", **params)[0]
+
+def apply_hyperparams(model, **params):
+    """
+    Sets PPO hyperparameters on a live model. Schedules are rebuilt for learning_rate and
+    clip_range, and the rollout buffer is reallocated when n_steps, gamma or gae_lambda change.
+    """
+    unknown = set(params) - set(STAGE_HYPERPARAMS)
+    if unknown:
+        raise ValueError(f"Cannot change {sorted(unknown)} between stages; supported: {STAGE_HYPERPARAMS}")
+    for name, value in params.items():
+        setattr(model, name, value)
+    if "learning_rate" in params:
+        model._setup_lr_schedule()
+    if "clip_range" in params:
+        model.clip_range = FloatSchedule(params["clip_range"])
+    if {"n_steps", "gamma", "gae_lambda"} & set(params):
+        model.rollout_buffer = model.rollout_buffer_class(
+            model.n_steps,
+            model.observation_space,
+            model.action_space,
+            device=model.device,
+            gamma=model.gamma,
+            gae_lambda=model.gae_lambda,
+            n_envs=model.n_envs,
+            **model.rollout_buffer_kwargs,
+        )
+
+class StageCallback(BaseCallback):
+    """
+    Logs the current stage index (curriculum/stage) and, when `success_rate` is set, stops
+    model.learn (ending the stage) once the success rate over the last `window` finished
+    episodes reaches it, after at least `min_timesteps` steps of the stage.
+    Reads info["metrics"]["is_success"] from MetricLoggingWrapper.
+    """
+    def __init__(self, stage_index, success_rate=None, window=100, min_timesteps=0, verbose=0):
+        super().__init__(verbose)
+        self.stage_index = stage_index
+        self.success_rate = success_rate
+        self.min_timesteps = min_timesteps
+        self.outcomes = deque(maxlen=window)
+        self.stage_start = 0
+        self.advanced = False
+
+    def _on_training_start(self) -> None:
+        self.stage_start = self.num_timesteps
+        self.outcomes.clear()
+
+    def _on_rollout_end(self) -> None:
+        self.logger.record("curriculum/stage", self.stage_index)
+        if self.outcomes:
+            self.logger.record("curriculum/success_rate", float(np.mean(self.outcomes)))
+
+    def _on_step(self) -> bool:
+        for info in self.locals.get("infos", []):
+            if "metrics" in info:
+                self.outcomes.append(info["metrics"].get("is_success", 0.0))
+        if (self.success_rate is not None
+                and len(self.outcomes) == self.outcomes.maxlen
+                and self.num_timesteps - self.stage_start >= self.min_timesteps
+                and np.mean(self.outcomes) >= self.success_rate):
+            self.advanced = True
+            return False
+        return True
+
+def load_curriculum(config_path):
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+    if not config.get("stages"):
+        raise ValueError(f"{config_path} defines no curriculum stages")
+    for i, stage in enumerate(config["stages"]):
+        stage.setdefault("name", f"stage{i}")
+        if "timesteps" not in stage:
+            raise ValueError(f"Curriculum stage {stage['name']} has no timesteps")
+    return config
+
+def run_curriculum(config_path, run_name="curriculum", load_model_path=None, tensorboard=True):
+    """
+    Trains through every stage of the curriculum at `config_path` in this process.
+    Logs go to runs/<run_name>/logs (TensorBoard unless `tensorboard` is False).
+    Returns:
+        list of dicts (one per stage): name, start/end timestep and whether it advanced early.
+    """
+    config = load_curriculum(config_path)
+    env_cfg = dict(config["env"])
+    train_cfg = dict(config["training"])
+    eval_cfg = config.get("evaluation", {})
+    stages = config["stages"]
+
+    base_dir = f"runs/{run_name}"
+    model_dir = os.path.join(base_dir, "models")
+    log_dir = os.path.join(base_dir, "logs")
+    os.makedirs(model_dir, exist_ok=True)
+    os.makedirs(log_dir, exist_ok=True)
+    tb_dir = log_dir if tensorboard else None
+
+    # 1. Envs are built once, already in the first stage's configuration
+    first_env = dict(env_cfg, **stages[0].get("env", {}))
+    n_envs = train_cfg.get("n_envs", 8)
+    env = make_vec_env(first_env, n_envs, backend=train_cfg.get("vec_env", "subproc"))
+    env = VecMonitor(env, filename=os.path.join(log_dir, "monitor.csv"))
+    eval_env = DummyVecEnv([make_env(**first_env)])
+
+    # 2. Model: created (or loaded) once, with the first stage's hyperparameters
+    first_train = dict(train_cfg, **stages[0].get("training", {}))
+    hyperparams = {k: first_train[k] for k in STAGE_HYPERPARAMS if k in first_train}
+    if load_model_path and os.path.exists(load_model_path):
+        print(f"Loading pretrained model from: {load_model_path}")
+        model = PPO.load(load_model_path, env=env, tensorboard_log=tb_dir)
+        apply_hyperparams(model, **hyperparams)
+    else:
+        model = PPO(first_train["policy"], env, verbose=1, tensorboard_log=tb_dir, device="auto", **hyperparams)
+
+    checkpoint_callback = CheckpointCallback(
+        save_freq=max(1, train_cfg.get("checkpoint_freq", 100000) // n_envs),
+        save_path=model_dir,
+        name_prefix="ppo_gridlock"
+    )
+    eval_callback = EvalCallback(
+        eval_env,
+        best_model_save_path=os.path.join(base_dir, "best_model"),
+        log_path=log_dir,
+        eval_freq=max(1, eval_cfg.get("eval_freq", 50000) // n_envs),
+        n_eval_episodes=eval_cfg.get("n_eval_episodes", 20),
+        deterministic=True,
+        render=False
+    )
+    callbacks = [checkpoint_callback, eval_callback, MetricsCallback(),
+                 ThroughputCallback(per_worker=train_cfg.get("log_per_worker", False))]
+    if env_cfg.get("difficulty_sampling"):
+        callbacks.append(AdaptiveDifficultyCallback())
+
+    # 3. Stages
+    history = []
+    for i, stage in enumerate(stages):
+        if i > 0:
+            configure_envs(env, **stage.get("env", {}))
+            configure_envs(eval_env, **stage.get("env", {}))
+            apply_hyperparams(model, **stage.get("training", {}))
+            # Start the stage on fresh episodes in the new configuration
+            model._last_obs = None
+        stage_callback = StageCallback(i, **stage.get("advance", {}))
+
+        start = model.num_timesteps
+        print(f"Curriculum stage {stage['name']} ({i + 1}/{len(stages)}) from step {start}: "
+              f"env={stage.get('env', {})} training={stage.get('training', {})}")
+        model.learn(
+            total_timesteps=stage["timesteps"],
+            callback=callbacks + [stage_callback],
+            reset_num_timesteps=(i == 0 and not load_model_path),
+            tb_log_name="curriculum"
+        )
+        model.save(os.path.join(model_dir, f"stage_{stage['name']}"))
+        history.append({
+            "name": stage["name"], "start": start, "end": model.num_timesteps,
+            "advanced": stage_callback.advanced
+        })
+
+    model.save(os.path.join(model_dir, "final_model"))
+    print("Curriculum complete.")
+    env.close()
+    eval_env.close()
+    return history
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--config", type=str, default="configs/train/curriculum.yaml")
+    parser.add_argument("--run-name", type=str, default="curriculum")
+    parser.add_argument("--load-model", type=str, default=None, help="Path to pretrained model.zip")
+    args = parser.parse_args()
+
+    run_curriculum(args.config, args.run_name, args.load_model)
@@ -0,0 +1,167 @@
+import os
+import numpy as np
+import yaml
+from multiprocessing import Pool
+
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.maps.solver import solve
+
+# Oracle demonstration datasets for behavior-cloning pretraining.
+# Episodes are played in a GridEnv built from a training config's env section, so
+# observations and rewards are exactly what the policy sees during RL. Map i is
+# the env's map for reset(seed=seed + i); the oracle follows the exact solver's
+# optimal plan (maps/solver.py) and unsolvable maps are skipped.
+#
+# A dataset is a directory of shards, each written by one worker as memory-mappable
+# .npy files, plus meta.yaml listing the shards:
+#   shard_00000_grid.npy    (n, C, H, W) int8   observation "grid"
+#   shard_00000_keys.npy    (n, 1) int8         observation "keys_collected"
+#   shard_00000_action.npy  (n,) int8           oracle action
+#   shard_00000_rtg.npy     (n,) float32        undiscounted return-to-go (env rewards)
+
+META_FILE = "meta.yaml"
+FIELDS = ("grid", "keys", "action", "rtg")
+FORMAT_VERSION = 1
+
+def shard_name(index):
+    return f"shard_{index:05d}"
+
+def _shard_path(path, name, field):
+    return os.path.join(path, f"{name}_{field}.npy")
+
+def oracle_episode(env, seed):
+    """
+    Plays the optimal plan of the env's map for `seed`.
+    Returns:
+        dict of FIELDS arrays for the episode, or None if the map is unsolvable.
+    """
+    obs, _ = env.reset(seed=seed)
+    length, actions = solve(env.unwrapped.grid_static)
+    if length < 0:
+        return None
+    grids, keys, rewards = [], [], []
+    for action in actions:
+        grids.append(obs["grid"])
+        keys.append(obs["keys_collected"])
+        obs, reward, terminated, truncated, _ = env.step(action)
+        rewards.append(reward)
+        if terminated or truncated:
+            break
+    rtg = np.cumsum(rewards[::-1])[::-1]
+    return {
+        "grid": np.stack(grids),
+        "keys": np.stack(keys),
+        "action": np.asarray(actions[:len(rewards)], dtype=np.int8),
+        "rtg": rtg.astype(np.float32),
+    }
+
+def _demo_shard(args):
+    path, env_cfg, seed, index, first_map, n_maps = args
+    env = GridEnv(**env_cfg)
+    episodes = []
+    for i in range(first_map, first_map + n_maps):
+        episode = oracle_episode(env, seed + i)
+        if episode is not None:
+            episodes.append(episode)
+    # Zero-length arrays keep the shapes when no map of the shard was solvable
+    spaces = env.observation_space
+    episodes.append({
+        "grid": np.zeros((0,) + spaces["grid"].shape, dtype=np.int8),
+        "keys": np.zeros((0,) + spaces["keys_collected"].shape, dtype=np.int8),
+        "action": np.zeros(0, dtype=np.int8),
+        "rtg": np.zeros(0, dtype=np.float32),
+    })
+    name = shard_name(index)
+    for field in FIELDS:
+        np.save(_shard_path(path, name, field), np.concatenate([e[field] for e in episodes]))
+    n_episodes = len(episodes) - 1
+    n = sum(len(e["action"]) for e in episodes)
+    return {"name": name, "transitions": int(n), "episodes": n_episodes, "unsolvable": n_maps - n_episodes}
+
+def build_demos(path, n_maps, env_cfg, seed=0, shard_maps=4096, workers=1):
+    """
+    Generates oracle demonstrations for `n_maps` maps of GridEnv(**env_cfg) into `path`.
+    Shard j covers maps [j * shard_maps, (j + 1) * shard_maps) and is written by its worker,
+    so the dataset is the same for any number of `workers`.
+    Returns:
+        DemoDataset.
+    """
+    env_cfg = dict(env_cfg)
+    os.makedirs(path, exist_ok=True)
+    shards = [
+        (path, env_cfg, seed, j, start, min(shard_maps, n_maps - start))
+        for j, start in enumerate(range(0, n_maps, shard_maps))
+    ]
+    if workers > 1:
+        with Pool(workers) as pool:
+            results = pool.map(_demo_shard, shards)
+    else:
+        results = [_demo_shard(shard) for shard in shards]
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "env": env_cfg,
+        "seed": int(seed),
+        "n_maps": int(n_maps),
+        "transitions": sum(r["transitions"] for r in results),
+        "shards": results,
+    }
+    with open(os.path.join(path, META_FILE), "w") as f:
+        yaml.dump(meta, f)
+    return DemoDataset(path)
+
+class DemoDataset:
+    """
+    Read-only demonstration dataset (see build_demos). Shards are opened as memory maps;
+    iter_batches streams shuffled minibatches without loading the dataset into memory.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE), "r") as f:
+            self.meta = yaml.safe_load(f)
+        self.shards = [
+            {field: np.load(_shard_path(path, s["name"], field), mmap_mode="r") for field in FIELDS}
+            for s in self.meta["shards"] if s["transitions"] > 0
+        ]
+
+    def __len__(self):
+        return sum(len(s["action"]) for s in self.shards)
+
+    @property
+    def obs_shape(self):
+        return self.shards[0]["grid"].shape[1:] if self.shards else None
+
+    def iter_batches(self, batch_size, rng=None, shuffle=True):
+        """
+        Yields dicts of FIELDS arrays with `batch_size` rows (the last one may be smaller).
+        With `shuffle`, shards are visited in random order and rows are permuted within a
+        shard; leftovers carry over to the next shard so batches stay full. Only one
+        shard's rows are gathered at a time.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        order = rng.permutation(len(self.shards)) if shuffle else range(len(self.shards))
+        carry = None
+        for s in order:
+            shard = self.shards[s]
+            rows = rng.permutation(len(shard["action"])) if shuffle else np.arange(len(shard["action"]))
+            start = 0
+            if carry is not None:
+                need = batch_size - len(carry["action"])
+                take = np.sort(rows[:need])
+                batch = {f: np.concatenate([carry[f], shard[f][take]]) for f in FIELDS}
+                start = len(take)
+                carry = None
+                if len(batch["action"]) < batch_size:
+                    carry = batch
+                    continue
+                yield batch
+            for i in range(start, len(rows), batch_size):
+                # Sorted indices read the memmap front to back
+                take = np.sort(rows[i:i + batch_size])
+                batch = {f: np.asarray(shard[f][take]) for f in FIELDS}
+                if len(take) < batch_size:
+                    carry = batch
+                else:
+                    yield batch
+        if carry is not None:
+            yield carry
@@ -2,9 +2,102 @@ import yaml
 import numpy as np
 import argparse
 import os
-from stable_baselines3 import PPO
 from gridlock_rl.envs.grid_env import GridEnv
-from stable_baselines3.common.evaluation import evaluate_policy
+from gridlock_rl.maps.bank import MapBank
+
+def run_episodes(model, env_cfg, seeds, batch_size=256, deterministic=True, grids=None):
+    """
+    Batched evaluation engine: plays one episode per seed.
+    Up to `batch_size` GridEnvs run side by side; each step stacks the observations of the
+    running episodes and calls model.predict once. Finished episodes are retired and their
+    slot is refilled with the next pending seed. A seed of None resets with a random map.
+    If `grids` is given (e.g. a benchmark bundle), episode i plays grids[i] instead of
+    generating a map from seeds[i].
+
+    Returns:
+        list[dict]: per-seed results in `seeds` order, with keys
+            seed, event, steps, keys_collected, first_key_step (None if no key was collected).
+    """
+    seeds = list(seeds)
+    n_slots = min(batch_size, len(seeds))
+    envs = [GridEnv(**env_cfg) for _ in range(n_slots)]
+    results = [None] * len(seeds)
+    if n_slots == 0:
+        return results
+
+    # Stacked observation buffers, one row per slot
+    space = envs[0].observation_space
+    obs_batch = {key: np.zeros((n_slots,) + sub.shape, dtype=sub.dtype) for key, sub in space.spaces.items()}
+    episode = [None] * n_slots          # index into seeds of the episode running in each slot
+    steps = np.zeros(n_slots, dtype=np.int64)
+    first_key = [None] * n_slots
+    next_seed = 0
+
+    def start(slot):
+        nonlocal next_seed
+        options = {"grid": grids[next_seed]} if grids is not None else None
+        obs, _ = envs[slot].reset(seed=seeds[next_seed], options=options)
+        for key in obs_batch:
+            obs_batch[key][slot] = obs[key]
+        episode[slot] = next_seed
+        steps[slot] = 0
+        first_key[slot] = None
+        next_seed += 1
+
+    for slot in range(n_slots):
+        start(slot)
+    active = list(range(n_slots))
+
+    while active:
+        idx = np.array(active)
+        actions, _ = model.predict({key: buf[idx] for key, buf in obs_batch.items()}, deterministic=deterministic)
+
+        still_active = []
+        for slot, action in zip(active, actions):
+            obs, _, terminated, truncated, info = envs[slot].step(action)
+            steps[slot] += 1
+            if first_key[slot] is None and info["keys_collected"] > 0:
+                first_key[slot] = int(steps[slot])
+
+            if terminated or truncated:
+                i = episode[slot]
+                results[i] = {
+                    "seed": seeds[i],
+                    "event": info["event"],
+                    "steps": int(steps[slot]),
+                    "keys_collected": int(info["keys_collected"]),
+                    "first_key_step": first_key[slot],
+                }
+                if next_seed < len(seeds):
+                    start(slot)
+                    still_active.append(slot)
+            else:
+                for key in obs_batch:
+                    obs_batch[key][slot] = obs[key]
+                still_active.append(slot)
+        active = still_active
+
+    return results
+
+def load_benchmark(path):
+    """Opens a benchmark bundle (see maps.benchmark) and checks its content hash."""
+    bank = MapBank(path)
+    if bank.seeds is None:
+        raise ValueError(f"{path} is a map bank without seeds, not a benchmark bundle")
+    if not bank.verify():
+        raise ValueError(f"Benchmark bundle {path} does not match its content hash")
+    return bank
+
+def load_model(path):
+    """
+    Loads a policy for run_episodes: a NumPy export (.npz, see agents/export.py) or an SB3 PPO zip.
+    torch and stable-baselines3 are only imported for the latter.
+    """
+    if path.endswith(".npz"):
+        from gridlock_rl.agents.export import NumpyPolicy
+        return NumpyPolicy(path)
+    from stable_baselines3 import PPO
+    return PPO.load(path)
 
 def evaluate(model_path, config_path, benchmark_path=None, n_episodes=100):
     # Load config for env settings
@@ -12,9 +105,13 @@ def evaluate(model_path, config_path, benchmark_path=None, n_episodes=100):
         config = yaml.safe_load(f)
     env_cfg = config["env"]
     
-    # Load seeds
+    # Load seeds (seed list yaml) or stored maps (benchmark bundle directory)
     bench_seeds = []
-    if benchmark_path and os.path.exists(benchmark_path):
+    bench_grids = None
+    if benchmark_path and os.path.isdir(benchmark_path):
+        bench_grids = load_benchmark(benchmark_path)
+        bench_seeds = bench_grids.seeds.tolist()
+    elif benchmark_path and os.path.exists(benchmark_path):
         with open(benchmark_path, "r") as f:
             bench_seeds = yaml.safe_load(f)["seeds"]
     
@@ -26,40 +123,18 @@ def evaluate(model_path, config_path, benchmark_path=None, n_episodes=100):
         print(f"Evaluating on {n_episodes} random seeds...")
 
     # Load Model
-    model = PPO.load(model_path)
+    model = load_model(model_path)
     
-    # Create Env
-    env = GridEnv(**env_cfg)
+    seeds = bench_seeds if bench_seeds else list(range(n_episodes))
+    episodes = run_episodes(model, env_cfg, seeds, grids=bench_grids)
     
     results = {
-        "success": 0,
-        "trap": 0,
-        "timeout": 0,
-        "steps": [],
-        "keys": []
+        "success": sum(e["event"] == "success" for e in episodes),
+        "trap": sum(e["event"] == "trap" for e in episodes),
+        "timeout": sum(e["event"] == "timeout" for e in episodes),
+        "steps": [e["steps"] for e in episodes],
+        "keys": [e["keys_collected"] for e in episodes]
     }
-    
-    for i in range(n_episodes):
-        seed = bench_seeds[i] if bench_seeds else i
-        obs, info = env.reset(seed=seed)
-        terminated, truncated = False, False
-        steps = 0
-        
-        while not (terminated or truncated):
-            action, _ = model.predict(obs, deterministic=True)
-            obs, reward, terminated, truncated, info = env.step(action)
-            steps += 1
-            
-        event = info["event"]
-        results["steps"].append(steps)
-        results["keys"].append(info["keys_collected"])
-        
-        if event == "success":
-            results["success"] += 1
-        elif event == "trap":
-            results["trap"] += 1
-        elif event == "timeout":
-            results["timeout"] += 1
             
     # Metrics
     n = n_episodes
@@ -4,44 +4,22 @@ import argparse
 import os
 import pandas as pd
 from stable_baselines3 import PPO
-from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.training.eval import run_episodes, load_benchmark
 
-def run_eval_batch(model, seeds, config, label="Default"):
+def run_eval_batch(model, seeds, config, label="Default", grids=None):
     print(f"\nRunning {label} Evaluation ({len(seeds)} episodes)...")
     
-    env = GridEnv(**config)
+    # PPO default deterministic=True
+    episodes = run_episodes(model, config, seeds, deterministic=True, grids=grids)
     
     results = {
-        "success": 0,
-        "trap": 0,
-        "timeout": 0,
-        "steps": [],
-        "keys": [],
-        "success_steps": []
+        "success": sum(e["event"] == "success" for e in episodes),
+        "trap": sum(e["event"] == "trap" for e in episodes),
+        "timeout": sum(e["event"] == "timeout" for e in episodes),
+        "steps": [e["steps"] for e in episodes],
+        "keys": [e["keys_collected"] for e in episodes],
+        "success_steps": [e["steps"] for e in episodes if e["event"] == "success"]
     }
-    
-    for seed in seeds:
-        # PPO default deterministic=True
-        obs, info = env.reset(seed=seed)
-        terminated, truncated = False, False
-        steps = 0
-        
-        while not (terminated or truncated):
-            action, _ = model.predict(obs, deterministic=True)
-            obs, reward, terminated, truncated, info = env.step(action)
-            steps += 1
-            
-        event = info["event"]
-        results["steps"].append(steps)
-        results["keys"].append(info["keys_collected"])
-        
-        if event == "success":
-            results["success"] += 1
-            results["success_steps"].append(steps)
-        elif event == "trap":
-            results["trap"] += 1
-        elif event == "timeout":
-            results["timeout"] += 1
             
     n = len(seeds)
     metrics = {
@@ -58,6 +36,18 @@ def run_eval_batch(model, seeds, config, label="Default"):
     }
     return metrics
 
+def load_bench(path):
+    """
+    Loads an evaluation set: a benchmark bundle directory (stored maps) or a seed list yaml.
+    Returns (seeds, config or None, grids or None).
+    """
+    if os.path.isdir(path):
+        bundle = load_benchmark(path)
+        return bundle.seeds.tolist(), dict(bundle.config), bundle
+    with open(path, "r") as f:
+        data = yaml.safe_load(f)
+    return data["seeds"], data.get("config"), None
+
 def eval_generalization(model_path, id_config_path, id_bench_path, ood_bench_path):
     # Load Model
     print(f"Loading model: {model_path}")
@@ -66,16 +56,12 @@ def eval_generalization(model_path, id_config_path, id_bench_path, ood_bench_pat
     # 1. ID Evaluation
     with open(id_config_path, "r") as f:
         id_cfg = yaml.safe_load(f)["env"]
-    with open(id_bench_path, "r") as f:
-        id_seeds = yaml.safe_load(f)["seeds"]
+    id_seeds, _, id_grids = load_bench(id_bench_path)
         
-    m_id = run_eval_batch(model, id_seeds, id_cfg, label="ID (Train-Like)")
+    m_id = run_eval_batch(model, id_seeds, id_cfg, label="ID (Train-Like)", grids=id_grids)
     
     # 2. OOD Evaluation
-    with open(ood_bench_path, "r") as f:
-        ood_data = yaml.safe_load(f)
-        ood_seeds = ood_data["seeds"]
-        ood_cfg = ood_data["config"]
+    ood_seeds, ood_cfg, ood_grids = load_bench(ood_bench_path)
         
     # Inject ID config parameters (e.g. padding, max_steps) into OOD config to ensure compatibility
     # The Model expects a specific observation shape (max_width, max_height)
@@ -93,7 +79,7 @@ def eval_generalization(model_path, id_config_path, id_bench_path, ood_bench_pat
     
     # If this crashes, it proves the architecture is not generalizable by default.
     try:
-        m_ood = run_eval_batch(model, ood_seeds, ood_cfg, label="OOD (Generalized)")
+        m_ood = run_eval_batch(model, ood_seeds, ood_cfg, label="OOD (Generalized)", grids=ood_grids)
     except ValueError as e:
         print(f"\n[!] OOD Evaluation Failed: {e}")
         print("Reason: Model input shape mismatch. Standard SB3 PPO cannot handle variable grid sizes.")
@@ -0,0 +1,55 @@
+import numpy as np
+import torch as th
+
+# Behavior-cloning pretraining of an SB3 MultiInputPolicy on oracle demonstrations
+# (training/demos.py). Minimizes the negative log-likelihood of the oracle actions,
+# optionally with a value loss towards the return-to-go, using its own Adam optimizer
+# so PPO's optimizer state is untouched.
+
+def _to_obs(batch, device):
+    return {
+        "grid": th.as_tensor(batch["grid"], device=device),
+        "keys_collected": th.as_tensor(batch["keys"], device=device),
+    }
+
+def pretrain_policy(model, dataset, epochs=1, batch_size=256, learning_rate=1e-3, value_coef=0.0,
+                    seed=0, verbose=1):
+    """
+    Fits model.policy to `dataset` (a DemoDataset) by behavior cloning.
+    Returns:
+        list of per-epoch dicts: loss, accuracy (oracle action is the policy's mode).
+    """
+    obs_shape = model.observation_space["grid"].shape
+    if dataset.obs_shape != obs_shape:
+        raise ValueError(f"Demonstrations have grid observations of shape {dataset.obs_shape}, "
+                         f"the model expects {obs_shape}")
+    policy = model.policy
+    optimizer = th.optim.Adam(policy.parameters(), lr=learning_rate)
+    rng = np.random.default_rng(seed)
+    history = []
+    policy.set_training_mode(True)
+    for epoch in range(epochs):
+        total_loss, correct, seen = 0.0, 0, 0
+        for batch in dataset.iter_batches(batch_size, rng):
+            obs = _to_obs(batch, policy.device)
+            actions = th.as_tensor(batch["action"], device=policy.device).long()
+            distribution = policy.get_distribution(obs)
+            loss = -distribution.log_prob(actions).mean()
+            if value_coef:
+                returns = th.as_tensor(batch["rtg"], device=policy.device)
+                loss = loss + value_coef * th.nn.functional.mse_loss(policy.predict_values(obs).flatten(), returns)
+
+            optimizer.zero_grad()
+            loss.backward()
+            th.nn.utils.clip_grad_norm_(policy.parameters(), model.max_grad_norm)
+            optimizer.step()
+
+            correct += int((distribution.mode() == actions).sum())
+            total_loss += loss.item() * len(actions)
+            seen += len(actions)
+        stats = {"loss": total_loss / max(seen, 1), "accuracy": correct / max(seen, 1)}
+        history.append(stats)
+        if verbose:
+            print(f"Pretrain epoch {epoch + 1}/{epochs}: loss={stats['loss']:.4f} accuracy={stats['accuracy']:.3f}")
+    policy.set_training_mode(False)
+    return history
@@ -7,17 +7,40 @@ from stable_baselines3.common.callbacks import CheckpointCallback, EvalCallback
 from stable_baselines3.common.vec_env import SubprocVecEnv, DummyVecEnv, VecMonitor
 
 from gridlock_rl.envs.grid_env import GridEnv
-from gridlock_rl.envs.wrappers import MetricLoggingWrapper
+from gridlock_rl.envs.wrappers import MetricLoggingWrapper, StepTimingWrapper
+from gridlock_rl.envs.vec_env import GridVecEnv
+from gridlock_rl.envs.shm_vec_env import ShmVecEnv
 from gridlock_rl.callbacks.metrics_callback import MetricsCallback
+from gridlock_rl.callbacks.throughput_callback import ThroughputCallback
+from gridlock_rl.callbacks.difficulty_callback import AdaptiveDifficultyCallback
 
 def make_env(**kwargs):
     def _init():
         env = GridEnv(**kwargs)
         env = MetricLoggingWrapper(env)
+        env = StepTimingWrapper(env)
         return env
     return _init
 
-def train(config_path, run_name="default", load_model_path=None):
+def make_vec_env(env_cfg, n_envs, backend="subproc"):
+    """
+    Builds the training vector env.
+    backend: "subproc" (one GridEnv per worker process), "shm" (same, with observations
+             passed through shared memory), "dummy" (GridEnvs in-process)
+             or "grid" (GridVecEnv, all envs batched in one NumPy array).
+    """
+    if backend == "grid":
+        return GridVecEnv(n_envs, **env_cfg)
+    env_fns = [make_env(**env_cfg) for _ in range(n_envs)]
+    if backend == "subproc":
+        return SubprocVecEnv(env_fns)
+    if backend == "shm":
+        return ShmVecEnv(env_fns)
+    if backend == "dummy":
+        return DummyVecEnv(env_fns)
+    raise ValueError(f"Unknown vec_env backend: {backend}")
+
+def train(config_path, run_name="default", load_model_path=None, demos_path=None, pretrain_epochs=1):
     with open(config_path, "r") as f:
         config = yaml.safe_load(f)
         
@@ -40,13 +63,10 @@ def train(config_path, run_name="default", load_model_path=None):
     os.makedirs(log_dir, exist_ok=True)
     
     # 1. Create Vectorized Environment
-    n_envs = 8 # Increased parallel envs for better exploration signal
+    n_envs = train_cfg.get("n_envs", 8) # Increased parallel envs for better exploration signal
     
-    # Use SubprocVecEnv for speed
-    env = SubprocVecEnv([
-        make_env(**env_cfg) 
-        for _ in range(n_envs)
-    ])
+    # SubprocVecEnv by default; "grid" batches all envs in-process (GridVecEnv)
+    env = make_vec_env(env_cfg, n_envs, backend=train_cfg.get("vec_env", "subproc"))
     
     # Hardening: Use VecMonitor for correct parallel logging
     env = VecMonitor(env, filename=os.path.join(log_dir, "monitor.csv"))
@@ -65,6 +85,7 @@ def train(config_path, run_name="default", load_model_path=None):
     )
     
     metrics_callback = MetricsCallback()
+    throughput_callback = ThroughputCallback(per_worker=train_cfg.get("log_per_worker", False))
 
     eval_callback = EvalCallback(
         eval_env,
@@ -74,6 +95,10 @@ def train(config_path, run_name="default", load_model_path=None):
         deterministic=True,
         render=False
     )
+    callbacks = [checkpoint_callback, eval_callback, metrics_callback, throughput_callback]
+    if env_cfg.get("difficulty_sampling"):
+        # Re-weights map difficulty buckets by recent success (needs a bank with difficulty.npz)
+        callbacks.append(AdaptiveDifficultyCallback())
     
     # 4. Initialize or Load Model
     if load_model_path and os.path.exists(load_model_path):
@@ -123,10 +148,22 @@ def train(config_path, run_name="default", load_model_path=None):
             device="auto"
         )
     
+    # 5. Optional behavior-cloning warm start on oracle demonstrations
+    if demos_path:
+        from gridlock_rl.training.demos import DemoDataset
+        from gridlock_rl.training.pretrain import pretrain_policy
+
+        demos = DemoDataset(demos_path)
+        print(f"Pretraining on {len(demos)} demonstration steps from: {demos_path}")
+        pretrain_policy(model, demos, epochs=pretrain_epochs,
+                        batch_size=train_cfg.get("pretrain_batch_size", 256),
+                        learning_rate=train_cfg.get("pretrain_learning_rate", 1e-3))
+        model.save(os.path.join(model_dir, "pretrained_model"))
+
     print(f"Starting training: {run_name}")
     model.learn(
         total_timesteps=train_cfg["total_timesteps"],
-        callback=[checkpoint_callback, eval_callback, metrics_callback],
+        callback=callbacks,
         reset_num_timesteps=False if load_model_path else True
     )
     
@@ -141,6 +178,9 @@ if __name__ == "__main__":
     parser.add_argument("--config", type=str, default="configs/train/ppo.yaml")
     parser.add_argument("--run-name", type=str, default="ppo_baseline")
     parser.add_argument("--load-model", type=str, default=None, help="Path to pretrained model.zip")
+    parser.add_argument("--demos", type=str, default=None,
+                        help="Oracle demonstration dataset (scripts/make_dataset/build_demos.py) to pretrain on")
+    parser.add_argument("--pretrain-epochs", type=int, default=1)
     args = parser.parse_args()
     
-    train(args.config, args.run_name, args.load_model)
+    train(args.config, args.run_name, args.load_model, args.demos, args.pretrain_epochs)
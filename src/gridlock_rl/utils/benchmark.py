@@ -0,0 +1,310 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import numpy as np
+
+from gridlock_rl.core.constants import TileType
+
+# Throughput benchmarks for the hot paths. Every metric is operations per second
+# (higher is better), measured as the best of `repeat` timed runs of at least
+# `min_time` seconds each. Results are stored as JSON keyed by git commit and
+# compared against a stored baseline: a metric fails if it drops by more than
+# `threshold` (a fraction) below its baseline value.
+# Every run also times REFERENCE, a fixed Python + NumPy workload that does not
+# touch this package. The default gate is relative: each metric is divided by the
+# run's REFERENCE before comparing, so a uniformly slower (or busier) machine does
+# not fail it; --absolute compares raw ops/s. A metric that fails is re-measured
+# (its suite is run again, `retries` times) and only reported if it fails every
+# attempt, so a burst of load on a shared machine does not fail the gate while a
+# real slowdown still does. The baseline records the commit and machine that
+# produced it and is only ever written whole by --update-baseline.
+
+DEFAULT_RESULTS = "benchmarks/results.json"
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_RETRIES = 2
+REFERENCE = "reference"
+
+GENERATOR_CASES = [
+    (6, 6, 0.05),
+    (8, 8, 0.1),
+    (8, 8, 0.3),
+    (12, 12, 0.15),
+]
+
+def time_op(fn, min_time=0.2, repeat=3):
+    """
+    Calls `fn()` (one operation) in timed loops of at least `min_time` seconds.
+    Returns the best ops/s over `repeat` loops.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        n = 0
+        start = time.perf_counter()
+        elapsed = 0.0
+        while elapsed < min_time:
+            fn()
+            n += 1
+            elapsed = time.perf_counter() - start
+        best = max(best, n / elapsed)
+    return best
+
+_REFERENCE_DATA = np.random.default_rng(0).integers(0, 1 << 30, size=4096)
+
+def _reference_op():
+    sum(i * i for i in range(1000))
+    np.sort(_REFERENCE_DATA)
+
+def _fixed_grid(height=8, width=8):
+    """Open map with no traps, so random walks rarely end an episode."""
+    grid = np.zeros((height, width), dtype=np.int8)
+    grid[0, 0] = TileType.START
+    grid[height - 1, width - 1] = TileType.GOAL
+    grid[0, width - 1] = TileType.KEY
+    grid[height - 1, 0] = TileType.KEY
+    grid[height // 2, width // 2] = TileType.KEY
+    return grid
+
+def _stepper(env, grid):
+    """One random step per call; resets onto `grid` when the episode ends."""
+    actions = np.random.default_rng(0).integers(0, 4, size=4096)
+    state = {"i": 0}
+    env.reset(seed=0, options={"grid": grid})
+
+    def step():
+        _, _, terminated, truncated, _ = env.step(actions[state["i"] & 4095])
+        state["i"] += 1
+        if terminated or truncated:
+            env.reset(options={"grid": grid})
+    return step
+
+def bench_env(min_time, repeat):
+    from gridlock_rl.envs.grid_env import GridEnv
+    from gridlock_rl.envs.wrappers import MetricLoggingWrapper
+
+    results = {}
+    grid = _fixed_grid()
+    for dense in (False, True):
+        suffix = "_dense" if dense else ""
+        env = GridEnv(width=8, height=8, dense_reward=dense)
+        seeds = iter(range(10**9))
+        results["env_reset" + suffix] = time_op(lambda: env.reset(seed=next(seeds)), min_time, repeat)
+        results["env_step" + suffix] = time_op(_stepper(env, grid), min_time, repeat)
+
+    env = GridEnv(width=8, height=8)
+    env.reset(seed=0)
+    results["env_get_obs"] = time_op(env._get_obs, min_time, repeat)
+    results["env_step_metric_wrapper"] = time_op(_stepper(MetricLoggingWrapper(GridEnv(width=8, height=8)), grid),
+                                                 min_time, repeat)
+    return results
+
+def bench_maps(min_time, repeat):
+    from gridlock_rl.maps.encoding import canonical_hash, pack_grids, unpack_grids
+    from gridlock_rl.maps.generator import MapGenerator
+    from gridlock_rl.maps.validation import validate_map, validate_map_bitboard
+    from gridlock_rl.envs.value_iteration import value_iteration
+
+    results = {}
+    for height, width, density in GENERATOR_CASES:
+        gen = MapGenerator(width=width, height=height, trap_density=density)
+        seeds = iter(range(10**9))
+        results[f"generate_{height}x{width}_d{density:.2f}"] = time_op(lambda: gen.generate(seed=next(seeds)),
+                                                                       min_time, repeat)
+
+    gen = MapGenerator(width=8, height=8, trap_density=0.1)
+    results["generate_batch_8x8_d0.10_maps"] = 1024 * time_op(lambda: gen.generate_batch(1024, seed=0),
+                                                              min_time, repeat)
+    grids, _ = gen.generate_batch(65536, seed=0)
+    packed = pack_grids(grids)
+    results["pack_8x8_maps"] = len(grids) * time_op(lambda: pack_grids(grids), min_time, repeat)
+    results["unpack_8x8_maps"] = len(grids) * time_op(lambda: unpack_grids(packed, 8, 8), min_time, repeat)
+    results["canonical_hash_8x8_maps"] = len(grids) * time_op(lambda: canonical_hash(grids), min_time, repeat)
+    results["value_iteration_8x8_maps"] = 256 * time_op(lambda: value_iteration(grids[:256]), min_time, repeat)
+    grid, _ = gen.generate(seed=0)
+    results["validate_map"] = time_op(lambda: validate_map(grid), min_time, repeat)
+    results["validate_map_bitboard"] = time_op(lambda: validate_map_bitboard(grid), min_time, repeat)
+    return results
+
+def bench_vec_env(min_time, repeat, n_envs=64):
+    from stable_baselines3.common.vec_env import DummyVecEnv
+    from gridlock_rl.envs.grid_env import GridEnv
+    from gridlock_rl.envs.vec_env import GridVecEnv
+    from gridlock_rl.envs.wrappers import MetricLoggingWrapper
+
+    results = {}
+    actions = np.random.default_rng(0).integers(0, 4, size=(256, n_envs))
+    backends = {
+        "grid": lambda: GridVecEnv(n_envs, width=8, height=8),
+        "dummy": lambda: DummyVecEnv([lambda: MetricLoggingWrapper(GridEnv(width=8, height=8))] * n_envs),
+    }
+    for name, make in backends.items():
+        venv = make()
+        venv.seed(0)
+        venv.reset()
+        state = {"i": 0}
+
+        def step():
+            venv.step(actions[state["i"] & 255])
+            state["i"] += 1
+        # ops are vec steps; report env steps/s
+        results[f"vec_env_{name}_{n_envs}_steps"] = n_envs * time_op(step, min_time, repeat)
+        venv.close()
+    return results
+
+SUITES = {
+    "env": bench_env,
+    "maps": bench_maps,
+    "vec_env": bench_vec_env,
+}
+
+def run_suite(suites=None, min_time=0.2, repeat=3, owners=None):
+    """
+    Runs the named suites (all by default).
+    Returns {metric: ops/s}, including REFERENCE (best of a run before and after the suites).
+    `owners`, if given, is filled with {metric: suite name}.
+    """
+    reference = time_op(_reference_op, min_time, repeat)
+    results = {}
+    for name in suites or SUITES:
+        suite_results = SUITES[name](min_time, repeat)
+        if owners is not None:
+            owners.update(dict.fromkeys(suite_results, name))
+        results.update(suite_results)
+    results[REFERENCE] = max(reference, time_op(_reference_op, min_time, repeat))
+    return results
+
+def git_commit():
+    """Short HEAD hash, with a -dirty suffix when tracked files have uncommitted changes."""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                capture_output=True, text=True, check=True)
+        return out.stdout.strip() + ("-dirty" if status.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def machine_info():
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+
+def save_results(path, commit, results):
+    """Adds `results` under `commit` in the JSON file at `path` (created if missing)."""
+    data = load_json(path) or {}
+    data[commit] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": machine_info(),
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+def load_json(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, relative=False):
+    """
+    Compares ops/s `results` to `baseline` ({metric: ops/s}).
+    With `relative`, both sides are first divided by their own REFERENCE (if both have one).
+    Returns:
+        list of (metric, baseline, current, change) for metrics that dropped by more than
+        `threshold`; change is current / baseline - 1, after normalization. Metrics missing on
+        either side are skipped.
+    """
+    scale = 1.0
+    if relative and results.get(REFERENCE, 0) > 0 and baseline.get(REFERENCE, 0) > 0:
+        scale = results[REFERENCE] / baseline[REFERENCE]
+    regressions = []
+    for name, base in sorted(baseline.items()):
+        if name == REFERENCE or name not in results or base <= 0:
+            continue
+        change = results[name] / (base * scale) - 1.0
+        if change < -threshold:
+            regressions.append((name, base, results[name], change))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run throughput benchmarks and check for regressions")
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="Suites to run (default: all)")
+    parser.add_argument("--out", type=str, default=DEFAULT_RESULTS, help="Results JSON, keyed by commit")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed fractional drop below baseline")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="Re-runs of the suites with failing metrics; a metric must fail every attempt")
+    parser.add_argument("--absolute", action="store_true",
+                        help="Gate on raw ops/s instead of ops/s relative to the reference workload")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Replace the whole baseline file with the results of this run")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    owners = {}
+    results = run_suite(args.suite, args.min_time, args.repeat, owners)
+    save_results(args.out, commit, results)
+
+    baseline_entry = load_json(args.baseline) or {}
+    baseline = baseline_entry.get("results", {})
+    relative = not args.absolute and REFERENCE in baseline
+    scale = results[REFERENCE] / baseline[REFERENCE] if relative else 1.0
+    print(f"Benchmarks @ {commit} (ops/s, change vs baseline{' relative to reference' if relative else ''})")
+    if baseline_entry.get("machine"):
+        print(f"  baseline: commit {baseline_entry.get('commit')} on {baseline_entry['machine'].get('node')}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        if name == REFERENCE:
+            delta = ""
+        elif base:
+            delta = f"{value / (base * scale) - 1.0:+7.1%}"
+        else:
+            delta = "    new"
+        print(f"  {name:<34} {value:>14,.0f}  {delta}")
+
+    if args.update_baseline:
+        if commit.endswith("-dirty"):
+            print("Warning: uncommitted changes; the baseline will not match its recorded commit")
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        entry = {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "machine": machine_info(),
+            "min_time": args.min_time,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.baseline, "w") as f:
+            json.dump(entry, f, indent=2, sort_keys=True)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold, relative=relative)
+    for attempt in range(args.retries):
+        if not regressions:
+            break
+        failing = {r[0] for r in regressions}
+        suites = sorted({owners[name] for name in failing})
+        print(f"Re-measuring {', '.join(sorted(failing))} (attempt {attempt + 1}/{args.retries})")
+        retry = run_suite(suites, args.min_time, args.repeat)
+        still = {r[0] for r in compare(retry, baseline, args.threshold, relative=relative)}
+        regressions = [r for r in regressions if r[0] in still]
+    for name, base, current, change in regressions:
+        print(f"REGRESSION {name}: {current:,.0f} ops/s vs baseline {base:,.0f} ({change:+.1%})")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
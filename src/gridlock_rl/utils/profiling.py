@@ -0,0 +1,92 @@
+import os
+from time import perf_counter_ns
+
+# Opt-in phase profiling for the env and map generator hot paths.
+# PROFILER is process-global: instrumented code checks `PROFILER.enabled` once per
+# call and only reads the clock when it is set, so disabled profiling costs one
+# attribute lookup per call. Enable with GridEnv(profile=True), PROFILER.enable()
+# or the GRIDLOCK_PROFILE=1 environment variable (inherited by subprocess workers).
+
+ENV_VAR = "GRIDLOCK_PROFILE"
+
+class Profiler:
+    """
+    Accumulates nanosecond timers ({name: [calls, total_ns]}) and counters ({name: count}).
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.timers = {}
+        self.counters = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.timers = {}
+        self.counters = {}
+
+    def add_time(self, name, ns):
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, ns]
+        else:
+            timer[0] += 1
+            timer[1] += ns
+
+    def lap(self, name, start_ns):
+        """Records the time since `start_ns` under `name`; returns the current clock for the next phase."""
+        now = perf_counter_ns()
+        self.add_time(name, now - start_ns)
+        return now
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def stats(self):
+        """
+        Snapshot of this process's profile.
+        Returns:
+            dict: {"pid", "timers": {name: {"calls", "total_ns", "mean_ns"}}, "counters": {name: count}}
+        """
+        return {
+            "pid": os.getpid(),
+            "timers": {
+                name: {"calls": calls, "total_ns": total, "mean_ns": total / calls}
+                for name, (calls, total) in self.timers.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+def merge_stats(stats_list):
+    """
+    Sums profiles from several workers, e.g. venv.env_method("profile_stats").
+    Envs sharing a process share its profiler, so only one snapshot per pid is counted.
+    """
+    merged = {"pids": [], "timers": {}, "counters": {}}
+    for stats in stats_list:
+        if stats["pid"] in merged["pids"]:
+            continue
+        merged["pids"].append(stats["pid"])
+        for name, timer in stats["timers"].items():
+            total = merged["timers"].setdefault(name, {"calls": 0, "total_ns": 0})
+            total["calls"] += timer["calls"]
+            total["total_ns"] += timer["total_ns"]
+        for name, count in stats["counters"].items():
+            merged["counters"][name] = merged["counters"].get(name, 0) + count
+    for timer in merged["timers"].values():
+        timer["mean_ns"] = timer["total_ns"] / timer["calls"]
+    return merged
+
+def format_stats(stats):
+    """Text table of timers (sorted by total time) and counters."""
+    lines = [f"{'phase':<40} {'calls':>10} {'total ms':>10} {'mean us':>9}"]
+    for name, timer in sorted(stats["timers"].items(), key=lambda kv: -kv[1]["total_ns"]):
+        lines.append(f"{name:<40} {timer['calls']:>10} {timer['total_ns'] / 1e6:>10.1f} {timer['mean_ns'] / 1e3:>9.2f}")
+    for name, count in sorted(stats["counters"].items()):
+        lines.append(f"{name:<40} {count:>10}")
+    return "\n".join(lines)
+
+PROFILER = Profiler(enabled=os.environ.get(ENV_VAR, "") not in ("", "0"))
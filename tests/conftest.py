@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+from gridlock_rl.core.constants import TileType
+
+def _random_candidates(n, height, width, num_keys, n_traps, n_walls=0, seed=0):
+    """Unvalidated random layouts (many are unsolvable)."""
+    rng = np.random.default_rng(seed)
+    tiles = ([TileType.START, TileType.GOAL] + [TileType.KEY] * num_keys
+             + [TileType.TRAP] * n_traps + [TileType.WALL] * n_walls)
+    grids = np.full((n, height * width), TileType.EMPTY, dtype=np.int8)
+    for g in grids:
+        g[rng.permutation(height * width)[:len(tiles)]] = tiles
+    return grids.reshape(n, height, width)
+
+@pytest.fixture
+def random_candidates():
+    return _random_candidates
@@ -0,0 +1,74 @@
+import os
+import json
+from gridlock_rl.utils import benchmark
+from gridlock_rl.utils.benchmark import DEFAULT_BASELINE, compare, main, run_suite
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_compare_flags_drops_beyond_threshold():
+    baseline = {"env_step": 1000.0, "env_reset": 100.0, "removed": 5.0}
+    results = {"env_step": 700.0, "env_reset": 90.0, "added": 1.0}
+    regressions = compare(results, baseline, threshold=0.2)
+    assert [r[0] for r in regressions] == ["env_step"]
+    assert abs(regressions[0][3] + 0.3) < 1e-9
+
+def test_main_writes_results_and_gates(tmp_path):
+    out, baseline = str(tmp_path / "results.json"), str(tmp_path / "baseline.json")
+    args = ["--suite", "env", "--min-time", "0.01", "--repeat", "1", "--out", out, "--baseline", baseline]
+    assert main(args + ["--update-baseline"]) == 0
+
+    with open(out) as f:
+        (entry,) = json.load(f).values()
+    assert entry["results"]["env_step"] > 0
+
+    # An impossible baseline must fail the gate
+    with open(baseline, "w") as f:
+        json.dump({"results": {"env_step": 1e12}}, f)
+    assert main(args) == 1
+
+def test_relative_compare_ignores_uniform_slowdown():
+    baseline = {"reference": 1000.0, "env_step": 1000.0, "env_reset": 100.0}
+    # Whole machine twice as slow: no regression relative to the reference
+    slower = {"reference": 500.0, "env_step": 500.0, "env_reset": 50.0}
+    assert compare(slower, baseline, threshold=0.2, relative=True) == []
+    assert [r[0] for r in compare(slower, baseline, threshold=0.2)] == ["env_reset", "env_step"]
+    # A real drop still fails
+    slower["env_step"] = 300.0
+    assert [r[0] for r in compare(slower, baseline, threshold=0.2, relative=True)] == ["env_step"]
+
+def test_update_baseline_records_commit_and_machine(tmp_path):
+    out, baseline = str(tmp_path / "results.json"), str(tmp_path / "baseline.json")
+    args = ["--suite", "env", "--min-time", "0.01", "--repeat", "1", "--out", out, "--baseline", baseline]
+    assert main(args + ["--update-baseline"]) == 0
+    with open(baseline) as f:
+        entry = json.load(f)
+    assert entry["commit"] and entry["machine"]["cpu_count"] > 0
+    assert entry["results"]["reference"] > 0 and "env_step" in entry["results"]
+
+def test_stored_baseline_is_one_full_run():
+    # The baseline is only written whole by --update-baseline: it must hold exactly the
+    # metrics the suites produce (no hand-appended or stale keys) and its run metadata.
+    with open(os.path.join(REPO, DEFAULT_BASELINE)) as f:
+        entry = json.load(f)
+    assert sorted(entry["results"]) == sorted(run_suite(min_time=1e-6, repeat=1))
+    assert not entry["commit"].endswith("-dirty")
+    assert {"node", "cpu_count", "python", "numpy"} <= set(entry["machine"])
+
+def test_gate_retries_failing_suites(tmp_path, monkeypatch):
+    calls = []
+
+    def flaky(min_time, repeat):
+        calls.append(1)
+        return {"flaky_op": 10.0 if len(calls) == 1 else 1000.0}
+
+    monkeypatch.setitem(benchmark.SUITES, "flaky", flaky)
+    out, baseline = str(tmp_path / "results.json"), str(tmp_path / "baseline.json")
+    with open(baseline, "w") as f:
+        json.dump({"results": {"flaky_op": 1000.0}}, f)
+    args = ["--suite", "flaky", "--min-time", "0.01", "--repeat", "1", "--out", out, "--baseline", baseline]
+    # A one-off slow run is re-measured and passes
+    assert main(args) == 0 and len(calls) == 2
+    # A slowdown that persists on every attempt fails
+    monkeypatch.setitem(benchmark.SUITES, "flaky", lambda min_time, repeat: {"flaky_op": 10.0})
+    assert main(args) == 1
+    assert main(args + ["--retries", "0"]) == 1
@@ -0,0 +1,60 @@
+import os
+import re
+import subprocess
+import sys
+import pytest
+from gridlock_rl.cli import IMPORT_BUDGET_MS, build_parser, main
+from gridlock_rl.maps.bank import MapBank
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+HEAVY = ("numpy", "torch", "stable_baselines3", "gymnasium")
+
+def run_python(code, *flags):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    return subprocess.run([sys.executable, *flags, "-c", code], env=env, capture_output=True, text=True, check=True)
+
+def test_cli_import_is_light_and_under_budget():
+    out = run_python(
+        "import sys\n"
+        "from gridlock_rl.cli import build_parser\n"
+        "build_parser().format_help()\n"
+        f"print(sorted(m for m in {HEAVY!r} if m in sys.modules))"
+    )
+    assert out.stdout.strip() == "[]"
+
+    # Cumulative import time of the module (microseconds), best of a few runs
+    times = []
+    for _ in range(3):
+        report = run_python("import gridlock_rl.cli", "-X", "importtime").stderr
+        match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| gridlock_rl\.cli$", report, re.M)
+        times.append(int(match.group(1)) / 1e3)
+    assert min(times) < IMPORT_BUDGET_MS
+
+def test_map_tooling_does_not_load_torch(tmp_path):
+    out = run_python(
+        "import sys\n"
+        "from gridlock_rl.cli import main\n"
+        f"main(['gen-benchmark', '--n-maps', '3', '--out', {str(tmp_path / 'id')!r}, "
+        f"'--seeds-out', {str(tmp_path / 'seeds.yaml')!r}, '--workers', '1'])\n"
+        f"main(['gen-benchmark', '--ood', '--n-maps', '2', '--out', {str(tmp_path / 'ood')!r}, "
+        f"'--seeds-out', {str(tmp_path / 'ood_seeds.yaml')!r}, '--workers', '1'])\n"
+        "main(['verify', '--episodes', '2'])\n"
+        f"main(['bench', '--suite', 'env', '--min-time', '0.01', '--repeat', '1', "
+        f"'--out', {str(tmp_path / 'results.json')!r}, '--baseline', {str(tmp_path / 'baseline.json')!r}])\n"
+        "print('torch' in sys.modules, 'stable_baselines3' in sys.modules)"
+    )
+    assert out.stdout.strip().splitlines()[-1] == "False False"
+    bank = MapBank(str(tmp_path / "id"))
+    assert len(bank) == 3 and bank.verify()
+    ood = MapBank(str(tmp_path / "ood"))
+    assert len(ood) == 2 and ood.grids.shape[1:] == (10, 10) and ood.seeds[0] >= 10000
+    assert (tmp_path / "results.json").exists()
+
+def test_parser_dispatch():
+    parser = build_parser()
+    args = parser.parse_args(["eval", "--model", "policy.npz"])
+    assert args.command == "eval" and args.episodes == 100
+    with pytest.raises(SystemExit):
+        main(["verify", "--unknown"])
+    with pytest.raises(SystemExit):
+        main([])
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+import yaml
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.envs.vec_env import GridVecEnv
+from gridlock_rl.training.curriculum import run_curriculum
+
+def test_configure_changes_live_env():
+    env = GridEnv(width=6, height=6, max_width=10, max_height=10, trap_density=0.05)
+    env.reset(seed=0)
+    env.configure(width=8, height=8, trap_density=0.2, num_keys=2, step_cost=0.5)
+    obs, _ = env.reset(seed=1)
+    assert env.grid_static.shape == (8, 8)
+    assert np.count_nonzero(env.grid_static == 4) == 2
+    assert obs["grid"].shape == (5, 10, 10)
+    assert env.max_steps == 4 * 64
+    _, reward, _, _, _ = env.step(0)
+    assert reward <= -0.5
+
+    # Same maps as an env built with the new settings
+    fresh = GridEnv(width=8, height=8, max_width=10, max_height=10, trap_density=0.2, num_keys=2)
+    fresh.reset(seed=1)
+    np.testing.assert_array_equal(fresh.grid_static, env.grid_static)
+
+    with pytest.raises(ValueError):
+        env.configure(width=12)
+    with pytest.raises(ValueError):
+        env.configure(max_width=12)
+
+def test_grid_vec_env_configure():
+    venv = GridVecEnv(4, width=6, height=6, max_width=8, max_height=8)
+    venv.seed(0)
+    venv.reset()
+    venv.env_method("configure", width=8, height=8)
+    obs = venv.reset()
+    assert venv.grids.shape == (4, 8, 8) and obs["grid"].shape == (4, 5, 8, 8)
+    venv.step(np.zeros(4, dtype=np.int64))
+
+def test_curriculum_runs_stages_in_one_process(tmp_path, monkeypatch):
+    config = {
+        "env": {"width": 5, "height": 5, "max_width": 6, "max_height": 6, "trap_density": 0.0, "num_keys": 1},
+        "training": {"policy": "MultiInputPolicy", "n_envs": 2, "vec_env": "grid", "n_steps": 32,
+                     "batch_size": 32, "n_epochs": 1, "checkpoint_freq": 10**6},
+        "evaluation": {"eval_freq": 10**6, "n_eval_episodes": 1},
+        "stages": [
+            {"name": "small", "timesteps": 64},
+            {"name": "large", "timesteps": 128, "env": {"width": 6, "height": 6, "trap_density": 0.1},
+             "training": {"n_steps": 64, "ent_coef": 0.05, "learning_rate": 1e-4}},
+        ],
+    }
+    path = tmp_path / "curriculum.yaml"
+    path.write_text(yaml.dump(config))
+    monkeypatch.chdir(tmp_path)
+
+    history = run_curriculum(str(path), run_name="test", tensorboard=False)
+    assert [h["name"] for h in history] == ["small", "large"]
+    assert history[0]["end"] == 64 and history[1]["start"] == 64
+    assert history[1]["end"] == 64 + 128
+    assert (tmp_path / "runs/test/models/stage_large.zip").exists()
@@ -0,0 +1,116 @@
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv
+from gridlock_rl.callbacks.difficulty_callback import AdaptiveDifficultyCallback
+from gridlock_rl.core.constants import TileType
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.envs.vec_env import GridVecEnv
+from gridlock_rl.envs.wrappers import MetricLoggingWrapper
+from gridlock_rl.maps.bank import build_bank
+from gridlock_rl.maps.difficulty import DifficultyIndex, bucket_weights, build_difficulty_index, compute_features
+from gridlock_rl.maps.generator import MapGenerator
+from gridlock_rl.maps.solver import solve, solve_batch
+
+CONFIG = {"width": 6, "height": 6, "trap_density": 0.25, "num_keys": 2}
+
+def corridor_map():
+    # Start, key and goal on a one-wide corridor lined with traps
+    grid = np.full((3, 5), TileType.TRAP, dtype=np.int8)
+    grid[1] = [TileType.START, TileType.EMPTY, TileType.KEY, TileType.EMPTY, TileType.GOAL]
+    grid[0, 0] = grid[2, 0] = TileType.EMPTY
+    return grid
+
+def test_features_on_known_map():
+    f = compute_features(corridor_map()[None])
+    assert f["optimal_length"][0] == 4 and f["detour"][0] == 0
+    assert f["route_cells"][0] == 4  # start, corridor cells and key; the goal is the leg end
+    assert f["choke_points"][0] == 2  # one forced cell on each leg
+    assert f["trap_adjacent"][0] == 3  # the start has no trap neighbour
+
+def test_features_match_solver():
+    grids, _ = MapGenerator(width=7, height=7, trap_density=0.3).generate_batch(300, seed=0)
+    f = compute_features(grids, chunk_size=64)
+    np.testing.assert_array_equal(f["optimal_length"], solve_batch(grids))
+    solved = f["optimal_length"] >= 0
+    assert (f["route_cells"][solved] >= 1).all() and (f["detour"][solved] >= 0).all()
+    assert (f["trap_adjacent"] <= f["route_cells"]).all()
+
+    # The solver's route lies inside the route cells
+    i = int(np.flatnonzero(solved)[0])
+    assert f["route_cells"][i] >= len(set(_visited(grids[i], solve(grids[i])[1]))) - 1
+
+    index = DifficultyIndex.build(grids, n_buckets=4)
+    assert (index.buckets[~solved] == -1).all()
+    sizes = index.bucket_sizes()
+    assert sizes.sum() == solved.sum() and sizes.max() - sizes.min() <= 0.25 * sizes.mean()
+    means = [f["optimal_length"][m].mean() for m in index.members]
+    assert means == sorted(means)
+
+def _visited(grid, actions):
+    pos = tuple(np.argwhere(grid == TileType.START)[0])
+    cells = [pos]
+    for a in actions:
+        dr, dc = [(-1, 0), (0, 1), (1, 0), (0, -1)][a]
+        pos = (pos[0] + dr, pos[1] + dc)
+        cells.append(pos)
+    return cells
+
+def test_bucket_weights_favour_frontier():
+    w = bucket_weights([0.0, 0.5, 1.0, np.nan])
+    assert w[1] == w[3] > w[0] == w[2] > 0
+
+def test_env_samples_by_bucket_weight(tmp_path):
+    path = str(tmp_path / "bank")
+    build_bank(path, 200, CONFIG)
+    index = build_difficulty_index(path, n_buckets=4)
+    assert DifficultyIndex.load(path).buckets.tolist() == index.buckets.tolist()
+
+    env = MetricLoggingWrapper(GridEnv(width=6, height=6, map_bank=path, difficulty_sampling=True))
+    env.unwrapped.set_difficulty_weights([0, 0, 1, 0])
+    for seed in range(10):
+        _, info = env.reset(seed=seed)
+        assert info["difficulty_bucket"] == 2
+        assert index.buckets[_bank_index(index, env.unwrapped.grid_static, path)] == 2
+    done = False
+    while not done:
+        _, _, terminated, truncated, info = env.step(env.action_space.sample())
+        done = terminated or truncated
+    assert info["metrics"]["difficulty_bucket"] == 2
+
+    # GridVecEnv reports the same buckets as the wrapped GridEnv
+    venv = GridVecEnv(3, width=6, height=6, map_bank=path, difficulty_sampling=True)
+    dummy = DummyVecEnv([lambda: MetricLoggingWrapper(GridEnv(width=6, height=6, map_bank=path,
+                                                                difficulty_sampling=True))] * 3)
+    for v in (venv, dummy):
+        v.env_method("set_difficulty_weights", [1, 0, 0, 1])
+        v.seed(5)
+        v.reset()
+    assert [i["difficulty_bucket"] for i in venv.reset_infos] == [i["difficulty_bucket"] for i in dummy.reset_infos]
+    assert set(i["difficulty_bucket"] for i in venv.reset_infos) <= {0, 3}
+
+def _bank_index(index, grid, path):
+    from gridlock_rl.maps.bank import MapBank
+    grids = MapBank(path).grids
+    return int(np.flatnonzero((grids == grid).all(axis=(1, 2)))[0])
+
+def test_adaptive_callback_pushes_weights(tmp_path):
+    path = str(tmp_path / "bank")
+    build_bank(path, 100, CONFIG)
+    build_difficulty_index(path, n_buckets=3)
+    venv = GridVecEnv(2, width=6, height=6, map_bank=path, difficulty_sampling=True)
+
+    class Model:
+        num_timesteps = 0
+        logger = None
+        def get_env(self):
+            return venv
+    callback = AdaptiveDifficultyCallback(window=10, update_freq=2)
+    callback.init_callback(Model())
+    callback.on_training_start({}, {})
+    for rate_bucket, success in [(0, 1.0), (1, 0.0), (2, 1.0), (2, 0.0)]:
+        callback.locals = {"infos": [{"metrics": {"difficulty_bucket": rate_bucket, "is_success": success}}]}
+        callback.num_timesteps += 1
+        callback.model.num_timesteps = callback.num_timesteps
+        callback.on_step()
+    np.testing.assert_allclose(callback.success_rates(), [1.0, 0.0, 0.5])
+    weights = venv.env_template.difficulty_weights
+    assert weights is not None and weights[2] > weights[0] and weights[2] > weights[1]
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+from gridlock_rl.maps.bank import build_bank
+from gridlock_rl.maps.benchmark import build_benchmark
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.maps.encoding import (MapIndex, PackedGrids, canonical_hash, first_occurrence, map_hash, pack_grids,
+                                       packed_size, unpack_grids, zobrist_hash)
+from gridlock_rl.maps.generator import MapGenerator
+
+CONFIG = {"width": 6, "height": 6, "trap_density": 0.15, "num_keys": 2, "min_traps": 1}
+
+def test_hash_is_invariant_under_symmetries():
+    grids, _ = MapGenerator(width=7, height=7, trap_density=0.2).generate_batch(50, seed=0)
+    hashes = canonical_hash(grids)
+    for k in range(4):
+        rotated = np.rot90(grids, k, axes=(1, 2))
+        np.testing.assert_array_equal(canonical_hash(rotated), hashes)
+        np.testing.assert_array_equal(canonical_hash(rotated[:, ::-1]), hashes)
+    assert len(np.unique(hashes)) == len(grids)
+    assert map_hash(grids[3]) == int(hashes[3])
+
+    # Rectangular grids: flips only
+    rect, _ = MapGenerator(width=9, height=5).generate_batch(20, seed=1)
+    np.testing.assert_array_equal(canonical_hash(rect[:, ::-1, ::-1]), canonical_hash(rect))
+    np.testing.assert_array_equal(canonical_hash(rect[:, :, ::-1]), canonical_hash(rect))
+
+def test_zobrist_hash_changes_with_single_tile():
+    grid, _ = MapGenerator(width=6, height=6).generate(seed=0)
+    other = grid.copy()
+    empty = np.argwhere(grid == 0)[0]
+    other[tuple(empty)] = 1
+    assert zobrist_hash(grid[None])[0] != zobrist_hash(other[None])[0]
+
+def test_map_index_membership(tmp_path):
+    grids, _ = MapGenerator(**CONFIG).generate_batch(200, seed=0)
+    hashes = canonical_hash(grids)
+    index = MapIndex(hashes[:100])
+    np.testing.assert_array_equal(index.contains(hashes), np.isin(hashes, hashes[:100]))
+    assert first_occurrence(np.concatenate([hashes[:5], hashes[:5]])).tolist() == [True] * 5 + [False] * 5
+    assert not MapIndex().contains(hashes).any()
+
+    index.add(hashes[100:])
+    assert len(index) == len(np.unique(hashes)) and index.contains(hashes).all()
+    assert (np.diff(index.hashes.astype(np.float64)) >= 0).all()
+
+    index.save(str(tmp_path / "idx.npy"))
+    loaded = MapIndex.load(str(tmp_path / "idx.npy"))
+    assert isinstance(loaded.hashes, np.memmap)
+    np.testing.assert_array_equal(loaded.hashes, index.hashes)
+
+def test_build_bank_dedup_and_exclude(tmp_path):
+    # Tiny maps repeat often, so dedup has work to do
+    config = {"width": 3, "height": 3, "trap_density": 0.0, "num_keys": 1}
+    bank = build_bank(str(tmp_path / "bank"), 40, config, chunk_size=16, dedup=True)
+    hashes = canonical_hash(bank.grids)
+    assert len(np.unique(hashes)) == 40
+    assert bank.meta["filter"]["duplicates"] > 0 and bank.verify()
+
+    bench = build_benchmark(str(tmp_path / "bench"), 30, CONFIG)
+    exclude = MapIndex.load(str(tmp_path / "bench"))
+    train = build_bank(str(tmp_path / "train"), 300, CONFIG, chunk_size=64, exclude=exclude)
+    assert len(train) == 300
+    assert not exclude.contains_grids(train.grids).any()
+
+    # Filtering is off by default and the unfiltered layout is unchanged
+    plain = build_bank(str(tmp_path / "plain"), 64, CONFIG, chunk_size=64)
+    assert "filter" not in plain.meta
+
+def test_build_bank_dedup_fails_when_exhausted(tmp_path):
+    config = {"width": 2, "height": 2, "trap_density": 0.0, "num_keys": 1}
+    with pytest.raises(RuntimeError):
+        build_bank(str(tmp_path / "bank"), 50, config, chunk_size=8, dedup=True)
+
+@pytest.mark.parametrize("height,width", [(8, 8), (5, 7), (1, 3), (12, 16)])
+def test_pack_roundtrip(height, width):
+    grids = np.random.default_rng(0).integers(0, 6, size=(300, height, width)).astype(np.int8)
+    packed = pack_grids(grids)
+    assert packed.shape == (300, packed_size(height, width)) and packed.dtype == np.uint8
+    np.testing.assert_array_equal(unpack_grids(packed, height, width, chunk_size=64), grids)
+
+    view = PackedGrids(packed, height, width)
+    assert view.shape == grids.shape and len(view) == 300
+    np.testing.assert_array_equal(view[7], grids[7])
+    np.testing.assert_array_equal(view[10:20], grids[10:20])
+    np.testing.assert_array_equal(view[[3, 1]], grids[[3, 1]])
+
+    with pytest.raises(ValueError):
+        pack_grids(np.full((1, 2, 2), 8, dtype=np.int8))
+
+def test_packed_bank_matches_plain_bank(tmp_path):
+    assert packed_size(8, 8) == 24
+    plain = build_bank(str(tmp_path / "plain"), 100, CONFIG, chunk_size=32)
+    packed = build_bank(str(tmp_path / "packed"), 100, CONFIG, chunk_size=32, packed=True)
+    assert packed.packed and not plain.packed
+    assert packed.meta["content_hash"] == plain.meta["content_hash"] and packed.verify()
+    assert isinstance(packed.grids.packed, np.memmap)
+    np.testing.assert_array_equal(packed.grids[:], plain.grids)
+    np.testing.assert_array_equal(packed[42], plain[42])
+
+    filtered = build_bank(str(tmp_path / "filtered"), 50, CONFIG, chunk_size=32, dedup=True, packed=True)
+    assert len(np.unique(canonical_hash(filtered.grids))) == 50
+
+    bundle = build_benchmark(str(tmp_path / "bench"), 10, CONFIG, packed=True)
+    env = GridEnv(width=6, height=6, map_bank=str(tmp_path / "packed"))
+    env.reset(seed=0)
+    assert any((env.grid_static == packed[i]).all() for i in range(len(packed)))
+    assert bundle.verify()
@@ -0,0 +1,26 @@
+from stable_baselines3 import PPO
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.training.eval import run_episodes
+
+def test_batched_episodes_match_sequential():
+    env_cfg = {"width": 5, "height": 5, "num_keys": 2, "trap_density": 0.1}
+    env = GridEnv(**env_cfg)
+    model = PPO("MultiInputPolicy", env, seed=0, n_steps=64, batch_size=64)
+    seeds = list(range(12))
+
+    expected = []
+    for seed in seeds:
+        obs, _ = env.reset(seed=seed)
+        terminated = truncated = False
+        steps, first_key = 0, None
+        while not (terminated or truncated):
+            action, _ = model.predict(obs, deterministic=True)
+            obs, _, terminated, truncated, info = env.step(action)
+            steps += 1
+            if first_key is None and info["keys_collected"] > 0:
+                first_key = steps
+        expected.append({"seed": seed, "event": info["event"], "steps": steps,
+                         "keys_collected": info["keys_collected"], "first_key_step": first_key})
+
+    # Fewer slots than seeds, so finished slots get refilled
+    assert run_episodes(model, env_cfg, seeds, batch_size=5) == expected
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+import numpy as np
+import pytest
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import DummyVecEnv
+from gridlock_rl.agents.export import NumpyPolicy, export_policy
+from gridlock_rl.agents.serving import sample_observations
+from gridlock_rl.training.train_sb3 import make_env
+
+ENV_CFG = {"width": 6, "height": 6, "max_width": 7, "max_height": 7, "trap_density": 0.1, "num_keys": 2}
+
+@pytest.mark.parametrize("net_arch,activation", [(None, None), ([32, 16], "ReLU")])
+def test_numpy_policy_matches_model_predict(tmp_path, net_arch, activation):
+    import torch as th
+
+    policy_kwargs = {}
+    if net_arch is not None:
+        policy_kwargs = {"net_arch": net_arch, "activation_fn": getattr(th.nn, activation)}
+    model = PPO("MultiInputPolicy", DummyVecEnv([make_env(**ENV_CFG)]), seed=0, device="cpu",
+                policy_kwargs=policy_kwargs)
+    # Train briefly so the logits are not near-uniform at initialisation
+    model.learn(256)
+    path = str(tmp_path / "policy.npz")
+    export_policy(model, path)
+
+    policy = NumpyPolicy(path)
+    obs = sample_observations(ENV_CFG, 500)
+    expected, _ = model.predict(obs, deterministic=True)
+    actions, _ = policy.predict(obs)
+    np.testing.assert_array_equal(actions, expected)
+
+    with th.no_grad():
+        logits = model.policy.get_distribution(model.policy.obs_to_tensor(obs)[0]).distribution.logits
+    probs = np.exp(policy.logits(obs))
+    np.testing.assert_allclose(probs / probs.sum(axis=1, keepdims=True), logits.exp().numpy(), atol=1e-5)
+
+    single = {key: value[3] for key, value in obs.items()}
+    assert policy.predict(single)[0] == expected[3]
+    sampled, _ = policy.predict(obs, deterministic=False, rng=np.random.default_rng(0))
+    assert sampled.shape == (500,) and set(np.unique(sampled)) <= {0, 1, 2, 3}
+
+def test_numpy_policy_loads_without_torch(tmp_path):
+    model = PPO("MultiInputPolicy", DummyVecEnv([make_env(**ENV_CFG)]), seed=0, device="cpu")
+    path = str(tmp_path / "policy.npz")
+    export_policy(model, path)
+    code = (
+        "import sys, numpy as np\n"
+        "from gridlock_rl.agents.export import NumpyPolicy\n"
+        f"policy = NumpyPolicy({path!r})\n"
+        "obs = {'grid': np.zeros((2, 5, 7, 7), np.int8), 'keys_collected': np.zeros((2, 1), np.int8)}\n"
+        "assert policy.predict(obs)[0].shape == (2,)\n"
+        "assert 'torch' not in sys.modules and 'stable_baselines3' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,53 @@
+import numpy as np
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.maps.bank import MapBank, build_bank
+from gridlock_rl.maps.benchmark import build_benchmark
+from gridlock_rl.maps.generator import MapGenerator
+from gridlock_rl.maps.validation import validate_map
+
+CONFIG = {"width": 6, "height": 6, "trap_density": 0.15, "num_keys": 2, "min_traps": 1}
+
+def test_build_bank_is_reproducible(tmp_path):
+    bank = build_bank(str(tmp_path / "bank"), 50, CONFIG, seed=100, chunk_size=16)
+    assert len(bank) == 50
+    assert bank.config == CONFIG
+
+    # Chunk j is generate_batch(chunk_size, seed=[seed, j])
+    expected, _ = MapGenerator(**CONFIG).generate_batch(16, seed=[100, 1])
+    np.testing.assert_array_equal(bank.grids[16:32], expected)
+    for i in range(len(bank)):
+        assert validate_map(bank[i])[0]
+
+    # Reopened bank is memory-mapped and returns writable copies
+    reopened = MapBank(str(tmp_path / "bank"))
+    assert isinstance(reopened.grids, np.memmap)
+    grid = reopened[3]
+    grid[0, 0] = 0
+    np.testing.assert_array_equal(reopened[3], bank[3])
+
+def test_env_samples_from_bank(tmp_path):
+    bank = build_bank(str(tmp_path / "bank"), 20, CONFIG)
+    bank_grids = {bank[i].tobytes() for i in range(len(bank))}
+
+    env = GridEnv(width=6, height=6, map_bank=str(tmp_path / "bank"))
+    for seed in range(10):
+        env.reset(seed=seed)
+        assert env.grid_static.tobytes() in bank_grids
+
+def test_benchmark_bundle_stores_env_maps(tmp_path):
+    bundle = build_benchmark(str(tmp_path / "bench"), 30, CONFIG, start_seed=500, workers=2, shard_size=8)
+    assert len(bundle) == 30 and bundle.verify()
+    assert bundle.seeds.tolist() == list(range(500, 530))
+    assert build_benchmark(str(tmp_path / "serial"), 30, CONFIG, start_seed=500, shard_size=8).meta["content_hash"] \
+        == bundle.meta["content_hash"]
+
+    # Map i is the grid the env generates for seeds[i]
+    env = GridEnv(**CONFIG)
+    for i in range(0, 30, 7):
+        env.reset(seed=int(bundle.seeds[i]))
+        np.testing.assert_array_equal(bundle[i], env.grid_static)
+
+    grids = np.load(str(tmp_path / "bench" / "grids.npy"))
+    grids[0, 0, 0] = (grids[0, 0, 0] + 1) % 5
+    np.save(str(tmp_path / "bench" / "grids.npy"), grids)
+    assert not MapBank(str(tmp_path / "bench")).verify()
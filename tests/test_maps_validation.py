@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+from gridlock_rl.core.constants import TileType
+from gridlock_rl.maps.generator import MapGenerator
+from gridlock_rl.maps.validation import validate_map, validate_map_bitboard, validate_maps_batch
+
+@pytest.mark.parametrize("height,width", [(8, 8), (5, 9), (10, 10)])
+def test_batch_verdicts_match_validate_map(height, width, random_candidates):
+    grids = random_candidates(300, height, width, num_keys=3, n_traps=height * width // 4, n_walls=3)
+    expected = np.array([validate_map(g)[0] for g in grids])
+    assert 0 < expected.sum() < len(grids)
+    np.testing.assert_array_equal(validate_maps_batch(grids), expected)
+
+def test_generate_batch():
+    gen = MapGenerator(width=8, height=8, trap_density=0.3, num_keys=3, min_traps=1)
+    grids, info = gen.generate_batch(200, seed=7)
+
+    assert grids.shape == (200, 8, 8) and grids.dtype == np.int8
+    assert info["attempts"] >= 200
+    for i, grid in enumerate(grids):
+        assert validate_map(grid)[0]
+        assert grid[tuple(info["start"][i])] == TileType.START
+        assert grid[tuple(info["goal"][i])] == TileType.GOAL
+        assert all(grid[tuple(k)] == TileType.KEY for k in info["keys"][i])
+        assert np.count_nonzero(grid == TileType.TRAP) == info["n_traps"][i]
+
+    again, _ = gen.generate_batch(200, seed=7)
+    np.testing.assert_array_equal(grids, again)
+
+@pytest.mark.parametrize("height,width", [(8, 8), (1, 12), (6, 4), (10, 10), (12, 16)])
+def test_bitboard_matches_validate_map(height, width, random_candidates):
+    n_traps = height * width // 3
+    grids = random_candidates(300, height, width, num_keys=3, n_traps=n_traps, n_walls=2, seed=height * width)
+    for grid in grids:
+        assert validate_map_bitboard(grid) == validate_map(grid)
+
+def test_bitboard_reports_missing_keys():
+    grid = np.zeros((3, 3), dtype=np.int8)
+    grid[0, 0] = TileType.START
+    grid[2, 2] = TileType.GOAL
+    assert validate_map_bitboard(grid) == (False, "No keys found")
+
+def test_distance_fields_bitboard_matches_array_path(random_candidates):
+    from gridlock_rl.maps import validation
+    grids = random_candidates(40, 9, 7, num_keys=3, n_traps=15, n_walls=4, seed=3)
+    sources = grids == TileType.KEY
+    passable = (grids != TileType.WALL) & (grids != TileType.TRAP)
+
+    array_dist = validation.distance_fields(sources, passable) # > BITBOARD_MAX_BOARDS
+    assert len(grids) > validation.BITBOARD_MAX_BOARDS
+    bitboard_dist = np.concatenate([
+        validation.distance_fields(sources[i:i + 1], passable[i:i + 1]) for i in range(len(grids))
+    ])
+    np.testing.assert_array_equal(array_dist, bitboard_dist)
+    assert (array_dist == -1).any() and (array_dist > 3).any()
+
+@pytest.mark.parametrize("height,width,density,min_traps", [(8, 8, 0.1, 0), (8, 8, 0.9, 0), (6, 9, 0.5, 20), (1, 12, 0.3, 0)])
+def test_constructive_maps_are_solvable(height, width, density, min_traps):
+    from gridlock_rl.maps.solver import solve_batch
+
+    gen = MapGenerator(width=width, height=height, trap_density=density, num_keys=3, min_traps=min_traps,
+                       method="constructive")
+    grids, info = gen.generate_batch(100, seed=3)
+
+    assert grids.shape == (100, height, width)
+    assert (solve_batch(grids) > 0).all()
+    free = height * width - 5
+    assert (info["n_traps"] <= max(min_traps, int(free * density))).all()
+    for i, grid in enumerate(grids):
+        assert grid[tuple(info["start"][i])] == TileType.START
+        assert grid[tuple(info["goal"][i])] == TileType.GOAL
+        assert all(grid[tuple(k)] == TileType.KEY for k in info["keys"][i])
+
+    again, _ = gen.generate_batch(100, seed=3)
+    np.testing.assert_array_equal(grids, again)
+    single, single_info = gen.generate(seed=11)
+    np.testing.assert_array_equal(single, gen.generate(seed=11)[0])
+    assert single_info["n_traps"] == np.count_nonzero(single == TileType.TRAP)
+
+def test_unknown_generator_method():
+    with pytest.raises(ValueError):
+        MapGenerator(method="wfc")
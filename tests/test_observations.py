@@ -0,0 +1,42 @@
+import pytest
+import numpy as np
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.core.constants import TileType, CHANNEL_MAP
+
+def full_obs_grid(env):
+    """Reference observation built from scratch from the env's dynamic grid."""
+    obs = np.zeros((len(CHANNEL_MAP), env.max_height, env.max_width), dtype=np.int8)
+    obs[CHANNEL_MAP["agent"]][env.agent_pos] = 1
+    for name, tile in [("wall", TileType.WALL), ("trap", TileType.TRAP),
+                       ("key", TileType.KEY), ("goal", TileType.GOAL)]:
+        obs[CHANNEL_MAP[name], :env.height, :env.width] = env.grid_dynamic == tile
+    return obs
+
+@pytest.mark.parametrize("copy_obs", [True, False])
+def test_incremental_obs_matches_full_rebuild(copy_obs):
+    env = GridEnv(width=6, height=6, max_width=8, max_height=8, trap_density=0.1, copy_obs=copy_obs)
+    rng = np.random.default_rng(0)
+    for episode in range(20):
+        obs, _ = env.reset(seed=episode)
+        np.testing.assert_array_equal(obs["grid"], full_obs_grid(env))
+        terminated = truncated = False
+        while not (terminated or truncated):
+            obs, _, terminated, truncated, info = env.step(rng.integers(0, 4))
+            np.testing.assert_array_equal(obs["grid"], full_obs_grid(env))
+            assert obs["keys_collected"][0] == info["keys_collected"]
+
+def test_obs_copies_are_independent():
+    env = GridEnv(width=6, height=6)
+    obs_a, _ = env.reset(seed=0)
+    snapshot = obs_a["grid"].copy()
+    for action in range(4):
+        env.step(action)
+    np.testing.assert_array_equal(obs_a["grid"], snapshot)
+
+def test_obs_views_are_read_only():
+    env = GridEnv(width=6, height=6, copy_obs=False)
+    obs, _ = env.reset(seed=0)
+    assert not obs["grid"].flags.writeable
+    assert not obs["keys_collected"].flags.writeable
+    with pytest.raises(ValueError):
+        obs["grid"][0, 0, 0] = 1
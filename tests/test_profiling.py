@@ -0,0 +1,37 @@
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.utils.profiling import PROFILER, merge_stats
+
+def run_episode(env, seed):
+    env.reset(seed=seed)
+    terminated = truncated = False
+    while not (terminated or truncated):
+        _, _, terminated, truncated, _ = env.step(env.action_space.sample())
+
+def test_profiling_is_opt_in():
+    PROFILER.reset()
+    run_episode(GridEnv(width=6, height=6), seed=0)
+    assert PROFILER.stats()["timers"] == {} and PROFILER.stats()["counters"] == {}
+
+def test_phases_and_rejections_are_recorded():
+    PROFILER.reset()
+    try:
+        env = GridEnv(width=6, height=6, trap_density=0.4, dense_reward=True, profile=True)
+        for seed in range(5):
+            run_episode(env, seed)
+        stats = env.profile_stats()
+    finally:
+        PROFILER.disable()
+        PROFILER.reset()
+
+    timers, counters = stats["timers"], stats["counters"]
+    assert timers["reset.map"]["calls"] == 5
+    n_steps = sum(v for k, v in counters.items() if k.startswith("step.event."))
+    assert timers["step.dynamics"]["calls"] == timers["step.obs"]["calls"] == n_steps
+    n_rejected = sum(v for k, v in counters.items() if k.startswith("generate.reject."))
+    assert counters["generate.attempts"] == timers["generate.validate"]["calls"] == 5 + n_rejected
+    assert n_rejected > 0
+
+    # Envs in the same process share one profiler, so duplicates are merged once
+    merged = merge_stats([stats, stats])
+    assert merged["pids"] == [stats["pid"]]
+    assert merged["counters"] == counters
@@ -0,0 +1,104 @@
+import pytest
+import asyncio
+import numpy as np
+from stable_baselines3 import PPO
+from stable_baselines3.common.vec_env import DummyVecEnv
+from gridlock_rl.agents.serving import REQUEST_ID, PolicyServer, batch_histogram, run_load, sample_observations, sb3_predictor
+from gridlock_rl.training.train_sb3 import make_env
+
+ENV_CFG = {"width": 5, "height": 5, "trap_density": 0.1, "num_keys": 1}
+
+def test_batch_histogram():
+    counts = np.zeros(9, dtype=np.int64)
+    counts[[1, 2, 3, 5, 8]] = [4, 1, 2, 3, 1]
+    assert batch_histogram(counts) == {"1": 4, "2-3": 3, "4-7": 3, "8": 1}
+
+def test_server_batches_requests_and_matches_predict(tmp_path):
+    model = PPO("MultiInputPolicy", DummyVecEnv([make_env(**ENV_CFG)]), seed=0, device="cpu")
+    observations = sample_observations(ENV_CFG, 64)
+    path = str(tmp_path / "policy.sock")
+    server = PolicyServer(sb3_predictor(model), observations["grid"].shape[1:], max_batch=32, max_delay_ms=5.0)
+
+    async def run():
+        await server.start(path)
+        try:
+            return await run_load(path, observations, n_clients=8, n_requests=40, in_flight=2)
+        finally:
+            await server.close()
+
+    load = asyncio.run(run())
+    expected, _ = model.predict(observations, deterministic=True)
+    index = (np.arange(8)[:, None] * 40 + np.arange(40)) % 64
+    np.testing.assert_array_equal(load["actions"], expected[index])
+
+    stats = server.stats()
+    assert stats["requests"] == load["requests"] == 320
+    assert stats["batches"] < 320 and stats["mean_batch"] > 1
+    assert sum(stats["batch_hist"].values()) == stats["batches"]
+    assert 0 < stats["latency"]["p50_ms"] <= stats["latency"]["p99_ms"]
+
+def test_server_survives_failing_predict(tmp_path):
+    observations = sample_observations(ENV_CFG, 8)
+    path = str(tmp_path / "policy.sock")
+    calls = []
+
+    def predict(obs):
+        calls.append(len(obs["grid"]))
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return np.zeros(len(obs["grid"]), dtype=np.int64)
+
+    server = PolicyServer(predict, observations["grid"].shape[1:], max_batch=8, max_delay_ms=1.0)
+
+    async def run():
+        await server.start(path)
+        try:
+            # The first batch fails: its connection is closed instead of hanging
+            with pytest.raises(asyncio.IncompleteReadError):
+                await asyncio.wait_for(run_load(path, observations, n_clients=1, n_requests=1), 5.0)
+            return await asyncio.wait_for(run_load(path, observations, n_clients=2, n_requests=5), 5.0)
+        finally:
+            await server.close()
+
+    load = asyncio.run(run())
+    assert (load["actions"] == 0).all()
+    assert server.stats()["failed"] == 1
+    assert server.stats()["requests"] == 10
+
+def test_server_stops_reading_from_a_stalled_client(tmp_path):
+    observations = sample_observations(ENV_CFG, 4)
+    path = str(tmp_path / "policy.sock")
+    server = PolicyServer(lambda obs: np.zeros(len(obs["grid"]), dtype=np.int64),
+                          observations["grid"].shape[1:], max_batch=256, max_delay_ms=1.0, max_in_flight=64)
+    request = (REQUEST_ID.pack(0) + observations["grid"][0].tobytes()
+               + observations["keys_collected"][0].astype(np.int8).tobytes())
+    n_sent = 400_000
+
+    async def flood(writer):
+        for _ in range(n_sent // 1000):
+            writer.write(request * 1000)
+            await writer.drain()
+
+    async def run():
+        await server.start(path)
+        reader, writer = await asyncio.open_unix_connection(path)
+        sender = asyncio.create_task(flood(writer))
+        max_pending = 0
+        try:
+            # The client never reads: once the socket and transport buffers are full,
+            # the server stops reading its requests instead of buffering responses
+            previous = -1
+            while server.n_requests != previous:
+                previous = server.n_requests
+                for _ in range(25):
+                    max_pending = max(max_pending, len(server._pending))
+                    await asyncio.sleep(0.02)
+            return server.n_requests, max_pending, sender.done()
+        finally:
+            sender.cancel()
+            writer.close()
+            await server.close()
+
+    answered, max_pending, sent_all = asyncio.run(run())
+    assert 0 < answered < n_sent and not sent_all
+    assert max_pending <= 64
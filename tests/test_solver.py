@@ -0,0 +1,61 @@
+import numpy as np
+from collections import deque
+from gridlock_rl.core.constants import TileType
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.maps.generator import MapGenerator
+from gridlock_rl.maps.solver import dp_bytes_per_map, solve, solve_batch
+
+def reference_length(grid):
+    """BFS over (cell, keys left) states with the env's movement rules; -1 if unsolvable."""
+    h, w = grid.shape
+    keys = [tuple(p) for p in np.argwhere(grid == TileType.KEY)]
+    start = (tuple(np.argwhere(grid == TileType.START)[0]), frozenset(keys))
+    dist = {start: 0}
+    queue = deque([start])
+    while queue:
+        (r, c), left = state = queue.popleft()
+        for nr, nc in [(r - 1, c), (r, c + 1), (r + 1, c), (r, c - 1)]:
+            if not (0 <= nr < h and 0 <= nc < w):
+                continue
+            tile = grid[nr, nc]
+            if tile in (TileType.WALL, TileType.TRAP) or (tile == TileType.GOAL and left):
+                continue
+            if tile == TileType.GOAL:
+                return dist[state] + 1
+            nxt = ((nr, nc), left - {(nr, nc)})
+            if nxt not in dist:
+                dist[nxt] = dist[state] + 1
+                queue.append(nxt)
+    return -1
+
+def test_lengths_match_state_space_bfs(random_candidates):
+    grids = random_candidates(150, 6, 6, num_keys=3, n_traps=6, n_walls=4, seed=3)
+    expected = np.array([reference_length(g) for g in grids])
+    assert (expected < 0).any() and (expected > 0).any()
+    np.testing.assert_array_equal(solve_batch(grids, chunk_size=64), expected)
+    assert [solve(g)[0] for g in grids[:20]] == list(expected[:20])
+
+def test_plans_solve_env_optimally():
+    gen = MapGenerator(width=8, height=8, trap_density=0.2, num_keys=5)
+    env = GridEnv(width=8, height=8, num_keys=5)
+    for seed in range(20):
+        grid, _ = gen.generate(seed=seed)
+        length, actions = solve(grid)
+        if length < 0:
+            # Validation lets paths cross the locked goal; such maps are unsolvable in the env
+            assert reference_length(grid) == -1
+            continue
+        assert length == len(actions) == reference_length(grid)
+
+        env.reset(options={"grid": grid})
+        for action in actions:
+            _, _, terminated, truncated, info = env.step(action)
+        assert terminated and info["event"] == "success"
+        assert info["keys_collected"] == 5
+
+def test_solve_batch_chunks_by_dp_memory(random_candidates):
+    grids = random_candidates(30, 6, 6, num_keys=3, n_traps=4, seed=5)
+    expected = solve_batch(grids)
+    # Budget for 4 maps' tables per chunk
+    np.testing.assert_array_equal(solve_batch(grids, max_bytes=4 * dp_bytes_per_map(3)), expected)
+    np.testing.assert_array_equal(solve_batch(grids, max_bytes=1), expected)
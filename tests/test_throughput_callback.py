@@ -0,0 +1,30 @@
+import pandas as pd
+from stable_baselines3 import PPO
+from stable_baselines3.common.logger import configure
+from stable_baselines3.common.vec_env import DummyVecEnv
+from gridlock_rl.callbacks.throughput_callback import ThroughputCallback
+from gridlock_rl.training.train_sb3 import make_env
+
+def test_throughput_scalars_are_logged(tmp_path):
+    env = DummyVecEnv([make_env(width=5, height=5, num_keys=1) for _ in range(2)])
+    model = PPO("MultiInputPolicy", env, n_steps=32, batch_size=32, n_epochs=1, seed=0)
+    model.set_logger(configure(str(tmp_path), ["csv"]))
+    model.learn(total_timesteps=192, callback=ThroughputCallback(per_worker=True))
+
+    log = pd.read_csv(tmp_path / "progress.csv")
+    for column in ["perf/fps_rollout", "perf/rollout_time_s", "perf/worker_step_us_mean",
+                   "perf/worker_1/idle_frac", "perf/rss_mb"]:
+        assert (log[column] > 0).all(), column
+    # The first rollout has no preceding update
+    assert log["perf/update_time_s"].iloc[1:].gt(0).all()
+    assert log["perf/worker_idle_frac_mean"].lt(1).all()
+
+def test_per_worker_scalars_are_opt_in(tmp_path):
+    env = DummyVecEnv([make_env(width=5, height=5, num_keys=1) for _ in range(2)])
+    model = PPO("MultiInputPolicy", env, n_steps=32, batch_size=32, n_epochs=1, seed=0)
+    model.set_logger(configure(str(tmp_path), ["csv"]))
+    model.learn(total_timesteps=64, callback=ThroughputCallback())
+
+    log = pd.read_csv(tmp_path / "progress.csv")
+    assert not any(c.startswith("perf/worker_0/") for c in log.columns)
+    assert (log["perf/worker_step_us_p90"] >= log["perf/worker_step_us_p50"]).all()
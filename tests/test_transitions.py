@@ -0,0 +1,69 @@
+import numpy as np
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.envs.transitions import (
+    compile_transitions, ACTION_DELTAS, CELL_EMPTY, CELL_TRAP, CELL_KEY, CELL_GOAL
+)
+from gridlock_rl.core.constants import TileType, Action
+
+def test_compile_small_map():
+    grid = np.array([
+        [TileType.START, TileType.WALL, TileType.KEY],
+        [TileType.TRAP, TileType.EMPTY, TileType.KEY],
+        [TileType.EMPTY, TileType.EMPTY, TileType.GOAL],
+    ], dtype=np.int8)
+    next_cell, cell_code, key_slot = compile_transitions(grid)
+
+    assert next_cell.shape == (9, 4)
+    assert next_cell[0, Action.UP] == 0       # border
+    assert next_cell[0, Action.RIGHT] == 0    # wall
+    assert next_cell[0, Action.DOWN] == 3
+    assert next_cell[4, Action.UP] == 4       # wall
+    assert next_cell[4, Action.RIGHT] == 5
+    assert next_cell[8, Action.LEFT] == 7
+    np.testing.assert_array_equal(cell_code, [CELL_EMPTY, CELL_EMPTY, CELL_KEY, CELL_TRAP, CELL_EMPTY,
+                                              CELL_KEY, CELL_EMPTY, CELL_EMPTY, CELL_GOAL])
+    np.testing.assert_array_equal(key_slot, [-1, -1, 0, -1, -1, 1, -1, -1, -1])
+
+def test_compile_batched_matches_single():
+    env = GridEnv(width=7, height=5, trap_density=0.2, num_keys=2)
+    grids = []
+    for seed in range(6):
+        env.reset(seed=seed)
+        grids.append(env.grid_static.copy())
+    grids = np.stack(grids)
+    batched = compile_transitions(grids.reshape(2, 3, 5, 7))
+    for i, grid in enumerate(grids):
+        for table, single in zip(batched, compile_transitions(grid)):
+            np.testing.assert_array_equal(table.reshape(6, *single.shape)[i], single)
+
+def reference_step(grid, pos, keys_left, action):
+    """Movement rules written out directly: (new_pos, event)."""
+    r, c = pos[0] + ACTION_DELTAS[action, 0], pos[1] + ACTION_DELTAS[action, 1]
+    if not (0 <= r < grid.shape[0] and 0 <= c < grid.shape[1]) or grid[r, c] == TileType.WALL:
+        return pos, "no_op"
+    tile = grid[r, c]
+    if tile == TileType.GOAL:
+        return ((r, c), "success") if not keys_left else (pos, "goal_locked")
+    if tile == TileType.TRAP:
+        return (r, c), "trap"
+    if tile == TileType.KEY and (r, c) in keys_left:
+        keys_left.discard((r, c))
+        return (r, c), "key_collected"
+    return (r, c), "moved"
+
+def test_table_stepping_matches_reference_rules():
+    env = GridEnv(width=8, height=8, trap_density=0.1, num_keys=2)
+    rng = np.random.default_rng(0)
+    for seed in range(20):
+        env.reset(seed=seed)
+        grid = env.grid_static
+        pos = env.agent_pos
+        keys_left = {tuple(k) for k in np.argwhere(grid == TileType.KEY)}
+        for action in rng.integers(0, 4, size=60):
+            pos, event = reference_step(grid, pos, keys_left, action)
+            _, _, terminated, truncated, info = env.step(action)
+            assert info["event"] == event
+            assert env.agent_pos == pos
+            assert env.keys_collected == env.total_keys - len(keys_left)
+            if terminated or truncated:
+                break
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.envs.value_iteration import MapValues, value_iteration, start_values, reward_params
+from gridlock_rl.maps.solver import solve
+
+def sample_maps(env, seeds):
+    grids = []
+    for seed in seeds:
+        env.reset(seed=seed)
+        grids.append(env.grid_static.copy())
+    return np.stack(grids)
+
+def test_q_values_satisfy_bellman_equation_of_env_step():
+    env = GridEnv(width=7, height=7, trap_density=0.15, num_keys=2, max_steps_multiplier=100)
+    gamma = 0.95
+    rng = np.random.default_rng(0)
+    for grid in sample_maps(env, range(8)):
+        values = MapValues.solve(grid, gamma=gamma, tol=1e-10, **reward_params(env))
+        env.reset(options={"grid": grid})
+        for _ in range(30):
+            state = env.get_state()
+            q = values.q_values(state)
+            for action in range(4):
+                env.set_state(state)
+                _, reward, terminated, _, _ = env.step(action)
+                target = reward + (0.0 if terminated else gamma * values.value(env))
+                assert q[action] == pytest.approx(target, abs=1e-6)
+            env.set_state(state)
+            _, _, terminated, _, _ = env.step(rng.integers(4))
+            if terminated:
+                break
+
+def test_greedy_policy_is_shortest_solution():
+    env = GridEnv(width=8, height=8, trap_density=0.1, num_keys=3)
+    rewards = dict(success_reward=1.0, key_reward=0.0, trap_cost=1.0, step_cost=0.01)
+    for grid in sample_maps(env, range(10)):
+        length, _ = solve(grid)
+        assert length > 0
+        values = MapValues.solve(grid, gamma=0.999, **rewards)
+        env.reset(options={"grid": grid})
+        for steps in range(1, length + 1):
+            _, _, terminated, truncated, info = env.step(values.action(env))
+            if terminated or truncated:
+                break
+        assert info["event"] == "success"
+        assert steps == length
+
+def test_start_values_chunked():
+    env = GridEnv(width=6, height=6, trap_density=0.1, num_keys=2)
+    grids = sample_maps(env, range(7))
+    q, n_iters = value_iteration(grids)
+    assert q.shape == (7, 36, 4, 4)
+    assert n_iters > 1
+    starts = []
+    for i, grid in enumerate(grids):
+        env.reset(options={"grid": grid})
+        starts.append(MapValues(grid, q[i], 0.99).value(env))
+    np.testing.assert_allclose(start_values(grids, chunk_size=3), starts)
+    with pytest.raises(ValueError):
+        value_iteration(grids, gamma=1.0)
@@ -0,0 +1,137 @@
+import pytest
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from gridlock_rl.envs.grid_env import GridEnv
+from gridlock_rl.envs.wrappers import MetricLoggingWrapper
+from gridlock_rl.envs.vec_env import GridVecEnv
+from gridlock_rl.envs.shm_vec_env import ShmVecEnv
+
+ENV_CFG = {
+    "width": 6,
+    "height": 6,
+    "max_width": 8,
+    "max_height": 8,
+    "trap_density": [0.05, 0.2],
+    "num_keys": 2,
+    "dense_reward": True,
+    "max_steps_multiplier": 1,
+}
+
+def make_env(**kwargs):
+    def _init():
+        return MetricLoggingWrapper(GridEnv(**kwargs))
+    return _init
+
+def assert_infos_equal(info_a, info_b):
+    assert set(info_a) == set(info_b)
+    for k, v in info_a.items():
+        if k == "terminal_observation":
+            np.testing.assert_array_equal(v["grid"], info_b[k]["grid"])
+            np.testing.assert_array_equal(v["keys_collected"], info_b[k]["keys_collected"])
+        elif k == "metrics":
+            assert v.keys() == info_b[k].keys()
+            for mk in v:
+                assert v[mk] == pytest.approx(info_b[k][mk])
+        elif isinstance(v, float):
+            assert v == pytest.approx(info_b[k])
+        else:
+            assert v == info_b[k], k
+
+@pytest.mark.parametrize("dense_reward", [True, False])
+def test_matches_dummy_vec_env(dense_reward):
+    n_envs = 6
+    cfg = dict(ENV_CFG, dense_reward=dense_reward)
+    ref = DummyVecEnv([make_env(**cfg) for _ in range(n_envs)])
+    vec = GridVecEnv(n_envs, **cfg)
+    ref.seed(123)
+    vec.seed(123)
+
+    obs_ref = ref.reset()
+    obs_vec = vec.reset()
+    np.testing.assert_array_equal(obs_ref["grid"], obs_vec["grid"])
+
+    rng = np.random.default_rng(0)
+    n_done = 0
+    for _ in range(300):
+        actions = rng.integers(0, 4, size=n_envs)
+        obs_ref, rew_ref, done_ref, info_ref = ref.step(actions)
+        obs_vec, rew_vec, done_vec, info_vec = vec.step(actions)
+
+        np.testing.assert_array_equal(obs_ref["grid"], obs_vec["grid"])
+        np.testing.assert_array_equal(obs_ref["keys_collected"], obs_vec["keys_collected"])
+        np.testing.assert_allclose(rew_ref, rew_vec, rtol=1e-6)
+        np.testing.assert_array_equal(done_ref, done_vec)
+        for a, b in zip(info_ref, info_vec):
+            assert_infos_equal(a, b)
+        n_done += done_ref.sum()
+
+    # Make sure auto-reset paths were exercised
+    assert n_done > n_envs
+
+def test_fixed_grid_option():
+    grid = np.zeros((1, 5), dtype=np.int8)
+    grid[0, 0] = 2 # Start
+    grid[0, 2] = 4 # Key
+    grid[0, 4] = 3 # Goal
+
+    vec = GridVecEnv(2, width=5, height=1)
+    vec.set_options({"grid": grid})
+    vec.reset()
+
+    events = []
+    for _ in range(4):
+        _, rewards, dones, infos = vec.step(np.array([1, 1]))
+        events.append(infos[0]["event"])
+    assert events == ["moved", "key_collected", "moved", "success"]
+    assert dones.all()
+    assert infos[0]["metrics"]["is_success"] == 1.0
+
+def test_shm_vec_env_matches_dummy_vec_env():
+    n_envs = 3
+    ref = DummyVecEnv([make_env(**ENV_CFG) for _ in range(n_envs)])
+    vec = ShmVecEnv([make_env(**ENV_CFG) for _ in range(n_envs)])
+    try:
+        ref.seed(7)
+        vec.seed(7)
+        obs_ref, obs_vec = ref.reset(), vec.reset()
+        np.testing.assert_array_equal(obs_ref["grid"], obs_vec["grid"])
+        for a, b in zip(ref.reset_infos, vec.reset_infos):
+            assert_infos_equal(a, b)
+
+        rng = np.random.default_rng(1)
+        n_done = 0
+        for _ in range(120):
+            actions = rng.integers(0, 4, size=n_envs)
+            obs_ref, rew_ref, done_ref, info_ref = ref.step(actions)
+            obs_vec, rew_vec, done_vec, info_vec = vec.step(actions)
+            np.testing.assert_array_equal(obs_ref["grid"], obs_vec["grid"])
+            np.testing.assert_array_equal(obs_ref["keys_collected"], obs_vec["keys_collected"])
+            np.testing.assert_array_equal(rew_ref, rew_vec)
+            np.testing.assert_array_equal(done_ref, done_vec)
+            for a, b in zip(info_ref, info_vec):
+                assert_infos_equal(a, b)
+            n_done += done_ref.sum()
+        assert n_done > n_envs
+
+        assert vec.env_is_wrapped(MetricLoggingWrapper) == [True] * n_envs
+        assert vec.get_attr("width", indices=[1]) == [6]
+    finally:
+        vec.close()
+
+def test_shm_vec_env_survives_failed_calls():
+    vec = ShmVecEnv([make_env(**ENV_CFG) for _ in range(2)])
+    try:
+        vec.reset()
+        assert vec.has_attr("width")
+        assert not vec.has_attr("nope")
+        with pytest.raises(AttributeError):
+            vec.get_attr("nope")
+        with pytest.raises(AttributeError):
+            vec.env_method("nope")
+        # Workers are still alive
+        vec.reset()
+        obs, _, _, _ = vec.step(np.zeros(2, dtype=np.int64))
+        assert obs["grid"].shape[0] == 2
+    finally:
+        vec.close()